@@ -0,0 +1,121 @@
+"""
+Purpose:
+    Confirmation benchmark, receipt polling vs a newHeads subscription
+
+    Starts a local WebSocket JSON-RPC stand-in that mines a block every
+    --block_time seconds, with every pending hash in it, and answers the calls
+    the trackers make. The same batch of mints is confirmed with the polling
+    ConfirmationTracker and with the SubscriptionTracker, and the report has
+    the RPC calls per mint and confirm latency of each.
+
+    pip install websockets web3
+    python benchmarks/bench_confirmations.py --mints 500
+"""
+
+# Python imports
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import wait
+from pathlib import Path
+from typing import Any, Dict
+
+# Allow running from the benchmarks/ dir
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Local Python Library Imports
+from modules.mint_nft import get_tokenid
+from modules.mint_tracker import ConfirmationTracker, MintHandle
+from modules.ws_confirmations import SubscriptionTracker
+from tests.stand_ins import TO_ADDRESS, ChainStandIn
+
+
+def run_tracker(
+    chain: ChainStandIn, tracker: ConfirmationTracker, mints: int
+) -> Dict[str, Any]:
+    """
+    Purpose:
+        Confirm a batch of mints on a tracker
+    Args:
+        chain - the stand-in
+        tracker - tracker to confirm with
+        mints - number of mints
+    Returns:
+        result - rpc calls per mint and confirm latency
+    """
+    chain.counts.clear()
+    handles = []
+    start = time.perf_counter()
+
+    for index in range(mints):
+        hash = "0x" + os.urandom(32).hex()
+        chain.send(hash)
+        handle = MintHandle(hash, index, TO_ADDRESS, "ipfs://token")
+        sent_at = time.perf_counter()
+        handle.add_done_callback(
+            lambda handle, sent_at=sent_at: setattr(
+                handle, "latency", time.perf_counter() - sent_at
+            )
+        )
+        handles.append(tracker.track(handle))
+
+    wait(handles)
+    elapsed = time.perf_counter() - start
+
+    latencies = [handle.latency for handle in handles]
+    return {
+        "mints": mints,
+        "seconds": elapsed,
+        "failed": sum(1 for handle in handles if handle.exception() is not None),
+        "rpc_calls_per_mint": sum(chain.counts.values()) / mints,
+        "rpc_calls": dict(chain.counts),
+        "confirm_ms_p50": statistics.median(latencies) * 1000,
+        "confirm_ms_max": max(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mint confirmations")
+    parser.add_argument("--mints", type=int, default=500, help="mints to confirm")
+    parser.add_argument(
+        "--block_time", type=float, default=0.5, help="seconds between blocks"
+    )
+    parser.add_argument("--output", type=str, help="write the JSON report here")
+    args = parser.parse_args()
+
+    from web3 import Web3
+
+    chain = ChainStandIn(args.block_time)
+    url = chain.start()
+    w3 = Web3(Web3.WebsocketProvider(url))
+
+    report = {"created_at": time.time(), "block_time": args.block_time}
+    report["poll"] = run_tracker(
+        chain, ConfirmationTracker(w3, get_tokenid, poll_interval=0.1), args.mints
+    )
+    report["subscribe"] = run_tracker(
+        chain, SubscriptionTracker(w3, url, get_tokenid), args.mints
+    )
+
+    for mode in ("poll", "subscribe"):
+        logging.info(
+            f"{mode}: {report[mode]['rpc_calls_per_mint']:.2f} rpc calls/mint, "
+            f"p50 confirm {report[mode]['confirm_ms_p50']:.0f}ms"
+        )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    loglevel = logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    main()
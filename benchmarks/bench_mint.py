@@ -0,0 +1,225 @@
+"""
+Purpose:
+    Mint throughput and latency benchmark against an in-process chain
+
+    Deploys the compiled MyNFT artifact to web3's EthereumTesterProvider (no
+    network needed) and runs each mint mode at each size, reporting tokens/sec,
+    p50/p95/p99 submit and confirm latency and RPC calls per mint as JSON.
+
+    pip install "web3[tester]"
+    truffle compile
+    python benchmarks/bench_mint.py --abi_path build/contracts/NFT_NAME.json
+"""
+
+# Python imports
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from web3 import Web3
+
+# Allow running from the benchmarks/ dir
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Local Python Library Imports
+from modules import mint_nft
+from modules.chain_client import ChainClient
+from modules.gas_estimator import GasEstimator
+from modules.gas_oracle import FeeOracle
+from modules.mint_tracker import ConfirmationTracker
+from modules.utils import load_json
+
+# Any address works, it is only read by isApprovedForAll
+PROXY_REGISTRY = "0x0000000000000000000000000000000000000001"
+TOKEN_URI = "ipfs://QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG"
+
+
+def deploy_contract(abi_path: str) -> Dict[str, Any]:
+    """
+    Purpose:
+        Start an in-process chain and deploy the NFT contract to it
+    Args:
+        abi_path - truffle artifact with abi and bytecode
+    Returns:
+        eth_json - blockchain info for the deployer wallet
+    """
+    artifact = load_json(abi_path)
+
+    w3 = Web3(Web3.EthereumTesterProvider())
+
+    private_key = w3.provider.ethereum_tester.backend.account_keys[0]
+    public_key = private_key.public_key.to_checksum_address()
+
+    factory = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+    hash = factory.constructor(PROXY_REGISTRY).transact({"from": public_key})
+    address = w3.eth.wait_for_transaction_receipt(hash)["contractAddress"]
+    contract = w3.eth.contract(address=address, abi=artifact["abi"])
+
+    client = ChainClient(
+        "tester", w3, contract, w3.eth.chain_id, "", "", FeeOracle(w3), GasEstimator()
+    )
+    # Blocks are mined instantly, poll fast so polling doesn't dominate
+    client.tracker = ConfirmationTracker(w3, mint_nft.get_tokenid, poll_interval=0.01)
+
+    return mint_nft.client_eth_json(client, public_key, private_key.to_hex())
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Purpose:
+        p50/p95/p99 of latency samples, in milliseconds
+    Args:
+        samples - latencies in seconds
+    Returns:
+        percentiles - p50, p95 and p99
+    """
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49] * 1000, "p95": cuts[94] * 1000, "p99": cuts[98] * 1000}
+
+
+def run_single(eth_json: Dict[str, Any], size: int) -> Dict[str, List[float]]:
+    """
+    Purpose:
+        Mint one token at a time, waiting for each like web3_mint
+    Args:
+        eth_json - blockchain info
+        size - tokens to mint
+    Returns:
+        latencies - submit and confirm latencies per mint
+    """
+    to_address = eth_json["public_key"]
+    submit, confirm = [], []
+
+    for _ in range(size):
+        start = time.perf_counter()
+        handle = mint_nft.web3_submit_mint(to_address, TOKEN_URI, eth_json)
+        submit.append(time.perf_counter() - start)
+        handle.result()
+        confirm.append(time.perf_counter() - start)
+
+    return {"submit": submit, "confirm": confirm}
+
+
+def run_bulk(eth_json: Dict[str, Any], size: int) -> Dict[str, List[float]]:
+    """
+    Purpose:
+        Mint every token through web3_bulk_mint
+    Args:
+        eth_json - blockchain info
+        size - tokens to mint
+    Returns:
+        latencies - submit and confirm latencies per mint, submit is the gap
+            between the engine pulling one job and the next, so it includes
+            time blocked on a full in-flight window
+    """
+    to_address = eth_json["public_key"]
+    pulled_at: List[float] = []
+
+    def jobs():
+        for _ in range(size):
+            pulled_at.append(time.perf_counter())
+            yield to_address, TOKEN_URI
+
+    confirm = []
+    for result in mint_nft.web3_bulk_mint(jobs(), eth_json):
+        confirm.append(time.perf_counter() - pulled_at[int(result["job_id"])])
+
+    submit = [end - start for start, end in zip(pulled_at, pulled_at[1:])]
+    return {"submit": submit, "confirm": confirm}
+
+
+def run_batch(eth_json: Dict[str, Any], size: int) -> Dict[str, List[float]]:
+    """
+    Purpose:
+        Mint every token through web3_bulk_mint_batched
+    Args:
+        eth_json - blockchain info
+        size - tokens to mint
+    Returns:
+        latencies - confirm latency per token from the start of the run, there
+            is no per token submit latency so submit is empty
+    """
+    to_address = eth_json["public_key"]
+    jobs = [(to_address, TOKEN_URI)] * size
+
+    start = time.perf_counter()
+    confirm = [
+        time.perf_counter() - start
+        for _ in mint_nft.web3_bulk_mint_batched(jobs, eth_json)
+    ]
+
+    return {"submit": [], "confirm": confirm}
+
+
+MODES = {"single": run_single, "bulk": run_bulk, "batch": run_batch}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark minting")
+    parser.add_argument(
+        "--abi_path",
+        type=str,
+        help="compiled NFT artifact, example: build/contracts/NFT_NAME.json",
+        required=True,
+    )
+    parser.add_argument(
+        "--sizes", type=str, default="1,100,10000", help="comma separated sizes"
+    )
+    parser.add_argument(
+        "--modes", type=str, default="single,bulk,batch", help="comma separated modes"
+    )
+    parser.add_argument("--output", type=str, help="write the JSON report here")
+    args = parser.parse_args()
+
+    report = {"created_at": time.time(), "results": []}
+
+    for mode in args.modes.split(","):
+        for size in [int(size) for size in args.sizes.split(",")]:
+            eth_json = deploy_contract(args.abi_path)
+            # Counts RPC calls from here on, so the deploy is left out
+            metrics = mint_nft.enable_metrics(eth_json)
+
+            start = time.perf_counter()
+            latencies = MODES[mode](eth_json, size)
+            elapsed = time.perf_counter() - start
+            snapshot = metrics.snapshot()
+            counts = snapshot["rpc_counts"]
+
+            result = {
+                "mode": mode,
+                "size": size,
+                "seconds": elapsed,
+                "tokens_per_sec": size / elapsed,
+                "submit_ms": percentiles(latencies["submit"]),
+                "confirm_ms": percentiles(latencies["confirm"]),
+                "rpc_calls_per_mint": sum(counts.values()) / size,
+                "rpc_calls": dict(counts),
+                "phases": snapshot["phases"],
+            }
+            logging.info(
+                f"{mode} x{size}: {result['tokens_per_sec']:.1f} tokens/sec, "
+                f"{result['rpc_calls_per_mint']:.2f} rpc calls/mint"
+            )
+            report["results"].append(result)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    loglevel = logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    main()
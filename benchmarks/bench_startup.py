@@ -0,0 +1,128 @@
+"""
+Purpose:
+    Startup latency benchmark for the mint client, the CLIs and the app
+
+    Each target runs in a fresh interpreter so nothing is cached between runs,
+    and the report also records whether web3 got imported, it should only be
+    loaded on first chain use.
+
+    python benchmarks/bench_startup.py --runs 10
+"""
+
+# Python imports
+import argparse
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Print the import time and whether web3 was pulled in
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, "web3" in sys.modules)
+"""
+
+IMPORTS = ["modules.mint_nft", "modules.chain_client", "walkthrough_st"]
+COMMANDS = {
+    "mint_nft --help": ["scripts/mint_nft.py", "--help"],
+    "presign_mints --help": ["scripts/presign_mints.py", "--help"],
+}
+
+
+def time_import(module: str, runs: int) -> Dict[str, Any]:
+    """
+    Purpose:
+        Time importing a module in a fresh interpreter
+    Args:
+        module - dotted module name
+        runs - interpreters to start
+    Returns:
+        result - median/min ms and whether web3 was imported, or the error
+    """
+    samples: List[float] = []
+    loads_web3 = False
+
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(module=module)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            return {"error": process.stderr.strip().splitlines()[-1]}
+
+        seconds, web3_imported = process.stdout.split()
+        samples.append(float(seconds))
+        loads_web3 = web3_imported == "True"
+
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "loads_web3": loads_web3,
+    }
+
+
+def time_command(args: List[str], runs: int) -> Dict[str, Any]:
+    """
+    Purpose:
+        Time a script end to end, interpreter start included
+    Args:
+        args - script and its args
+        runs - times to run it
+    Returns:
+        result - median/min ms, or the error
+    """
+    samples: List[float] = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, *args], cwd=ROOT, capture_output=True, text=True
+        )
+        samples.append(time.perf_counter() - start)
+        if process.returncode != 0:
+            return {"error": process.stderr.strip().splitlines()[-1]}
+
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark startup latency")
+    parser.add_argument("--runs", type=int, default=10, help="runs per target")
+    parser.add_argument("--output", type=str, help="write the JSON report here")
+    args = parser.parse_args()
+
+    report = {"created_at": time.time(), "imports": {}, "commands": {}}
+
+    for module in IMPORTS:
+        report["imports"][module] = time_import(module, args.runs)
+        logging.info(f"import {module}: {report['imports'][module]}")
+
+    for name, command in COMMANDS.items():
+        report["commands"][name] = time_command(command, args.runs)
+        logging.info(f"{name}: {report['commands'][name]}")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    loglevel = logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    main()
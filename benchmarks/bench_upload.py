@@ -0,0 +1,158 @@
+"""
+Purpose:
+    Upload memory benchmark, streamed multipart vs reading whole files
+
+    Starts a local stand-in for the pinFileToIPFS endpoint that reads bodies
+    in chunks and throws them away, writes --files test files of --size_mb
+    each, and uploads them --concurrency at a time in a fresh interpreter per
+    mode. The report has the peak RSS and throughput of each mode.
+
+    python benchmarks/bench_upload.py --files 4 --size_mb 256 --concurrency 4
+"""
+
+# Python imports
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Allow running from the benchmarks/ dir
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Local Python Library Imports
+from modules.pinata_api import PinataClient
+from tests.stand_ins import PinFileHandler
+
+MODES = ["buffered", "stream"]
+
+
+def peak_rss_mb() -> float:
+    """
+    Purpose:
+        Peak RSS of this process since it was exec'd
+    Args:
+        N/A
+    Returns:
+        peak - MB
+    """
+    # ru_maxrss carries the parent's peak over fork and exec, VmHWM does not
+    try:
+        with open("/proc/self/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def upload(mode: str, url: str, paths: List[str], concurrency: int) -> Dict[str, Any]:
+    """
+    Purpose:
+        Upload every file and measure this process
+    Args:
+        mode - "stream" for pin_file, "buffered" to read each file whole
+            first like pinContentToIPFS used to
+        url - stand-in server url
+        paths - files to upload
+        concurrency - uploads at once
+    Returns:
+        result - seconds, MB/s and peak RSS in MB
+    """
+    client = PinataClient("key", "secret", api_url=url, pool_size=concurrency)
+
+    def pin(path: str) -> Dict[str, Any]:
+        if mode == "stream":
+            return client.pin_file(path)
+
+        with open(path, "rb") as fp:
+            data = fp.read()
+        return client.api(
+            "POST", "/pinning/pinFileToIPFS", files={"file": (Path(path).name, data)}
+        )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(pin, paths))
+    elapsed = time.perf_counter() - start
+
+    size_mb = sum(os.path.getsize(path) for path in paths) / 1024**2
+    return {
+        "uploads": len(results),
+        "seconds": elapsed,
+        "mb_per_s": size_mb / elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark upload memory")
+    parser.add_argument("--files", type=int, default=4, help="files to upload")
+    parser.add_argument("--size_mb", type=int, default=256, help="size of each file")
+    parser.add_argument("--concurrency", type=int, default=4, help="uploads at once")
+    parser.add_argument("--output", type=str, help="write the JSON report here")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--paths", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Each mode runs in its own interpreter so peak RSS is its own
+    if args.worker:
+        print(json.dumps(upload(args.worker, args.url, args.paths, args.concurrency)))
+        return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PinFileHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    report = {"created_at": time.time(), "files": args.files, "size_mb": args.size_mb}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for index in range(args.files):
+            path = os.path.join(tmp_dir, f"asset_{index}.glb")
+            with open(path, "wb") as asset_file:
+                for _ in range(args.size_mb):
+                    asset_file.write(os.urandom(1024 * 1024))
+            paths.append(path)
+
+        for mode in MODES:
+            process = subprocess.run(
+                [sys.executable, __file__, "--worker", mode, "--url", url]
+                + ["--concurrency", str(args.concurrency), "--paths"]
+                + paths,
+                capture_output=True,
+                check=True,
+                text=True,
+            )
+            report[mode] = json.loads(process.stdout.splitlines()[-1])
+            logging.info(
+                f"{mode}: peak RSS {report[mode]['peak_rss_mb']:.0f}MB, "
+                f"{report[mode]['mb_per_s']:.0f}MB/s"
+            )
+
+    server.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as report_file:
+            report_file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    loglevel = logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    main()
@@ -18,13 +18,47 @@ contract REPLACE_NAME is ERC721Tradable {
         admin = msg.sender;
     }
 
-    // only our wallet should be able to mint
-    function mint(address to, string memory tokenURI) external onlyOwner {
+    // extra wallets allowed to mint, so minting can run on several nonces
+    mapping(address => bool) public minters;
+
+    event MinterUpdated(address indexed minter, bool allowed);
+
+    modifier onlyMinter() {
+        require(
+            owner() == _msgSender() || minters[_msgSender()],
+            "MyNFT: caller is not a minter"
+        );
+        _;
+    }
+
+    function setMinter(address minter, bool allowed) external onlyOwner {
+        minters[minter] = allowed;
+        emit MinterUpdated(minter, allowed);
+    }
+
+    // only our wallets should be able to mint
+    function mint(address to, string memory tokenURI) external onlyMinter {
         _safeMint(to, nextTokenId);
         _setTokenURI(nextTokenId, tokenURI);
         nextTokenId++;
     }
 
+    // one txn for many tokens, saves the base txn cost and a receipt per token
+    function mintBatch(address[] calldata to, string[] calldata uris)
+        external
+        onlyMinter
+    {
+        require(to.length == uris.length, "MyNFT: length mismatch");
+
+        uint256 tokenId = nextTokenId;
+        for (uint256 i = 0; i < to.length; i++) {
+            _safeMint(to[i], tokenId);
+            _setTokenURI(tokenId, uris[i]);
+            tokenId++;
+        }
+        nextTokenId = tokenId;
+    }
+
     function baseTokenURI() public pure override returns (string memory) {
         return "";
     }
@@ -0,0 +1,185 @@
+# Python imports
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Local Python Library Imports
+from modules.pinata_api import PinataClient
+from modules.utils import load_json
+
+
+def list_files(directory: str, pattern: str = "*") -> List[str]:
+    """
+    Purpose:
+        Files under a directory to pin, in a stable order
+    Args:
+        directory - directory to walk, subdirectories included
+        pattern - glob the file names must match, e.g. *.png
+    Returns:
+        paths - file paths
+    """
+    return sorted(
+        str(path)
+        for path in Path(directory).rglob(pattern)
+        if path.is_file() and not path.name.startswith(".")
+    )
+
+
+def read_manifest(manifest_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Purpose:
+        Load a pin manifest, the last line for a path wins
+    Args:
+        manifest_path - JSONL manifest
+    Returns:
+        records - path to its latest record, empty if there is no manifest
+    """
+    records = {}
+    if not os.path.exists(manifest_path):
+        return records
+
+    with open(manifest_path) as manifest_file:
+        for line in manifest_file:
+            # A crash can leave a torn last line
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record["path"]] = record
+
+    return records
+
+
+def pin_path(client: PinataClient, path: str, as_json: bool = False) -> Dict[str, Any]:
+    """
+    Purpose:
+        Pin one file
+    Args:
+        client - pinata client
+        path - file to pin
+        as_json - pin the parsed JSON with pinJSONToIPFS instead of the bytes
+    Returns:
+        ipfs json - data from pin
+    """
+    if as_json:
+        response = client.pin_json(load_json(path), name=Path(path).name)
+    else:
+        response = client.pin_file(path)
+
+    if "IpfsHash" not in response:
+        raise ValueError(f"Pin failed: {response}")
+
+    return response
+
+
+def pin_files(
+    client: PinataClient,
+    paths: Iterable[str],
+    max_workers: int = 8,
+    as_json: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Purpose:
+        Pin files concurrently
+    Args:
+        client - pinata client, its rate limiter paces the calls
+        paths - files to pin
+        max_workers - pins in flight at once
+        as_json - pin parsed JSON instead of bytes
+    Returns:
+        records - generator of {"path", "status", "cid", "size", "duplicate"} or
+            {"path", "status", "error"} dicts, in the order pins complete
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def finished(done: set) -> Iterator[Dict[str, Any]]:
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as error:
+                    logging.error(f"Pinning {path} failed: {error}")
+                    yield {"path": path, "status": "failed", "error": str(error)}
+                else:
+                    yield {
+                        "path": path,
+                        "status": "pinned",
+                        "cid": response["IpfsHash"],
+                        "size": response.get("PinSize"),
+                        "duplicate": bool(response.get("isDuplicate")),
+                    }
+
+        for path in paths:
+            pending[executor.submit(pin_path, client, path, as_json)] = path
+            # Only keep a few queued so memory stays flat on huge directories
+            if len(pending) >= max_workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from finished(done)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from finished(done)
+
+
+def pin_directory(
+    client: PinataClient,
+    directory: str,
+    manifest_path: str,
+    pattern: str = "*",
+    max_workers: int = 8,
+    as_json: bool = False,
+    retries: int = 1,
+) -> Dict[str, Any]:
+    """
+    Purpose:
+        Pin every file in a directory, appending each result to a JSONL
+        manifest as it completes. Files the manifest already has as pinned
+        are skipped, so a re-run only does what is left. Failures are tried
+        again in separate passes at lower concurrency once the rest is done.
+    Args:
+        client - pinata client
+        directory - directory to pin
+        manifest_path - JSONL manifest of path to CID results
+        pattern - glob the file names must match
+        max_workers - pins in flight at once
+        as_json - pin parsed JSON instead of bytes
+        retries - extra passes over the failed files
+    Returns:
+        summary - "pinned" and "skipped" counts and the paths still "failed"
+    """
+    done = read_manifest(manifest_path)
+    # The manifest may live in the directory it describes
+    all_paths = [
+        path
+        for path in list_files(directory, pattern)
+        if os.path.abspath(path) != os.path.abspath(manifest_path)
+    ]
+    paths = [path for path in all_paths if done.get(path, {}).get("status") != "pinned"]
+    summary = {"pinned": 0, "skipped": len(all_paths) - len(paths)}
+    logging.info(f"Pinning {len(paths)} files, {summary['skipped']} already pinned")
+
+    with open(manifest_path, "a") as manifest_file:
+        for attempt in range(retries + 1):
+            if attempt:
+                logging.info(f"Retrying {len(paths)} failed pins")
+            workers = max(1, max_workers >> attempt)
+
+            failed = []
+            for record in pin_files(client, paths, workers, as_json):
+                manifest_file.write(json.dumps(record) + "\n")
+                manifest_file.flush()
+                if record["status"] == "pinned":
+                    summary["pinned"] += 1
+                else:
+                    failed.append(record["path"])
+
+            paths = failed
+            if not paths:
+                break
+
+    summary["failed"] = paths
+    return summary
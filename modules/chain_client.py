@@ -0,0 +1,240 @@
+# Python imports
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Local Python Library Imports
+from modules.gas_estimator import GasEstimator
+from modules.gas_oracle import FeeOracle
+from modules.mint_metrics import NULL_METRICS
+from modules.nonce_manager import NonceManager
+from modules.utils import load_json
+
+NETWORKS = {
+    "rinkeby": {
+        "rpc_url": "https://rinkeby.infura.io/v3/{infura_key}",
+        "ws_url": "wss://rinkeby.infura.io/ws/v3/{infura_key}",
+        "chain_id": 4,
+        "open_sea_url": "https://testnets.opensea.io/assets/{contract}/",
+        "scan_url": "https://rinkeby.etherscan.io/tx/",
+        "min_priority_fee_gwei": 0,
+    },
+    "mumbai": {
+        "rpc_url": "https://polygon-mumbai.infura.io/v3/{infura_key}",
+        "ws_url": "wss://polygon-mumbai.infura.io/ws/v3/{infura_key}",
+        "chain_id": 80001,
+        "open_sea_url": "https://testnets.opensea.io/assets/{contract}/",
+        "scan_url": "https://mumbai.polygonscan.com/tx/",
+        # Polygon rejects txns under a 30 gwei priority fee
+        "min_priority_fee_gwei": 30,
+    },
+    "matic_main": {
+        "rpc_url": "https://polygon-mainnet.infura.io/v3/{infura_key}",
+        "ws_url": "wss://polygon-mainnet.infura.io/ws/v3/{infura_key}",
+        "chain_id": 137,
+        "open_sea_url": "https://opensea.io/assets/matic/{contract}/",
+        "scan_url": "https://polygonscan.com/tx/",
+        "min_priority_fee_gwei": 30,
+    },
+}
+
+
+class ChainClient:
+    """
+    Purpose:
+        Everything needed to talk to one contract on one network, built once
+        per process and shared by every mint
+    Args:
+        network - network name
+        w3 - web3 instance
+        contract - contract object
+        chain_id - chain id
+        open_sea_url - OpenSea url for the contract
+        scan_url - block explorer txn url
+        fee_oracle - shared fee oracle
+        gas_estimator - shared gas estimator
+        ws_url - WebSocket url to subscribe to new blocks on, None to poll
+    """
+
+    __slots__ = (
+        "network",
+        "w3",
+        "contract",
+        "chain_id",
+        "open_sea_url",
+        "scan_url",
+        "ws_url",
+        "fee_oracle",
+        "gas_estimator",
+        "tracker",
+        "fee_bumper",
+        "metrics",
+        "_nonce_managers",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        network: str,
+        w3: Any,
+        contract: Any,
+        chain_id: int,
+        open_sea_url: str,
+        scan_url: str,
+        fee_oracle: FeeOracle,
+        gas_estimator: GasEstimator,
+        ws_url: Optional[str] = None,
+    ):
+        self.network = network
+        self.w3 = w3
+        self.contract = contract
+        self.chain_id = chain_id
+        self.open_sea_url = open_sea_url
+        self.scan_url = scan_url
+        self.fee_oracle = fee_oracle
+        self.gas_estimator = gas_estimator
+        self.ws_url = ws_url
+        self.tracker = None
+        self.fee_bumper = None
+        self.metrics = NULL_METRICS
+
+        self._nonce_managers: Dict[str, NonceManager] = {}
+        self._lock = threading.Lock()
+
+    def nonce_manager(self, address: str) -> NonceManager:
+        """
+        Purpose:
+            Get the shared nonce manager for an account
+        Args:
+            address - account address
+        Returns:
+            nonce_manager - nonce counter for the account
+        """
+        with self._lock:
+            if address not in self._nonce_managers:
+                self._nonce_managers[address] = NonceManager(self.w3, address)
+            return self._nonce_managers[address]
+
+
+_CLIENTS: Dict[Tuple[Any, ...], ChainClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+_SESSION: Optional[Any] = None
+
+
+def get_session() -> Any:
+    """
+    Purpose:
+        Get the keep-alive HTTP session shared by every provider
+    Args:
+        N/A
+    Returns:
+        session - shared requests session
+    """
+    global _SESSION
+
+    if _SESSION is None:
+        import requests
+
+        _SESSION = requests.Session()
+
+    return _SESSION
+
+
+def _build_client(
+    contract: str,
+    abi_path: str,
+    infura_key: str,
+    network: str,
+    rpc_urls: Tuple[str, ...],
+    broadcast: bool,
+    transport: str,
+) -> ChainClient:
+    # web3 takes most of a second to import, so only pay for it on first use
+    from web3 import Web3
+
+    from modules.rpc_pool import PooledHTTPProvider, RPCPool
+
+    if network not in NETWORKS:
+        logging.error("Invalid network")
+        raise ValueError(f"Invalid {network}")
+    if transport not in ("http", "ws"):
+        raise ValueError(f"Invalid transport {transport}")
+
+    config = NETWORKS[network]
+    rpc_url = config["rpc_url"].format(infura_key=infura_key)
+    ws_url = None
+    if transport == "ws":
+        ws_url = config["ws_url"].format(infura_key=infura_key)
+
+    if ws_url and not rpc_urls:
+        w3 = Web3(Web3.WebsocketProvider(ws_url))
+    elif rpc_urls:
+        pool = RPCPool([rpc_url, *rpc_urls], session=get_session(), broadcast=broadcast)
+        w3 = Web3(PooledHTTPProvider(pool))
+    else:
+        w3 = Web3(Web3.HTTPProvider(rpc_url, session=get_session()))
+    ABI = load_json(abi_path)["abi"]  # get the ABI
+    CODE_NFT = w3.eth.contract(address=contract, abi=ABI)  # The contract
+
+    logging.info(f"checking if connected to infura...{w3.isConnected()}")
+
+    fee_oracle = FeeOracle(
+        w3, min_priority_fee=w3.toWei(config["min_priority_fee_gwei"], "gwei")
+    )
+
+    return ChainClient(
+        network,
+        w3,
+        CODE_NFT,
+        config["chain_id"],
+        config["open_sea_url"].format(contract=contract),
+        config["scan_url"],
+        fee_oracle,
+        GasEstimator(),
+        ws_url,
+    )
+
+
+def get_chain_client(
+    contract: str,
+    abi_path: str,
+    infura_key: str,
+    network: str,
+    rpc_urls: Optional[List[str]] = None,
+    broadcast: bool = False,
+    transport: str = "http",
+) -> ChainClient:
+    """
+    Purpose:
+        Get the client for a contract, building it on first use
+    Args:
+        contract: contract address
+        abi_path: abi path
+        infura_key: infura key,
+        network: network,
+        rpc_urls: extra JSON-RPC urls to pool with infura,
+        broadcast: send raw txns to every pooled url at once,
+        transport: "http", or "ws" for a WebSocket provider and newHeads
+            subscription confirmations, pooled rpc_urls keep calls on HTTP
+    Returns:
+        client - shared chain client, rebuilt if the ABI file changed
+    """
+    rpc_urls = tuple(rpc_urls or ())
+    key = (
+        network,
+        contract,
+        abi_path,
+        os.path.getmtime(abi_path),
+        infura_key,
+        rpc_urls,
+        broadcast,
+        transport,
+    )
+
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            _CLIENTS[key] = _build_client(
+                contract, abi_path, infura_key, network, rpc_urls, broadcast, transport
+            )
+        return _CLIENTS[key]
@@ -0,0 +1,274 @@
+# Python imports
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from web3 import Web3
+
+# Local Python Library Imports
+from modules.chain_client import get_session
+from modules.rpc_pool import PooledHTTPProvider, is_revert
+
+# 4 byte selectors of the ERC721 read calls
+OWNER_OF = "0x6352211e"  # ownerOf(uint256)
+TOKEN_URI = "0xc87b56dd"  # tokenURI(uint256)
+BALANCE_OF = "0x70a08231"  # balanceOf(address)
+
+
+def get_batch_poster(w3: Any) -> Callable[[bytes], Any]:
+    """
+    Purpose:
+        Get a function that posts a raw JSON-RPC batch on the web3 provider's
+        endpoint
+    Args:
+        w3 - web3 instance
+    Returns:
+        post - function taking an encoded batch, returning decoded responses
+    """
+    provider = w3.provider
+
+    if isinstance(provider, PooledHTTPProvider):
+        return lambda payload: provider.pool.post(payload, "batch")
+
+    endpoint_uri = provider.endpoint_uri
+    session = get_session()
+
+    def post(payload: bytes) -> Any:
+        response = session.post(
+            endpoint_uri,
+            data=payload,
+            headers={"Content-Type": "application/json"},
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    return post
+
+
+def is_batch_too_large(error: Any) -> bool:
+    """
+    Purpose:
+        Check if a whole-batch error is the node refusing the batch size
+    Args:
+        error - "error" member of the JSON-RPC response, or the HTTP error
+    Returns:
+        too_large - True if smaller batches may go through
+    """
+    if isinstance(error, dict):
+        error = error.get("message", "")
+    message = str(error).lower()
+    return "413" in message or (
+        "batch" in message
+        and any(word in message for word in ("large", "limit", "exceed", "many"))
+    )
+
+
+def batch_eth_call(
+    w3: Any,
+    calls: Sequence[Tuple[str, str]],
+    block_number: int,
+    batch_size: int = 100,
+    max_workers: int = 4,
+    retries: int = 2,
+) -> List[Optional[str]]:
+    """
+    Purpose:
+        Run many eth_calls packed into JSON-RPC batches, batches are sent
+        concurrently and all pinned to the same block. Calls that come back
+        with an error other than a revert, e.g. rate limited, or with no
+        answer at all are sent again with backoff, as are whole batches that
+        fail, and raise ValueError if they still fail after the retries. A
+        batch the node refuses as too large is split in half until it fits.
+    Args:
+        w3 - web3 instance
+        calls - (to address, call data) pairs
+        block_number - block to read at
+        batch_size - eth_calls per JSON-RPC batch
+        max_workers - batches in flight at once
+        retries - times to resend calls that errored
+    Returns:
+        results - hex result per call, None where the call reverted
+    """
+    post = get_batch_poster(w3)
+    block = hex(block_number)
+
+    def run_calls(pending: Dict[int, Tuple[str, str]]) -> Dict[int, Optional[str]]:
+        results: Dict[int, Optional[str]] = {}
+
+        for attempt in range(retries + 1):
+            if attempt:
+                logging.warning(f"Retrying {len(pending)} eth_calls: {error}")
+                time.sleep(0.5 * 2 ** (attempt - 1))
+
+            batch = [
+                {
+                    "jsonrpc": "2.0",
+                    "id": call_id,
+                    "method": "eth_call",
+                    "params": [{"to": to, "data": data}, block],
+                }
+                for call_id, (to, data) in pending.items()
+            ]
+            try:
+                responses = post(json.dumps(batch).encode("utf-8"))
+            except (requests.RequestException, ValueError) as post_error:
+                responses = {"error": str(post_error)}
+
+            if not isinstance(responses, list):
+                # The whole batch failed, e.g. rate limited or over the node's
+                # batch size limit
+                error = (
+                    responses.get("error", responses)
+                    if isinstance(responses, dict)
+                    else responses
+                )
+                if len(pending) > 1 and is_batch_too_large(error):
+                    calls_left = list(pending.items())
+                    half = len(calls_left) // 2
+                    results.update(run_calls(dict(calls_left[:half])))
+                    results.update(run_calls(dict(calls_left[half:])))
+                    return results
+                continue
+
+            # Batch answers can come back in any order
+            by_id = {response.get("id"): response for response in responses}
+            failed = {}
+            for call_id, call in pending.items():
+                response = by_id.get(call_id, {"error": "no response"})
+                if "result" in response:
+                    # "0x" means there was no return data
+                    results[call_id] = (
+                        response["result"] if response["result"] != "0x" else None
+                    )
+                elif is_revert(response.get("error")):
+                    results[call_id] = None
+                else:
+                    failed[call_id] = call
+                    error = response.get("error")
+
+            pending = failed
+            if not pending:
+                break
+        else:
+            raise ValueError(f"{len(pending)} eth_calls failed: {error}")
+
+        return results
+
+    def run_batch(start: int) -> List[Optional[str]]:
+        results = run_calls(
+            {
+                start + index: (to, data)
+                for index, (to, data) in enumerate(calls[start : start + batch_size])
+            }
+        )
+        return [results[call_id] for call_id in sorted(results)]
+
+    results: List[Optional[str]] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch_results in executor.map(run_batch, range(0, len(calls), batch_size)):
+            results.extend(batch_results)
+
+    return results
+
+
+def _uint256(value: int) -> str:
+    return format(value, "064x")
+
+
+def batch_read_tokens(
+    eth_json: Dict[str, Any],
+    token_ids: Sequence[int],
+    block_number: Optional[int] = None,
+    batch_size: int = 100,
+    max_workers: int = 4,
+) -> Dict[str, List[Any]]:
+    """
+    Purpose:
+        Read ownerOf and tokenURI for many tokens at one block
+    Args:
+        eth_json - blockchain info
+        token_ids - tokens to read
+        block_number - block to read at, latest if None
+        batch_size - eth_calls per JSON-RPC batch
+        max_workers - batches in flight at once
+    Returns:
+        columns - parallel "token_ids", "owners" and "token_uris" lists, plus
+            the "block_number" read at, None for tokens that don't exist
+    """
+    w3 = eth_json["w3"]
+    contract = eth_json["contract"].address
+
+    if block_number is None:
+        block_number = w3.eth.block_number
+
+    token_ids = list(token_ids)
+    calls = []
+    for token_id in token_ids:
+        calls.append((contract, OWNER_OF + _uint256(token_id)))
+        calls.append((contract, TOKEN_URI + _uint256(token_id)))
+
+    results = batch_eth_call(w3, calls, block_number, batch_size, max_workers)
+
+    owners = []
+    token_uris = []
+    for owner, token_uri in zip(results[0::2], results[1::2]):
+        owners.append(Web3.toChecksumAddress("0x" + owner[-40:]) if owner else None)
+        token_uris.append(
+            w3.codec.decode_abi(["string"], Web3.toBytes(hexstr=token_uri))[0]
+            if token_uri
+            else None
+        )
+
+    logging.info(f"Read {len(token_ids)} tokens at block {block_number}")
+
+    return {
+        "block_number": block_number,
+        "token_ids": token_ids,
+        "owners": owners,
+        "token_uris": token_uris,
+    }
+
+
+def batch_read_balances(
+    eth_json: Dict[str, Any],
+    addresses: Sequence[str],
+    block_number: Optional[int] = None,
+    batch_size: int = 100,
+    max_workers: int = 4,
+) -> Dict[str, List[Any]]:
+    """
+    Purpose:
+        Read balanceOf for many addresses at one block
+    Args:
+        eth_json - blockchain info
+        addresses - holders to read
+        block_number - block to read at, latest if None
+        batch_size - eth_calls per JSON-RPC batch
+        max_workers - batches in flight at once
+    Returns:
+        columns - parallel "addresses" and "balances" lists, plus the
+            "block_number" read at
+    """
+    w3 = eth_json["w3"]
+    contract = eth_json["contract"].address
+
+    if block_number is None:
+        block_number = w3.eth.block_number
+
+    addresses = list(addresses)
+    calls = [
+        (contract, BALANCE_OF + address.lower().replace("0x", "").rjust(64, "0"))
+        for address in addresses
+    ]
+
+    results = batch_eth_call(w3, calls, block_number, batch_size, max_workers)
+
+    return {
+        "block_number": block_number,
+        "addresses": addresses,
+        "balances": [int(result, 16) if result else None for result in results],
+    }
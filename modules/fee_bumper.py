@@ -0,0 +1,211 @@
+# Python imports
+import logging
+import math
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# Local Python Library Imports
+from modules.gas_oracle import FeeOracle
+from modules.mint_tracker import ConfirmationTracker, MintHandle
+from modules.nonce_manager import is_already_known, is_nonce_too_low
+
+# Nodes only accept a replacement paying at least 10% more on every fee field
+MIN_BUMP_FACTOR = 1.1
+
+FEE_FIELDS = ("maxFeePerGas", "maxPriorityFeePerGas", "gasPrice")
+
+
+def bump_fees(
+    txn: Dict[str, Any], bump_factor: float, current_fees: Dict[str, int]
+) -> Dict[str, int]:
+    """
+    Purpose:
+        Fees for a replacement txn, bumped by bump_factor and raised to the
+        current market fees if those went up more
+    Args:
+        txn - txn being replaced
+        bump_factor - fee multiplier
+        current_fees - fee_params from the fee oracle
+    Returns:
+        fees - new values for the fee fields the txn uses
+    """
+    fees = {}
+    for field in FEE_FIELDS:
+        if field in txn:
+            bumped = math.ceil(txn[field] * bump_factor)
+            fees[field] = max(bumped, current_fees.get(field, 0))
+
+    # The tip can't exceed the fee cap
+    if "maxFeePerGas" in fees:
+        fees["maxFeePerGas"] = max(fees["maxFeePerGas"], fees["maxPriorityFeePerGas"])
+
+    return fees
+
+
+class FeeBumper:
+    """
+    Purpose:
+        Watch sent txns and re-sign any that sat unmined for bump_after_blocks
+        blocks under the same nonce with bumped fees. Every replacement hash is
+        added to the confirmation tracker, so the handle resolves with
+        whichever one lands and later nonces stop queueing behind it.
+    Args:
+        w3 - web3 instance
+        fee_oracle - current fees, a bump never goes below them
+        tracker - confirmation tracker the watched handles are tracked on
+        bump_after_blocks - blocks a txn may sit unmined before a bump
+        bump_factor - fee multiplier per bump, at least 1.1
+        max_bumps - give up bumping a txn after this many replacements
+        max_fee_per_gas - never bump fees past this many wei, None for no cap
+    """
+
+    def __init__(
+        self,
+        w3: Any,
+        fee_oracle: FeeOracle,
+        tracker: ConfirmationTracker,
+        bump_after_blocks: int = 10,
+        bump_factor: float = 1.125,
+        max_bumps: int = 5,
+        max_fee_per_gas: Optional[int] = None,
+    ):
+        if bump_factor < MIN_BUMP_FACTOR:
+            raise ValueError(f"bump_factor must be at least {MIN_BUMP_FACTOR}")
+
+        self.w3 = w3
+        self.fee_oracle = fee_oracle
+        self.tracker = tracker
+        self.bump_after_blocks = bump_after_blocks
+        self.bump_factor = bump_factor
+        self.max_bumps = max_bumps
+        self.max_fee_per_gas = max_fee_per_gas
+
+        self._lock = threading.Lock()
+        self._watched: Dict[MintHandle, Dict[str, Any]] = {}
+
+        # Keep whatever else was listening for blocks
+        previous = tracker.on_block
+        if previous is None:
+            tracker.on_block = self.check
+        else:
+
+            def on_block(block_number: int) -> None:
+                previous(block_number)
+                self.check(block_number)
+
+            tracker.on_block = on_block
+
+    def watch(
+        self,
+        handle: MintHandle,
+        txn: Dict[str, Any],
+        private_key: bytes,
+        on_signed: Optional[Callable[[Any, int], None]] = None,
+    ) -> None:
+        """
+        Purpose:
+            Start watching a sent txn
+        Args:
+            handle - tracked handle of the txn
+            txn - the unsigned txn that was sent
+            private_key - key to re-sign replacements with
+            on_signed - called with (signed_txn, nonce) before each
+                replacement is sent, e.g. to journal the new hash
+        Returns:
+            N/A
+        """
+        with self._lock:
+            self._watched[handle] = {
+                "txn": txn,
+                "private_key": private_key,
+                "on_signed": on_signed,
+                "sent_block": None,
+                "bumps": 0,
+            }
+
+    def watched_count(self) -> int:
+        """
+        Purpose:
+            Number of txns still being watched
+        Args:
+            N/A
+        Returns:
+            count - watched txns
+        """
+        with self._lock:
+            return len(self._watched)
+
+    def check(self, block_number: int) -> None:
+        """
+        Purpose:
+            Bump every watched txn that has been pending too long, called by
+            the tracker on each new block
+        Args:
+            block_number - latest block
+        Returns:
+            N/A
+        """
+        with self._lock:
+            for handle in [handle for handle in self._watched if handle.done()]:
+                del self._watched[handle]
+
+            stuck = []
+            for handle, watched in self._watched.items():
+                # Count blocks from the first one seen after sending
+                if watched["sent_block"] is None:
+                    watched["sent_block"] = block_number
+                elif block_number - watched["sent_block"] >= self.bump_after_blocks:
+                    stuck.append((handle, watched))
+
+        for handle, watched in stuck:
+            try:
+                self._replace(handle, watched, block_number)
+            except Exception as error:
+                logging.error(f"Fee bump of nonce {handle.nonce} failed: {error}")
+
+    def _replace(
+        self, handle: MintHandle, watched: Dict[str, Any], block_number: int
+    ) -> None:
+        if watched["bumps"] >= self.max_bumps:
+            return
+
+        txn = watched["txn"]
+        fees = bump_fees(txn, self.bump_factor, self.fee_oracle.fee_params())
+        fee_cap = fees.get("maxFeePerGas", fees.get("gasPrice"))
+        if self.max_fee_per_gas is not None and fee_cap > self.max_fee_per_gas:
+            logging.warning(
+                f"Nonce {handle.nonce} stuck but a bump would pass the fee cap"
+            )
+            watched["bumps"] = self.max_bumps
+            return
+
+        new_txn = {**txn, **fees}
+        signed_txn = self.w3.eth.account.sign_transaction(
+            new_txn, private_key=watched["private_key"]
+        )
+        if watched["on_signed"] is not None:
+            watched["on_signed"](signed_txn, handle.nonce)
+
+        try:
+            self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        except Exception as error:
+            if is_nonce_too_low(error):
+                # One of the earlier hashes was just mined, the tracker picks
+                # it up
+                logging.info(f"Nonce {handle.nonce} mined before the bump landed")
+                return
+            # Otherwise the node already has this replacement, track it
+            if not is_already_known(error):
+                raise
+
+        hash = self.w3.toHex(signed_txn.hash)
+        if not self.tracker.add_hash(handle, hash):
+            return
+
+        watched["txn"] = new_txn
+        watched["sent_block"] = block_number
+        watched["bumps"] += 1
+        logging.info(
+            f"Bumped nonce {handle.nonce} to {fee_cap} wei/gas, "
+            f"replacement {hash} (bump {watched['bumps']})"
+        )
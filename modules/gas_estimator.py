@@ -0,0 +1,76 @@
+# Python imports
+import logging
+import threading
+from typing import Any, Dict, Hashable, Tuple
+
+
+def uri_bucket(tokenURI: str, bucket_size: int = 32) -> int:
+    """
+    Purpose:
+        Bucket a tokenURI by length, URIs in the same bucket take the same
+        number of storage words so they cost the same gas to mint
+    Args:
+        tokenURI - uri for token
+        bucket_size - bytes per bucket
+    Returns:
+        bucket - bucket index
+    """
+    return (len(tokenURI.encode("utf-8")) + bucket_size - 1) // bucket_size
+
+
+class GasEstimator:
+    """
+    Purpose:
+        Memoize estimateGas results per call shape, so a batch of mints pays
+        for one estimate instead of one per token
+    Args:
+        margin - multiplier on the estimate for the gas limit
+        max_uses - re-estimate a shape after it was used this many times
+    """
+
+    def __init__(self, margin: float = 1.25, max_uses: int = 1000):
+        self.margin = margin
+        self.max_uses = max_uses
+
+        self._lock = threading.Lock()
+        self._cache: Dict[Hashable, Tuple[int, int]] = {}
+
+    def gas_limit(
+        self, contract_function: Any, tx_params: Dict[str, Any], shape: Hashable
+    ) -> int:
+        """
+        Purpose:
+            Get the gas limit for a contract call, estimating it on a miss
+        Args:
+            contract_function - bound contract function, e.g. functions.mint(...)
+            tx_params - txn fields for the estimate, at least "from"
+            shape - cache key for calls that cost the same
+        Returns:
+            gas - gas limit with the safety margin
+        """
+        with self._lock:
+            cached = self._cache.get(shape)
+            if cached is not None and cached[1] < self.max_uses:
+                self._cache[shape] = (cached[0], cached[1] + 1)
+                return cached[0]
+
+        estimate = contract_function.estimateGas(tx_params)
+        gas = int(estimate * self.margin)
+        logging.info(f"Estimated {estimate} gas for {shape}, using {gas}")
+
+        with self._lock:
+            self._cache[shape] = (gas, 1)
+
+        return gas
+
+    def invalidate(self, shape: Hashable) -> None:
+        """
+        Purpose:
+            Drop a cached estimate, e.g. after a txn ran out of gas
+        Args:
+            shape - cache key to drop
+        Returns:
+            N/A
+        """
+        with self._lock:
+            self._cache.pop(shape, None)
@@ -0,0 +1,125 @@
+# Python imports
+import logging
+import statistics
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+
+class FeeOracle:
+    """
+    Purpose:
+        Cache fee readings so a batch of mints shares one eth_feeHistory call,
+        and turn them into EIP-1559 fees, falling back to a legacy gasPrice on
+        chains without fee history
+    Args:
+        w3 - web3 instance
+        max_age_seconds - reuse a reading for this many seconds
+        max_age_blocks - also refresh once the chain moved this many blocks,
+            costs one eth_blockNumber call per lookup, None to skip
+        history_blocks - number of blocks of fee history to read
+        reward_percentiles - priority fee percentiles to read, fee_params can
+            pick any of these
+        base_fee_multiplier - headroom on the base fee for maxFeePerGas, 2
+            covers six full blocks of base fee growth
+        min_priority_fee - floor for maxPriorityFeePerGas in wei
+    """
+
+    def __init__(
+        self,
+        w3: Any,
+        max_age_seconds: float = 10.0,
+        max_age_blocks: Optional[int] = None,
+        history_blocks: int = 10,
+        reward_percentiles: Sequence[int] = (10, 25, 50, 75, 90),
+        base_fee_multiplier: float = 2.0,
+        min_priority_fee: int = 0,
+    ):
+        self.w3 = w3
+        self.max_age_seconds = max_age_seconds
+        self.max_age_blocks = max_age_blocks
+        self.history_blocks = history_blocks
+        self.reward_percentiles = list(reward_percentiles)
+        self.base_fee_multiplier = base_fee_multiplier
+        self.min_priority_fee = min_priority_fee
+
+        self._lock = threading.Lock()
+        self._reading: Optional[Dict[str, Any]] = None
+        self._read_at = 0.0
+        self._read_block = -1
+
+    def _is_stale(self) -> bool:
+        if self._reading is None:
+            return True
+        if time.monotonic() - self._read_at > self.max_age_seconds:
+            return True
+        if self.max_age_blocks is not None:
+            block_number = self.w3.eth.block_number
+            return block_number - self._read_block >= self.max_age_blocks
+        return False
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            history = self.w3.eth.fee_history(
+                self.history_blocks, "latest", self.reward_percentiles
+            )
+        except Exception as error:
+            logging.info(f"No fee history, using legacy gasPrice: {error}")
+            block = self.w3.eth.block_number if self.max_age_blocks else -1
+            return {"gas_price": self.w3.eth.gas_price, "block": block}
+
+        rewards = history.get("reward") or []
+        priority_fees = {}
+        for index, percentile in enumerate(self.reward_percentiles):
+            # Empty blocks report 0, leave them out of the median
+            samples = [block[index] for block in rewards if block[index] > 0]
+            priority_fees[percentile] = (
+                int(statistics.median(samples)) if samples else 0
+            )
+
+        return {
+            # The last entry is the base fee of the next block
+            "base_fee": history["baseFeePerGas"][-1],
+            "priority_fees": priority_fees,
+            "block": history["oldestBlock"] + len(history["baseFeePerGas"]) - 2,
+        }
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Purpose:
+            Force a new fee reading
+        Args:
+            N/A
+        Returns:
+            reading - the cached fee reading
+        """
+        with self._lock:
+            self._reading = self._read()
+            self._read_at = time.monotonic()
+            self._read_block = self._reading["block"]
+            return self._reading
+
+    def fee_params(self, percentile: int = 50) -> Dict[str, int]:
+        """
+        Purpose:
+            Get the fee fields for a txn
+        Args:
+            percentile - priority fee percentile, one of reward_percentiles
+        Returns:
+            fees - maxFeePerGas/maxPriorityFeePerGas, or gasPrice on legacy
+                chains
+        """
+        if percentile not in self.reward_percentiles:
+            raise ValueError(f"Invalid percentile {percentile}")
+
+        with self._lock:
+            stale = self._is_stale()
+        reading = self.refresh() if stale else self._reading
+
+        if "gas_price" in reading:
+            return {"gasPrice": reading["gas_price"]}
+
+        priority_fee = max(reading["priority_fees"][percentile], self.min_priority_fee)
+        max_fee = int(reading["base_fee"] * self.base_fee_multiplier) + priority_fee
+
+        return {"maxFeePerGas": max_fee, "maxPriorityFeePerGas": priority_fee}
@@ -0,0 +1,166 @@
+# Python imports
+import hashlib
+from typing import BinaryIO, Iterable, Iterator, List, Tuple
+
+# IPFS add defaults, which Pinata uses for CIDv0 pins
+CHUNK_SIZE = 256 * 1024
+MAX_LINKS = 174
+
+# UnixFS Data.Type of a file node
+UNIXFS_FILE = 2
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def base58_encode(data: bytes) -> str:
+    """
+    Purpose:
+        Base58btc encode bytes, how CIDv0 is written
+    Args:
+        data - bytes to encode
+    Returns:
+        text - base58btc string
+    """
+    number = int.from_bytes(data, "big")
+    text = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        text = BASE58_ALPHABET[remainder] + text
+
+    # Leading zero bytes are kept as leading 1s
+    zeros = len(data) - len(data.lstrip(b"\0"))
+    return "1" * zeros + text
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _field(number: int, value: bytes) -> bytes:
+    # Length delimited protobuf field
+    return _varint(number << 3 | 2) + _varint(len(value)) + value
+
+
+def _uint_field(number: int, value: int) -> bytes:
+    return _varint(number << 3) + _varint(value)
+
+
+def _unixfs_file(data: bytes, filesize: int, blocksizes: Iterable[int] = ()) -> bytes:
+    message = _uint_field(1, UNIXFS_FILE)
+    if data:
+        message += _field(2, data)
+    message += _uint_field(3, filesize)
+    for blocksize in blocksizes:
+        message += _uint_field(4, blocksize)
+    return message
+
+
+def _dag_pb(data: bytes, links: Iterable[Tuple[bytes, int]] = ()) -> bytes:
+    # dag-pb writes links before data, each link as Hash, empty Name, Tsize
+    node = b""
+    for multihash, tsize in links:
+        node += _field(2, _field(1, multihash) + _field(2, b"") + _uint_field(3, tsize))
+    return node + _field(1, data)
+
+
+def _block(node: bytes) -> bytes:
+    # sha2-256 multihash, a CIDv0 is just this in base58
+    return b"\x12\x20" + hashlib.sha256(node).digest()
+
+
+def iter_chunks(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Purpose:
+        Fixed size chunks of a stream, one empty chunk for an empty stream
+    Args:
+        stream - binary stream
+        chunk_size - bytes per chunk
+    Returns:
+        chunks - generator of chunks
+    """
+    first = True
+    while True:
+        # Streams can return short reads, so fill each chunk
+        chunk = stream.read(chunk_size)
+        while chunk and len(chunk) < chunk_size:
+            more = stream.read(chunk_size - len(chunk))
+            if not more:
+                break
+            chunk += more
+
+        if chunk or first:
+            yield chunk
+        if len(chunk) < chunk_size:
+            return
+        first = False
+
+
+def stream_cid(
+    stream: BinaryIO, chunk_size: int = CHUNK_SIZE, max_links: int = MAX_LINKS
+) -> str:
+    """
+    Purpose:
+        CIDv0 of a stream as `ipfs add` would make it, a balanced UnixFS
+        dag-pb tree over fixed size chunks. Only one level of nodes is held
+        at a time, never the content.
+    Args:
+        stream - binary stream
+        chunk_size - chunker block size
+        max_links - children per node
+    Returns:
+        cid - base58 CIDv0, Qm...
+    """
+    # (multihash, tsize, filesize) per node on the current level
+    level: List[Tuple[bytes, int, int]] = []
+    for chunk in iter_chunks(stream, chunk_size):
+        node = _dag_pb(_unixfs_file(chunk, len(chunk)))
+        level.append((_block(node), len(node), len(chunk)))
+
+    while len(level) > 1:
+        parents = []
+        for start in range(0, len(level), max_links):
+            children = level[start : start + max_links]
+            filesizes = [filesize for _, _, filesize in children]
+            node = _dag_pb(
+                _unixfs_file(b"", sum(filesizes), filesizes),
+                [(multihash, tsize) for multihash, tsize, _ in children],
+            )
+            tsize = len(node) + sum(tsize for _, tsize, _ in children)
+            parents.append((_block(node), tsize, sum(filesizes)))
+        level = parents
+
+    return base58_encode(level[0][0])
+
+
+def file_cid(filepath: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Purpose:
+        CIDv0 of a file
+    Args:
+        filepath - file path
+        chunk_size - chunker block size
+    Returns:
+        cid - base58 CIDv0
+    """
+    with open(filepath, "rb") as stream:
+        return stream_cid(stream, chunk_size)
+
+
+def bytes_cid(data: bytes, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Purpose:
+        CIDv0 of bytes in memory
+    Args:
+        data - content
+        chunk_size - chunker block size
+    Returns:
+        cid - base58 CIDv0
+    """
+    import io
+
+    return stream_cid(io.BytesIO(data), chunk_size)
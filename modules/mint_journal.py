@@ -0,0 +1,310 @@
+# Python imports
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Local Python Library Imports
+from modules.receipt_decoder import decode_minted_tokenids
+
+QUEUED = "queued"
+SIGNED = "signed"
+SENT = "sent"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+# States that must be on disk before the txn is broadcast
+DURABLE_STATES = {SIGNED}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mint_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    hash TEXT,
+    nonce INTEGER,
+    tokenid INTEGER,
+    error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mint_jobs (
+    job_id TEXT PRIMARY KEY,
+    to_address TEXT,
+    token_uri TEXT,
+    from_address TEXT,
+    state TEXT NOT NULL,
+    hash TEXT,
+    nonce INTEGER,
+    raw_txn TEXT,
+    tokenid INTEGER,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mint_jobs_state ON mint_jobs (state);
+"""
+
+
+class MintJournal:
+    """
+    Purpose:
+        Crash-safe record of every mint job's state, mint_events is an
+        append-only log of transitions and mint_jobs holds the latest state.
+        The db runs in WAL mode with synchronous=NORMAL, so a commit is a
+        write to the WAL and fsyncs happen in batches at checkpoints. "signed"
+        rows (which carry the hash) are committed before the txn is sent,
+        other transitions are committed every commit_every records.
+    Args:
+        path - sqlite file path
+        commit_every - buffered transitions per commit
+    """
+
+    def __init__(self, path: str, commit_every: int = 100):
+        self.path = path
+        self.commit_every = commit_every
+
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def record(self, job_id: str, state: str, **fields: Any) -> None:
+        """
+        Purpose:
+            Record a state transition for a job
+        Args:
+            job_id - stable id of the job across runs
+            state - new state
+            fields - to_address, token_uri, from_address, hash, nonce,
+                raw_txn, tokenid or error
+        Returns:
+            N/A
+        """
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO mint_events "
+                "(job_id, state, hash, nonce, tokenid, error, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    state,
+                    fields.get("hash"),
+                    fields.get("nonce"),
+                    fields.get("tokenid"),
+                    fields.get("error"),
+                    now,
+                ),
+            )
+            # Keep earlier columns unless this transition sets them
+            self._conn.execute(
+                "INSERT INTO mint_jobs "
+                "(job_id, to_address, token_uri, from_address, state, hash, "
+                "nonce, raw_txn, tokenid, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET "
+                "to_address = COALESCE(excluded.to_address, to_address), "
+                "token_uri = COALESCE(excluded.token_uri, token_uri), "
+                "from_address = COALESCE(excluded.from_address, from_address), "
+                "state = excluded.state, "
+                "hash = COALESCE(excluded.hash, hash), "
+                "nonce = COALESCE(excluded.nonce, nonce), "
+                "raw_txn = COALESCE(excluded.raw_txn, raw_txn), "
+                "tokenid = excluded.tokenid, "
+                "error = excluded.error, "
+                "updated_at = excluded.updated_at",
+                (
+                    job_id,
+                    fields.get("to_address"),
+                    fields.get("token_uri"),
+                    fields.get("from_address"),
+                    state,
+                    fields.get("hash"),
+                    fields.get("nonce"),
+                    fields.get("raw_txn"),
+                    fields.get("tokenid"),
+                    fields.get("error"),
+                    now,
+                ),
+            )
+
+            self._uncommitted += 1
+            if state in DURABLE_STATES or self._uncommitted >= self.commit_every:
+                self._conn.commit()
+                self._uncommitted = 0
+
+    def flush(self) -> None:
+        """
+        Purpose:
+            Commit any buffered transitions
+        Args:
+            N/A
+        Returns:
+            N/A
+        """
+        with self._lock:
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def close(self) -> None:
+        """
+        Purpose:
+            Flush and close the journal
+        Args:
+            N/A
+        Returns:
+            N/A
+        """
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Purpose:
+            Latest state of a job
+        Args:
+            job_id - id of the job
+        Returns:
+            job - job row as a dict, None if never recorded
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT * FROM mint_jobs WHERE job_id = ?", (job_id,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+
+    def hashes(self, job_id: str) -> List[str]:
+        """
+        Purpose:
+            Every hash signed for a job, a fee bump signs a new one under the
+            same nonce and any of them may be the one that lands
+        Args:
+            job_id - id of the job
+        Returns:
+            hashes - hashes in the order they were signed
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT hash FROM mint_events "
+                "WHERE job_id = ? AND state = ? AND hash IS NOT NULL ORDER BY id",
+                (job_id, SIGNED),
+            ).fetchall()
+
+        return list(dict.fromkeys(row[0] for row in rows))
+
+    def jobs(self, state: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Purpose:
+            Latest state of every job
+        Args:
+            state - only jobs in this state, all if None
+        Returns:
+            jobs - generator of job rows as dicts
+        """
+        with self._lock:
+            if state is None:
+                cursor = self._conn.execute("SELECT * FROM mint_jobs")
+            else:
+                cursor = self._conn.execute(
+                    "SELECT * FROM mint_jobs WHERE state = ?", (state,)
+                )
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+
+        for row in rows:
+            yield dict(zip(columns, row))
+
+    def unfinished(self, jobs: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+        """
+        Purpose:
+            Drop jobs that are confirmed or still in flight from a job stream
+        Args:
+            jobs - (job_id, job) pairs
+        Returns:
+            jobs - generator of the (job_id, job) pairs that still need a mint
+        """
+        for job_id, job in jobs:
+            row = self.get(job_id)
+            if row is not None and row["state"] in (SIGNED, SENT, CONFIRMED):
+                continue
+            yield job_id, job
+
+
+def reconcile(journal: MintJournal, w3: Any) -> Dict[str, int]:
+    """
+    Purpose:
+        Check every signed/sent job against the chain after a crash. Mined
+        jobs become confirmed or failed, jobs whose nonce was used by another
+        txn become failed so they are minted again, anything else is
+        re-broadcast from its signed raw txn and left in flight.
+    Args:
+        journal - the mint journal
+        w3 - web3 instance
+    Returns:
+        counts - jobs moved to each state, plus "pending" left in flight
+    """
+    from web3.exceptions import TransactionNotFound
+
+    counts = {CONFIRMED: 0, FAILED: 0, "pending": 0}
+    mined_nonces: Dict[str, int] = {}
+
+    in_flight = list(journal.jobs(SIGNED)) + list(journal.jobs(SENT))
+    for job in in_flight:
+        receipt = None
+        for hash in journal.hashes(job["job_id"]) or [job["hash"]]:
+            try:
+                receipt = w3.eth.get_transaction_receipt(hash)
+                break
+            except TransactionNotFound:
+                continue
+
+        if receipt is not None:
+            if receipt["status"] == 1:
+                tokenids = decode_minted_tokenids(receipt)
+                if tokenids:
+                    journal.record(
+                        job["job_id"], CONFIRMED, hash=hash, tokenid=tokenids[0]
+                    )
+                else:
+                    # Mined, so it must not be minted again
+                    journal.record(
+                        job["job_id"],
+                        CONFIRMED,
+                        hash=hash,
+                        error="no Transfer event decoded",
+                    )
+                counts[CONFIRMED] += 1
+            else:
+                journal.record(job["job_id"], FAILED, hash=hash, error="reverted")
+                counts[FAILED] += 1
+            continue
+
+        address = job["from_address"]
+        if address not in mined_nonces:
+            mined_nonces[address] = w3.eth.get_transaction_count(address, "latest")
+
+        if job["nonce"] < mined_nonces[address]:
+            # The nonce is spent and none of our hashes landed, it was dropped
+            journal.record(job["job_id"], FAILED, error="dropped")
+            counts[FAILED] += 1
+        else:
+            # Never sent or still in the mempool, same nonce so no double mint,
+            # raw_txn is the latest fee bump
+            try:
+                w3.eth.send_raw_transaction(job["raw_txn"])
+            except Exception as error:
+                logging.info(f"Re-broadcast of {job['hash']} skipped: {error}")
+            counts["pending"] += 1
+
+    journal.flush()
+    logging.info(f"Reconciled mint journal: {counts}")
+
+    return counts
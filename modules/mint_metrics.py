@@ -0,0 +1,277 @@
+# Python imports
+import bisect
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = [
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1,
+    2,
+    5,
+    10,
+    30,
+    60,
+    float("inf"),
+]
+
+# Phases of a mint, in hot path order
+PHASES = ["nonce", "build", "sign", "send", "confirm"]
+
+
+class Histogram:
+    """
+    Purpose:
+        Fixed bucket latency histogram
+    Args:
+        N/A
+    """
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Purpose:
+            Add a sample
+        Args:
+            seconds - duration
+        Returns:
+            N/A
+        """
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """
+        Purpose:
+            Approximate quantile, the upper bound of the bucket it falls in
+        Args:
+            q - quantile from 0 to 1
+        Returns:
+            seconds - approximate duration
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Purpose:
+            Histogram as a JSON-able dict
+        Args:
+            N/A
+        Returns:
+            histogram - count, totals, quantiles and bucket counts
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                str(bound): count for bound, count in zip(BUCKETS, self.counts)
+            },
+        }
+
+
+class MintMetrics:
+    """
+    Purpose:
+        Per-phase durations and RPC counts for the mint hot path
+    Args:
+        N/A
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.rpc_counts: Counter = Counter()
+        self.mints = 0
+
+    def observe(self, phase: str, seconds: float) -> None:
+        """
+        Purpose:
+            Record a duration for a phase
+        Args:
+            phase - phase name, e.g. "sign"
+            seconds - duration
+        Returns:
+            N/A
+        """
+        with self._lock:
+            if phase not in self.histograms:
+                self.histograms[phase] = Histogram()
+            self.histograms[phase].observe(seconds)
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """
+        Purpose:
+            Time the wrapped block as a phase
+        Args:
+            phase - phase name, e.g. "sign"
+        Returns:
+            N/A
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def count_rpc(self, method: str) -> None:
+        """
+        Purpose:
+            Count an RPC call
+        Args:
+            method - JSON-RPC method
+        Returns:
+            N/A
+        """
+        with self._lock:
+            self.rpc_counts[method] += 1
+
+    def count_mint(self, count: int = 1) -> None:
+        """
+        Purpose:
+            Count submitted mints
+        Args:
+            count - tokens minted, more than one for a batch mint
+        Returns:
+            N/A
+        """
+        with self._lock:
+            self.mints += count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Purpose:
+            Current metrics as a JSON-able dict
+        Args:
+            N/A
+        Returns:
+            snapshot - phases, rpc counts and rpc calls per mint
+        """
+        with self._lock:
+            total_rpc = sum(self.rpc_counts.values())
+            return {
+                "mints": self.mints,
+                "phases": {
+                    phase: histogram.to_json()
+                    for phase, histogram in self.histograms.items()
+                },
+                "rpc_counts": dict(self.rpc_counts),
+                "rpc_per_mint": total_rpc / self.mints if self.mints else 0.0,
+            }
+
+    def export(self, sink: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Purpose:
+            Push a snapshot to a metrics sink
+        Args:
+            sink - function taking the snapshot dict
+        Returns:
+            N/A
+        """
+        sink(self.snapshot())
+
+
+class NullMetrics:
+    """
+    Purpose:
+        Metrics that record nothing, the default so the hot path pays nothing
+    Args:
+        N/A
+    """
+
+    enabled = False
+    _null_context = nullcontext()
+
+    def observe(self, phase: str, seconds: float) -> None:
+        pass
+
+    def phase(self, phase: str) -> Any:
+        return self._null_context
+
+    def count_rpc(self, method: str) -> None:
+        pass
+
+    def count_mint(self, count: int = 1) -> None:
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def log_sink(snapshot: Dict[str, Any]) -> None:
+    """
+    Purpose:
+        Metrics sink that logs one line per phase
+    Args:
+        snapshot - metrics snapshot
+    Returns:
+        N/A
+    """
+    logging.info(
+        f"Mint metrics: {snapshot['mints']} mints, "
+        f"{snapshot['rpc_per_mint']:.2f} rpc calls/mint"
+    )
+    for phase in PHASES:
+        if phase not in snapshot["phases"]:
+            continue
+        stats = snapshot["phases"][phase]
+        logging.info(
+            f"  {phase}: n={stats['count']} mean={stats['mean'] * 1000:.1f}ms "
+            f"p50<={stats['p50'] * 1000:.0f}ms p95<={stats['p95'] * 1000:.0f}ms "
+            f"p99<={stats['p99'] * 1000:.0f}ms"
+        )
+
+
+def rpc_metrics_middleware(metrics: MintMetrics) -> Callable:
+    """
+    Purpose:
+        web3 middleware that counts every RPC call into the metrics
+    Args:
+        metrics - metrics to count into
+    Returns:
+        middleware - web3 middleware factory
+    """
+
+    def middleware_factory(make_request: Callable, w3: Any) -> Callable:
+        def middleware(method: str, params: Any) -> Any:
+            metrics.count_rpc(method)
+            return make_request(method, params)
+
+        return middleware
+
+    return middleware_factory
@@ -1,29 +1,56 @@
 # Python imports
-import os
+import csv
 import json
 import logging
-from typing import Type, Union, Dict, Any, List
-
-from web3 import Web3
-
-
-def load_json(path_to_json: str) -> Dict[str, Any]:
-    """
-    Purpose:
-        Load json files
-    Args:
-        path_to_json (String): Path to  json file
-    Returns:
-        Conf: JSON file if loaded, else None
-    """
-    try:
-        with open(path_to_json, "r") as config_file:
-            conf = json.load(config_file)
-            return conf
-
-    except Exception as error:
-        logging.error(error)
-        raise TypeError("Invalid JSON file")
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import partial
+from typing import (
+    Dict,
+    Any,
+    Callable,
+    List,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+# Local Python Library Imports
+from modules.chain_client import ChainClient, get_chain_client
+from modules.fee_bumper import FeeBumper
+from modules.gas_estimator import uri_bucket
+from modules.mint_journal import (
+    CONFIRMED,
+    FAILED,
+    QUEUED,
+    SENT,
+    SIGNED,
+    MintJournal,
+)
+from modules.mint_metrics import MintMetrics, rpc_metrics_middleware
+from modules.mint_tracker import (
+    ConfirmationTracker,
+    MintBatchHandle,
+    MintHandle,
+    MintReverted,
+    SendUncertain,
+)
+from modules.nonce_manager import (
+    NonceManager,
+    is_already_known,
+    is_nonce_too_low,
+    is_rejected,
+)
+from modules.receipt_decoder import decode_minted_tokenids
+from modules.signer_pool import SignerPool
+from modules.ws_confirmations import SubscriptionTracker
+
+# Every txn pays this before any contract code runs
+BASE_TXN_GAS = 21000
+
+# Gas per mintBatch txn, well under Polygon's 30M block gas limit
+DEFAULT_BATCH_GAS_BUDGET = 8_000_000
 
 
 def set_up_blockchain(
@@ -33,6 +60,9 @@ def set_up_blockchain(
     private_key: str,
     infura_key: str,
     network: str,
+    rpc_urls: Optional[List[str]] = None,
+    broadcast: bool = False,
+    transport: str = "http",
 ):
     """
     Purpose:
@@ -44,121 +74,827 @@ def set_up_blockchain(
         private_key: private key,
         infura_key: infura key,
         network: network,
+        rpc_urls: extra JSON-RPC urls to pool with infura,
+        broadcast: send mints to every pooled url at once,
+        transport: "http", or "ws" to confirm mints from a newHeads
+            subscription instead of polling receipts,
     Returns:
-        Conf: JSON file with eth details
+        Conf: JSON file with eth details, backed by the shared chain client
     """
     ############ Ethereum Setup ############
 
-    PUBLIC_KEY = public_key
-    PRIVATE_KEY = Web3.toBytes(hexstr=private_key)
-    INFURA_KEY = infura_key
+    client = get_chain_client(
+        contract, abi_path, infura_key, network, rpc_urls, broadcast, transport
+    )
+
+    return client_eth_json(client, public_key, private_key)
+
 
-    network = network
-    ABI = None
-    CODE_NFT = None
-    CHAIN_ID = None
-    w3 = None
-    open_sea_url = ""
-    scan_url = ""
+def client_eth_json(
+    client: ChainClient, public_key: str, private_key: str
+) -> Dict[str, Any]:
+    """
+    Purpose:
+       Build the eth_json for a wallet on a chain client
+    Args:
+        client: chain client
+        public_key: public key,
+        private_key: private key,
+    Returns:
+        Conf: JSON file with eth details
+    """
+    from web3 import Web3
 
     eth_json = {}
+    eth_json["client"] = client
+    eth_json["w3"] = client.w3
+    eth_json["contract"] = client.contract
+    eth_json["chain_id"] = client.chain_id
+    eth_json["open_sea_url"] = client.open_sea_url
+    eth_json["scan_url"] = client.scan_url
+    eth_json["fee_oracle"] = client.fee_oracle
+    eth_json["gas_estimator"] = client.gas_estimator
+    eth_json["public_key"] = public_key
+    eth_json["private_key"] = Web3.toBytes(hexstr=private_key)
 
-    if network == "rinkeby":
+    return eth_json
 
-        RINK_API_URL = f"https://rinkeby.infura.io/v3/{INFURA_KEY}"
 
-        w3 = Web3(Web3.HTTPProvider(RINK_API_URL))
-        ABI = load_json(abi_path)["abi"]  # get the ABI
-        CODE_NFT = w3.eth.contract(address=contract, abi=ABI)  # The contract
-        CHAIN_ID = 4
+def read_mint_jobs(input_file: str) -> Iterator[Tuple[str, str]]:
+    """
+    Purpose:
+        Stream mint jobs from a CSV or JSONL file, one row at a time
+    Args:
+        input_file - CSV with a header row, or JSONL with one object per line,
+            both with to_address and token_metadata_url fields
+    Returns:
+        jobs - generator of (to_address, token_metadata_url) pairs
+    """
+    with open(input_file, "r", newline="") as job_file:
+        if input_file.endswith(".csv"):
+            rows = csv.DictReader(job_file)
+        else:
+            rows = (json.loads(line) for line in job_file if line.strip())
 
-        open_sea_url = f"https://testnets.opensea.io/assets/{contract}/"
-        scan_url = "https://rinkeby.etherscan.io/tx/"
+        for row in rows:
+            yield row["to_address"], row["token_metadata_url"]
 
-    elif network == "mumbai":
-        MUMBAI_API_URL = f"https://polygon-mumbai.infura.io/v3/{INFURA_KEY}"
 
-        w3 = Web3(Web3.HTTPProvider(MUMBAI_API_URL))
-        ABI = load_json(abi_path)["abi"]  # get the ABI
-        CODE_NFT = w3.eth.contract(address=contract, abi=ABI)  # The contract
-        CHAIN_ID = 80001
+def mint_gas_shape(tokenURI: str, eth_json: Dict[str, Any]) -> Tuple[str, str, int]:
+    """
+    Purpose:
+        get the gas estimate cache key for a mint
+    Args:
+        tokenURI - uri for token
+        eth_json - blockchain info
+    Returns:
+        shape - (contract, function, tokenURI length bucket)
+    """
+    return (eth_json["contract"].address, "mint", uri_bucket(tokenURI))
 
-        open_sea_url = f"https://testnets.opensea.io/assets/{contract}/"
-        scan_url = "https://explorer-mumbai.maticvigil.com/tx/"
 
-    elif network == "matic_main":
-        POLYGON_API_URL = f"https://polygon-mainnet.infura.io/v3/{INFURA_KEY}"
+def build_mint_txn(
+    userAddress: str, tokenURI: str, eth_json: Dict[str, Any], nonce: int
+) -> Dict[str, Any]:
+    """
+    Purpose:
+        build an unsigned mint txn
+    Args:
+        userAddress - the user to mint for
+        tokenURI - uri for token
+        eth_json - blockchain info
+        nonce - nonce to use
+    Returns:
+        mint_txn - unsigned mint txn
+    """
 
-        w3 = Web3(Web3.HTTPProvider(POLYGON_API_URL))
-        ABI = load_json(abi_path)["abi"]  # get the ABI
-        CODE_NFT = w3.eth.contract(address=contract, abi=ABI)  # The contract
-        CHAIN_ID = 137
+    CHAIN_ID = eth_json["chain_id"]
+    CODE_NFT = eth_json["contract"]
 
-        open_sea_url = f"https://opensea.io/assets/matic/{contract}/"
-        scan_url = "https://polygonscan.com/tx/"
+    with eth_json["client"].metrics.phase("build"):
+        mint_function = CODE_NFT.functions.mint(userAddress, tokenURI)
+        gas = eth_json["gas_estimator"].gas_limit(
+            mint_function,
+            {"from": eth_json["public_key"]},
+            mint_gas_shape(tokenURI, eth_json),
+        )
 
-    else:
-        logging.error("Invalid network")
-        raise ValueError(f"Invalid {network}")
+        # Create the contracrt
+        mint_txn = mint_function.buildTransaction(
+            {
+                "chainId": CHAIN_ID,
+                "gas": gas,
+                "nonce": nonce,
+                **eth_json["fee_oracle"].fee_params(),
+            }
+        )
 
-    logging.info(f"checking if connected to infura...{w3.isConnected()}")
+    return mint_txn
 
-    eth_json["w3"] = w3
-    eth_json["contract"] = CODE_NFT
-    eth_json["chain_id"] = CHAIN_ID
-    eth_json["open_sea_url"] = open_sea_url
-    eth_json["scan_url"] = scan_url
-    eth_json["public_key"] = PUBLIC_KEY
-    eth_json["private_key"] = PRIVATE_KEY
 
-    return eth_json
+def sign_txn(txn: Dict[str, Any], eth_json: Dict[str, Any]):
+    """
+    Purpose:
+        sign a txn with the wallet's private key
+    Args:
+        txn - unsigned txn
+        eth_json - blockchain info
+    Returns:
+        signed_txn - signed txn
+    """
+    w3 = eth_json["w3"]
+    PRIVATE_KEY = eth_json["private_key"]
 
+    with eth_json["client"].metrics.phase("sign"):
+        return w3.eth.account.sign_transaction(txn, private_key=PRIVATE_KEY)
 
-def web3_mint(userAddress: str, tokenURI: str, eth_json: Dict[str, Any]) -> str:
+
+def sign_mint(userAddress: str, tokenURI: str, eth_json: Dict[str, Any], nonce: int):
     """
     Purpose:
-        mint a token for user on blockchain
+        build and sign a mint txn without sending it
     Args:
         userAddress - the user to mint for
         tokenURI - uri for token
         eth_json - blockchain info
+        nonce - nonce to sign with
+    Returns:
+        signed_txn - signed mint txn
+    """
+    return sign_txn(build_mint_txn(userAddress, tokenURI, eth_json, nonce), eth_json)
+
+
+def send_mint(signed_txn: Any, eth_json: Dict[str, Any]) -> str:
+    """
+    Purpose:
+        send a signed mint txn
+    Args:
+        signed_txn - signed mint txn
+        eth_json - blockchain info
     Returns:
         hash - txn of mint
+    """
+    w3 = eth_json["w3"]
+    hash = w3.toHex(w3.keccak(signed_txn.rawTransaction))
+
+    try:
+        w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+    except Exception as error:
+        # This exact txn is already in the mempool, e.g. an earlier send
+        # timed out after the node took it, so the send did happen
+        if not is_already_known(error):
+            raise
+        logging.info(f"mint txn {hash} already known")
+
+    logging.info(f"mint txn hash: {hash} ")
+
+    return hash
+
+
+def get_tokenid(receipt: Any) -> int:
+    """
+    Purpose:
+        get the token id from a mint receipt
+    Args:
+        receipt - receipt of the mint txn
+    Returns:
         tokenid - token minted
     """
+    tokenids = decode_minted_tokenids(receipt)
+    if not tokenids:
+        raise ValueError(f"No mint in txn {receipt['transactionHash'].hex()}")
 
-    PUBLIC_KEY = eth_json["public_key"]
-    CHAIN_ID = eth_json["chain_id"]
+    return tokenids[0]
+
+
+def get_batch_tokenids(receipt: Any, count: int) -> List[int]:
+    """
+    Purpose:
+        get every token id from a mintBatch receipt
+    Args:
+        receipt - receipt of the mintBatch txn
+        count - tokens the batch was sent to mint
+    Returns:
+        tokenids - tokens minted, in job order
+    """
+    tokenids = decode_minted_tokenids(receipt)
+    if len(tokenids) != count:
+        raise ValueError(
+            f"mint txn {receipt['transactionHash'].hex()} minted "
+            f"{len(tokenids)} of {count} tokens"
+        )
+
+    return tokenids
+
+
+def web3_mint(userAddress: str, tokenURI: str, eth_json: Dict[str, Any]) -> str:
+    """
+    Purpose:
+        mint a token for user on blockchain and wait for it
+    Args:
+        userAddress - the user to mint for
+        tokenURI - uri for token
+        eth_json - blockchain info
+    Returns:
+        hash - txn of mint
+    """
+
+    handle = web3_submit_mint(userAddress, tokenURI, eth_json)
+    handle.result()
+
+    return handle.hash
+
+
+def get_nonce_manager(eth_json: Dict[str, Any]) -> NonceManager:
+    """
+    Purpose:
+        get the nonce manager for the minting account, shared per client
+    Args:
+        eth_json - blockchain info
+    Returns:
+        nonce_manager - shared nonce counter
+    """
+    return eth_json["client"].nonce_manager(eth_json["public_key"])
+
+
+def submit_mint(
+    userAddress: str,
+    tokenURI: str,
+    eth_json: Dict[str, Any],
+    on_signed: Optional[Callable[[Any, int], None]] = None,
+) -> Tuple[str, int]:
+    """
+    Purpose:
+        sign and send a mint with a nonce from the local counter, the counter
+        is resynced and the mint retried once if the nonce was too low
+    Args:
+        userAddress - the user to mint for
+        tokenURI - uri for token
+        eth_json - blockchain info
+        on_signed - called with (signed_txn, nonce) before each send
+    Returns:
+        hash - txn of mint
+        nonce - nonce used
+    """
+    hash, nonce, _ = _send_with_nonce(
+        lambda nonce: build_mint_txn(userAddress, tokenURI, eth_json, nonce),
+        eth_json,
+        on_signed,
+    )
+
+    return hash, nonce
+
+
+def _send_with_nonce(
+    build: Callable[[int], Dict[str, Any]],
+    eth_json: Dict[str, Any],
+    on_signed: Optional[Callable[[Any, int], None]],
+) -> Tuple[str, int, Dict[str, Any]]:
+    nonce_manager = get_nonce_manager(eth_json)
+    metrics = eth_json["client"].metrics
+
+    for attempt in range(2):
+        with metrics.phase("nonce"):
+            nonce = nonce_manager.next_nonce()
+        try:
+            txn = build(nonce)
+            signed_txn = sign_txn(txn, eth_json)
+        except Exception:
+            # Never left this process, reuse the nonce
+            nonce_manager.release(nonce)
+            raise
+        if on_signed is not None:
+            on_signed(signed_txn, nonce)
+
+        try:
+            with metrics.phase("send"):
+                return send_mint(signed_txn, eth_json), nonce, txn
+        except Exception as error:
+            if is_nonce_too_low(error):
+                nonce_manager.resync()
+                if attempt == 0:
+                    logging.warning(f"Nonce {nonce} too low, retrying")
+                    continue
+                raise
+            if not is_rejected(error):
+                # The node may have taken it, so the nonce stays used
+                hash = eth_json["w3"].toHex(signed_txn.hash)
+                logging.warning(f"Send of nonce {nonce} failed in transit: {error}")
+                raise SendUncertain(hash, nonce, error) from error
+            # Reuse the nonce if nothing later was handed out yet
+            nonce_manager.release(nonce)
+            raise
+
+
+def get_tracker(eth_json: Dict[str, Any]) -> ConfirmationTracker:
+    """
+    Purpose:
+        get the receipt tracker for this chain, shared per client
+    Args:
+        eth_json - blockchain info
+    Returns:
+        tracker - shared confirmation tracker
+    """
+    client = eth_json["client"]
+
+    if client.tracker is None:
+
+        def on_revert(handle: MintHandle) -> None:
+            # Most likely out of gas, re-estimate this shape on the next mint
+            if isinstance(handle, MintBatchHandle):
+                for token_uri in handle.token_uris:
+                    client.gas_estimator.invalidate(
+                        (client.contract.address, "mintBatch", uri_bucket(token_uri))
+                    )
+            else:
+                client.gas_estimator.invalidate(
+                    (client.contract.address, "mint", uri_bucket(handle.token_uri))
+                )
+
+        if client.ws_url:
+            client.tracker = SubscriptionTracker(
+                client.w3, client.ws_url, get_tokenid, on_revert=on_revert
+            )
+        else:
+            client.tracker = ConfirmationTracker(
+                client.w3, get_tokenid, on_revert=on_revert
+            )
+
+    return client.tracker
+
+
+def web3_submit_mint(
+    userAddress: str,
+    tokenURI: str,
+    eth_json: Dict[str, Any],
+    on_signed: Optional[Callable[[Any, int], None]] = None,
+) -> MintHandle:
+    """
+    Purpose:
+        send a mint and return right away, the token id resolves later
+    Args:
+        userAddress - the user to mint for
+        tokenURI - uri for token
+        eth_json - blockchain info
+        on_signed - called with (signed_txn, nonce) before each send
+    Returns:
+        handle - future with the hash, resolves to the token id
+    """
+    hash, nonce, txn = _send_with_nonce(
+        lambda nonce: build_mint_txn(userAddress, tokenURI, eth_json, nonce),
+        eth_json,
+        on_signed,
+    )
+    handle = MintHandle(hash, nonce, userAddress, tokenURI, eth_json["public_key"])
+
+    metrics = eth_json["client"].metrics
+    if metrics.enabled:
+        metrics.count_mint()
+        sent_at = time.perf_counter()
+        handle.add_done_callback(
+            lambda _: metrics.observe("confirm", time.perf_counter() - sent_at)
+        )
+
+    return _track(handle, txn, eth_json, on_signed)
+
+
+def _track(
+    handle: MintHandle,
+    txn: Dict[str, Any],
+    eth_json: Dict[str, Any],
+    on_signed: Optional[Callable[[Any, int], None]],
+) -> MintHandle:
+    get_tracker(eth_json).track(handle)
+
+    fee_bumper = eth_json["client"].fee_bumper
+    if fee_bumper is not None:
+        fee_bumper.watch(handle, txn, eth_json["private_key"], on_signed)
+
+    return handle
+
+
+def enable_fee_bumping(
+    eth_json: Dict[str, Any],
+    bump_after_blocks: int = 10,
+    bump_factor: float = 1.125,
+    max_bumps: int = 5,
+    max_fee_per_gas: Optional[int] = None,
+) -> FeeBumper:
+    """
+    Purpose:
+        re-sign mints stuck in the mempool with higher fees, see FeeBumper
+    Args:
+        eth_json - blockchain info
+        bump_after_blocks - blocks a txn may sit unmined before a bump
+        bump_factor - fee multiplier per bump, at least 1.1
+        max_bumps - give up bumping a txn after this many replacements
+        max_fee_per_gas - never bump fees past this many wei, None for no cap
+    Returns:
+        fee_bumper - the client's fee bumper
+    """
+    client = eth_json["client"]
+
+    if client.fee_bumper is None:
+        client.fee_bumper = FeeBumper(
+            client.w3,
+            client.fee_oracle,
+            get_tracker(eth_json),
+            bump_after_blocks=bump_after_blocks,
+            bump_factor=bump_factor,
+            max_bumps=max_bumps,
+            max_fee_per_gas=max_fee_per_gas,
+        )
+
+    return client.fee_bumper
+
+
+def enable_metrics(eth_json: Dict[str, Any]) -> MintMetrics:
+    """
+    Purpose:
+        turn on per-phase timing and RPC counting for this chain client
+    Args:
+        eth_json - blockchain info
+    Returns:
+        metrics - the client's metrics, export with metrics.export(sink)
+    """
+    client = eth_json["client"]
+
+    if not client.metrics.enabled:
+        client.metrics = MintMetrics()
+        client.w3.middleware_onion.add(
+            rpc_metrics_middleware(client.metrics), "mint_metrics"
+        )
+
+    return client.metrics
+
+
+def _mint_result(handle: MintHandle) -> Dict[str, Any]:
+    result = {
+        "job_id": handle.job_id,
+        "to_address": handle.to_address,
+        "token_uri": handle.token_uri,
+        "from_address": handle.from_address,
+        "hash": handle.hash,
+        "nonce": handle.nonce,
+        "tokenid": None,
+        "error": None,
+    }
+
+    error = handle.exception()
+    if error is None:
+        result["tokenid"] = handle.result()
+    else:
+        result["error"] = str(error)
+
+    return result
+
+
+def _submit_failed_result(
+    job_id: str, userAddress: str, tokenURI: str, from_address: str, error: Exception
+) -> Dict[str, Any]:
+    logging.error(f"Submitting mint {job_id} failed: {error}")
+    return {
+        "job_id": job_id,
+        "to_address": userAddress,
+        "token_uri": tokenURI,
+        "from_address": from_address,
+        "hash": getattr(error, "hash", None),
+        "nonce": getattr(error, "nonce", None),
+        "tokenid": None,
+        "error": str(error),
+    }
+
+
+def _journal_hooks(
+    journal: MintJournal, job_id: str, userAddress: str, tokenURI: str, eth_json
+) -> Tuple[Callable[[Any, int], None], Callable[[MintHandle], None]]:
     w3 = eth_json["w3"]
-    CODE_NFT = eth_json["contract"]
-    PRIVATE_KEY = eth_json["private_key"]
 
-    nonce = w3.eth.get_transaction_count(PUBLIC_KEY)
-    # logging.info(f"Nonce: {w3.eth.get_transaction_count(PUBLIC_KEY)}")
+    def on_signed(signed_txn: Any, nonce: int) -> None:
+        journal.record(
+            job_id,
+            SIGNED,
+            to_address=userAddress,
+            token_uri=tokenURI,
+            from_address=eth_json["public_key"],
+            hash=w3.toHex(signed_txn.hash),
+            nonce=nonce,
+            raw_txn=w3.toHex(signed_txn.rawTransaction),
+        )
+
+    def on_done(handle: MintHandle) -> None:
+        error = handle.exception()
+        if error is None:
+            # hash is whichever of the competing fee bumps landed
+            journal.record(job_id, CONFIRMED, hash=handle.hash, tokenid=handle.result())
+        elif isinstance(error, MintReverted):
+            journal.record(job_id, FAILED, hash=handle.hash, error=str(error))
+        elif handle.receipt is not None:
+            # Mined fine, only the token id could not be read from the receipt
+            journal.record(job_id, CONFIRMED, hash=handle.hash, error=str(error))
+        else:
+            # Timed out or lost track, the txn may still be mined, so leave it
+            # in flight for reconcile() to settle by receipt and nonce
+            logging.warning(f"Job {job_id} left in flight: {error}")
+
+    return on_signed, on_done
+
+
+def web3_bulk_mint(
+    mint_jobs: Iterable[Tuple[str, str]],
+    eth_json: Dict[str, Any],
+    max_in_flight: int = 50,
+    signer_pool: Optional[SignerPool] = None,
+    journal: Optional[MintJournal] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Purpose:
+        mint many tokens, keeping up to max_in_flight txns pending at once
+    Args:
+        mint_jobs - (userAddress, tokenURI) pairs to mint
+        eth_json - blockchain info
+        max_in_flight - max txns sent but not yet confirmed
+        signer_pool - spread mints over these wallets, each with its own
+            nonce lane and in-flight limit, mint from eth_json's wallet if None
+        journal - record every job's state here, job ids are the positions in
+            mint_jobs, and jobs already confirmed or in flight are skipped
+    Returns:
+        results - generator of dicts with the job, hash, nonce, tokenid and
+            error, in the order the mints confirm. A job that could not be
+            sent gets a dict with its error, and a hash if the send may have
+            reached the node anyway, the rest go on.
+    """
+    pending = set()
+
+    jobs = ((str(index), job) for index, job in enumerate(mint_jobs))
+    if journal is not None:
+        jobs = journal.unfinished(jobs)
 
-    # Create the contracrt
-    mint_txn = CODE_NFT.functions.mint(userAddress, tokenURI).buildTransaction(
-        {
-            "chainId": CHAIN_ID,
-            "gas": 10000000,
-            "gasPrice": w3.toWei("1", "gwei"),
-            "nonce": nonce,
-        }
+    # Anything that stops the loop early still waits out the sent mints
+    stopped = None
+    try:
+        for job_id, (userAddress, tokenURI) in jobs:
+            lane = signer_pool.acquire() if signer_pool is not None else None
+            job_json = lane.eth_json if lane is not None else eth_json
+
+            on_signed = on_done = None
+            if journal is not None:
+                journal.record(
+                    job_id, QUEUED, to_address=userAddress, token_uri=tokenURI
+                )
+                on_signed, on_done = _journal_hooks(
+                    journal, job_id, userAddress, tokenURI, job_json
+                )
+
+            try:
+                handle = web3_submit_mint(userAddress, tokenURI, job_json, on_signed)
+            except Exception as error:
+                if lane is not None:
+                    signer_pool.release(lane)
+                # A send that may have reached the node stays SIGNED
+                if journal is not None and not isinstance(error, SendUncertain):
+                    journal.record(job_id, FAILED, error=str(error))
+                yield _submit_failed_result(
+                    job_id, userAddress, tokenURI, job_json["public_key"], error
+                )
+                continue
+
+            handle.job_id = job_id
+            if journal is not None:
+                journal.record(job_id, SENT, hash=handle.hash)
+                handle.add_done_callback(on_done)
+            if lane is not None:
+                handle.add_done_callback(lambda _, lane=lane: signer_pool.release(lane))
+            pending.add(handle)
+
+            # Only block once the window is full
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for handle in done:
+                    yield _mint_result(handle)
+    except Exception as error:
+        stopped = error
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for handle in done:
+            yield _mint_result(handle)
+
+    if journal is not None:
+        journal.flush()
+    if stopped is not None:
+        raise stopped
+
+
+def batch_token_gas(userAddress: str, tokenURI: str, eth_json: Dict[str, Any]) -> int:
+    """
+    Purpose:
+        get the gas one token adds to a mintBatch txn, from a cached estimate
+        of a one token batch with the base txn cost taken off
+    Args:
+        userAddress - the user to mint for
+        tokenURI - uri for token
+        eth_json - blockchain info
+    Returns:
+        gas - gas for the token, with the estimator's safety margin
+    """
+    CODE_NFT = eth_json["contract"]
+    gas_estimator = eth_json["gas_estimator"]
+
+    gas = gas_estimator.gas_limit(
+        CODE_NFT.functions.mintBatch([userAddress], [tokenURI]),
+        {"from": eth_json["public_key"]},
+        (CODE_NFT.address, "mintBatch", uri_bucket(tokenURI)),
     )
 
-    signed_txn = w3.eth.account.sign_transaction(mint_txn, private_key=PRIVATE_KEY)
+    # The margin is only for the contract's work, the base cost is exact
+    return gas - int(BASE_TXN_GAS * gas_estimator.margin)
 
-    w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-    hash = w3.toHex(w3.keccak(signed_txn.rawTransaction))
 
-    logging.info(f"mint txn hash: {hash} ")
+def chunk_mint_jobs(
+    mint_jobs: Iterable[Tuple[str, str]],
+    eth_json: Dict[str, Any],
+    gas_budget: int = DEFAULT_BATCH_GAS_BUDGET,
+    max_batch_size: int = 500,
+) -> Iterator[Tuple[List[Tuple[str, str]], int]]:
+    """
+    Purpose:
+        split mint jobs into mintBatch sized chunks that fit a gas budget
+    Args:
+        mint_jobs - (userAddress, tokenURI) pairs to mint
+        eth_json - blockchain info
+        gas_budget - max gas per mintBatch txn
+        max_batch_size - max tokens per mintBatch txn
+    Returns:
+        chunks - generator of (jobs, gas limit) pairs
+    """
+    chunk: List[Tuple[str, str]] = []
+    gas = BASE_TXN_GAS
 
-    receipt = w3.eth.wait_for_transaction_receipt(hash)  # hmmm have to wait...
+    for userAddress, tokenURI in mint_jobs:
+        token_gas = batch_token_gas(userAddress, tokenURI, eth_json)
 
-    hex_tokenid = receipt["logs"][0]["topics"][3].hex()  # this is token id in hex
+        if chunk and (gas + token_gas > gas_budget or len(chunk) >= max_batch_size):
+            yield chunk, gas
+            chunk, gas = [], BASE_TXN_GAS
 
-    # convert from hex to decmial
-    tokenid = int(hex_tokenid, 16)
-    logging.info(f"Got tokenid: {tokenid}")
+        chunk.append((userAddress, tokenURI))
+        gas += token_gas
 
-    return hash
+    if chunk:
+        yield chunk, gas
+
+
+def build_mint_batch_txn(
+    mint_jobs: List[Tuple[str, str]], gas: int, eth_json: Dict[str, Any], nonce: int
+) -> Dict[str, Any]:
+    """
+    Purpose:
+        build an unsigned mintBatch txn
+    Args:
+        mint_jobs - (userAddress, tokenURI) pairs in the batch
+        gas - gas limit for the txn
+        eth_json - blockchain info
+        nonce - nonce to use
+    Returns:
+        mint_txn - unsigned mintBatch txn
+    """
+    CODE_NFT = eth_json["contract"]
+
+    with eth_json["client"].metrics.phase("build"):
+        to_addresses = [userAddress for userAddress, _ in mint_jobs]
+        token_uris = [tokenURI for _, tokenURI in mint_jobs]
+        mint_txn = CODE_NFT.functions.mintBatch(
+            to_addresses, token_uris
+        ).buildTransaction(
+            {
+                "chainId": eth_json["chain_id"],
+                "gas": gas,
+                "nonce": nonce,
+                **eth_json["fee_oracle"].fee_params(),
+            }
+        )
+
+    return mint_txn
+
+
+def web3_submit_mint_batch(
+    mint_jobs: List[Tuple[str, str]],
+    gas: int,
+    eth_json: Dict[str, Any],
+    on_signed: Optional[Callable[[Any, int], None]] = None,
+) -> MintBatchHandle:
+    """
+    Purpose:
+        send a mintBatch and return right away, the token ids resolve later
+    Args:
+        mint_jobs - (userAddress, tokenURI) pairs in the batch
+        gas - gas limit for the txn, see chunk_mint_jobs
+        eth_json - blockchain info
+        on_signed - called with (signed_txn, nonce) before each send
+    Returns:
+        handle - future with the hash, resolves to the token ids in job order
+    """
+    hash, nonce, txn = _send_with_nonce(
+        lambda nonce: build_mint_batch_txn(mint_jobs, gas, eth_json, nonce),
+        eth_json,
+        on_signed,
+    )
+    handle = MintBatchHandle(
+        hash,
+        nonce,
+        [userAddress for userAddress, _ in mint_jobs],
+        [tokenURI for _, tokenURI in mint_jobs],
+        eth_json["public_key"],
+        partial(get_batch_tokenids, count=len(mint_jobs)),
+    )
+
+    metrics = eth_json["client"].metrics
+    if metrics.enabled:
+        metrics.count_mint(len(mint_jobs))
+        sent_at = time.perf_counter()
+        handle.add_done_callback(
+            lambda _: metrics.observe("confirm", time.perf_counter() - sent_at)
+        )
+
+    return _track(handle, txn, eth_json, on_signed)
+
+
+def _mint_batch_results(handle: MintBatchHandle) -> Iterator[Dict[str, Any]]:
+    error = handle.exception()
+    tokenids = handle.result() if error is None else [None] * len(handle.token_uris)
+
+    for index, (to_address, token_uri, tokenid) in enumerate(
+        zip(handle.to_addresses, handle.token_uris, tokenids)
+    ):
+        yield {
+            "job_id": str(handle.job_id + index),
+            "to_address": to_address,
+            "token_uri": token_uri,
+            "from_address": handle.from_address,
+            "hash": handle.hash,
+            "nonce": handle.nonce,
+            "tokenid": tokenid,
+            "error": str(error) if error is not None else None,
+        }
+
+
+def web3_bulk_mint_batched(
+    mint_jobs: Iterable[Tuple[str, str]],
+    eth_json: Dict[str, Any],
+    gas_budget: int = DEFAULT_BATCH_GAS_BUDGET,
+    max_in_flight: int = 4,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Purpose:
+        mint many tokens with mintBatch, chunked to a gas budget per txn
+    Args:
+        mint_jobs - (userAddress, tokenURI) pairs to mint
+        eth_json - blockchain info
+        gas_budget - max gas per mintBatch txn
+        max_in_flight - max mintBatch txns sent but not yet confirmed
+    Returns:
+        results - generator of per token dicts like web3_bulk_mint, in the
+            order the batches confirm. Every token of a batch that could not
+            be sent gets a dict with the error, the other batches go on.
+    """
+    pending = set()
+    job_index = 0
+
+    # Anything that stops the loop early still waits out the sent batches
+    stopped = None
+    try:
+        for chunk, gas in chunk_mint_jobs(mint_jobs, eth_json, gas_budget):
+            first_job, job_index = job_index, job_index + len(chunk)
+            try:
+                handle = web3_submit_mint_batch(chunk, gas, eth_json)
+            except Exception as error:
+                for index, (userAddress, tokenURI) in enumerate(chunk):
+                    yield _submit_failed_result(
+                        str(first_job + index),
+                        userAddress,
+                        tokenURI,
+                        eth_json["public_key"],
+                        error,
+                    )
+                continue
+
+            # Job ids stay the positions in mint_jobs, like web3_bulk_mint
+            handle.job_id = first_job
+            logging.info(f"mintBatch of {len(chunk)} tokens, gas limit {gas}")
+            pending.add(handle)
+
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for handle in done:
+                    yield from _mint_batch_results(handle)
+    except Exception as error:
+        stopped = error
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for handle in done:
+            yield from _mint_batch_results(handle)
+
+    if stopped is not None:
+        raise stopped
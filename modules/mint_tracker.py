@@ -0,0 +1,288 @@
+# Python imports
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+
+class MintReverted(RuntimeError):
+    """
+    Purpose:
+        A mint txn was mined with status 0, unlike a timeout this is final
+    """
+
+
+class SendUncertain(RuntimeError):
+    """
+    Purpose:
+        A send failed in transit, e.g. timed out, so the node may still have
+        the txn. Its nonce is kept and the journal left at SIGNED for
+        reconcile() to settle by receipt and nonce.
+    Args:
+        hash - hash of the signed txn
+        nonce - nonce it was signed with
+        error - the transport error
+    """
+
+    def __init__(self, hash: str, nonce: int, error: Exception):
+        super().__init__(f"send of {hash} may not have reached the node: {error}")
+        self.hash = hash
+        self.nonce = nonce
+
+
+class MintHandle(Future):
+    """
+    Purpose:
+        Future for a sent mint txn, resolves to the token id once the
+        receipt lands
+    Args:
+        hash - txn of mint
+        nonce - nonce used
+        to_address - the user to mint for
+        token_uri - uri for token
+        from_address - wallet that signed the mint
+        get_tokenid - function to get the result from the receipt, the
+            tracker's get_tokenid if None
+    """
+
+    def __init__(
+        self,
+        hash: str,
+        nonce: int,
+        to_address: str,
+        token_uri: str,
+        from_address: str = "",
+        get_tokenid: Optional[Callable[[Any], Any]] = None,
+    ):
+        super().__init__()
+        self.hash = hash
+        self.nonce = nonce
+        self.to_address = to_address
+        self.token_uri = token_uri
+        self.from_address = from_address
+        self.get_tokenid = get_tokenid
+        self.job_id = None
+        self.receipt = None
+        # Every hash sent for this nonce, fee bumps add to it, and hash
+        # becomes the one that landed
+        self.hashes = [hash]
+
+
+class MintBatchHandle(MintHandle):
+    """
+    Purpose:
+        Future for a sent mintBatch txn, resolves to the list of token ids in
+        the order of token_uris
+    Args:
+        hash - txn of mint
+        nonce - nonce used
+        to_addresses - the users to mint for
+        token_uris - uris for the tokens
+        from_address - wallet that signed the mint
+        get_tokenids - function to get the token ids from the receipt
+    """
+
+    def __init__(
+        self,
+        hash: str,
+        nonce: int,
+        to_addresses: List[str],
+        token_uris: List[str],
+        from_address: str = "",
+        get_tokenids: Optional[Callable[[Any], List[int]]] = None,
+    ):
+        super().__init__(hash, nonce, "", "", from_address, get_tokenids)
+        self.to_addresses = to_addresses
+        self.token_uris = token_uris
+
+
+class ConfirmationTracker:
+    """
+    Purpose:
+        Resolve many pending mint handles from one polling thread, receipts
+        are only checked when a new block shows up
+    Args:
+        w3 - web3 instance
+        get_tokenid - function to get the token id from a receipt
+        poll_interval - seconds between block number checks
+        timeout - seconds before a pending handle fails, None to wait forever,
+            counted from the latest hash added for the handle
+        on_revert - called with the handle when a mint txn reverts
+        on_block - called with the block number on every new block, after
+            the receipts for that block were checked
+    """
+
+    def __init__(
+        self,
+        w3: Any,
+        get_tokenid: Callable[[Any], int],
+        poll_interval: float = 1.0,
+        timeout: Optional[float] = 600,
+        on_revert: Optional[Callable[[MintHandle], None]] = None,
+        on_block: Optional[Callable[[int], None]] = None,
+    ):
+        self.w3 = w3
+        self.get_tokenid = get_tokenid
+        self.on_revert = on_revert
+        self.on_block = on_block
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+        # Keyed by every competing hash, sent_at by handle
+        self._pending: Dict[str, MintHandle] = {}
+        self._sent_at: Dict[MintHandle, float] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_block = -1
+
+    def track(self, handle: MintHandle) -> MintHandle:
+        """
+        Purpose:
+            Start tracking a sent mint
+        Args:
+            handle - the mint handle
+        Returns:
+            handle - the same handle, for chaining
+        """
+        with self._lock:
+            for hash in handle.hashes:
+                self._pending[hash] = handle
+            self._sent_at[handle] = time.monotonic()
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="mint-confirmations", daemon=True
+                )
+                self._thread.start()
+
+        self._wakeup.set()
+        return handle
+
+    def add_hash(self, handle: MintHandle, hash: str) -> bool:
+        """
+        Purpose:
+            Also watch a replacement txn sent under the handle's nonce, the
+            handle resolves with whichever hash lands first and its timeout
+            starts over
+        Args:
+            handle - the tracked mint handle
+            hash - hash of the replacement txn
+        Returns:
+            added - False if the handle already resolved
+        """
+        with self._lock:
+            if handle not in self._sent_at:
+                return False
+            handle.hashes.append(hash)
+            self._pending[hash] = handle
+            self._sent_at[handle] = time.monotonic()
+
+        return True
+
+    def pending_count(self) -> int:
+        """
+        Purpose:
+            Number of handles still waiting for a receipt
+        Args:
+            N/A
+        Returns:
+            count - pending handles
+        """
+        with self._lock:
+            return len(self._sent_at)
+
+    def _resolve(self, hash: str, receipt: Any) -> None:
+        with self._lock:
+            handle = self._pending.get(hash)
+            if handle is None:
+                return
+            for competing_hash in handle.hashes:
+                self._pending.pop(competing_hash, None)
+            self._sent_at.pop(handle, None)
+
+        handle.hash = hash
+        handle.receipt = receipt
+        if receipt["status"] == 0:
+            if self.on_revert is not None:
+                self.on_revert(handle)
+            handle.set_exception(MintReverted(f"mint txn {hash} reverted"))
+            return
+
+        try:
+            tokenid = (handle.get_tokenid or self.get_tokenid)(receipt)
+        except Exception as error:
+            handle.set_exception(error)
+            return
+
+        logging.info(f"Got tokenid: {tokenid}")
+        handle.set_result(tokenid)
+
+    def _expire(self) -> None:
+        if self.timeout is None:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            handles = [
+                handle
+                for handle, sent_at in self._sent_at.items()
+                if now - sent_at > self.timeout
+            ]
+            for handle in handles:
+                self._sent_at.pop(handle)
+                for hash in handle.hashes:
+                    self._pending.pop(hash, None)
+
+        for handle in handles:
+            handle.set_exception(
+                TimeoutError(f"mint txn {handle.hash} not mined in {self.timeout}s")
+            )
+
+    def poll(self) -> None:
+        """
+        Purpose:
+            Check receipts for every pending hash if there is a new block
+        Args:
+            N/A
+        Returns:
+            N/A
+        """
+        from web3.exceptions import TransactionNotFound
+
+        block_number = self.w3.eth.block_number
+        if block_number == self._last_block:
+            self._expire()
+            return
+        self._last_block = block_number
+
+        with self._lock:
+            hashes = list(self._pending)
+
+        for hash in hashes:
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(hash)
+            except TransactionNotFound:
+                continue
+            self._resolve(hash, receipt)
+
+        if self.on_block is not None:
+            self.on_block(block_number)
+
+        self._expire()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+
+            try:
+                self.poll()
+            except Exception as error:
+                logging.error(f"Receipt poll failed: {error}")
+
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
@@ -0,0 +1,121 @@
+# Python imports
+import logging
+import threading
+from typing import Any, Optional
+
+
+def is_nonce_too_low(error: Exception) -> bool:
+    """
+    Purpose:
+        Check if a send error means our local nonce fell behind the chain
+    Args:
+        error - exception raised by send_raw_transaction
+    Returns:
+        status - True if the node rejected the nonce as already used
+    """
+    return "nonce too low" in str(error).lower()
+
+
+def is_already_known(error: Exception) -> bool:
+    """
+    Purpose:
+        Check if a send error means this exact signed txn is already in the
+        mempool, so the send in effect succeeded
+    Args:
+        error - exception raised by send_raw_transaction
+    Returns:
+        status - True if the node already has the txn
+    """
+    message = str(error).lower()
+    return "already known" in message or "known transaction" in message
+
+
+def is_rejected(error: Exception) -> bool:
+    """
+    Purpose:
+        Check if a send error is the node's own JSON-RPC error answer, so the
+        txn was surely not taken. Transport errors, e.g. a read timeout or a
+        reset connection, are not: the node may have the txn anyway.
+    Args:
+        error - exception raised by send_raw_transaction
+    Returns:
+        status - True if the node answered with an error
+    """
+    # web3 raises ValueError with the response's "error" object
+    return (
+        isinstance(error, ValueError)
+        and bool(error.args)
+        and isinstance(error.args[0], dict)
+    )
+
+
+class NonceManager:
+    """
+    Purpose:
+        Hand out nonces for one account from an in-process counter, the
+        counter is seeded once from the chain and only resynced on errors
+    Args:
+        w3 - web3 instance
+        address - account the nonces belong to
+    """
+
+    def __init__(self, w3: Any, address: str):
+        self.w3 = w3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next_nonce: Optional[int] = None
+
+    def _fetch(self) -> int:
+        # pending includes txns already in the mempool, not just mined ones
+        return self.w3.eth.get_transaction_count(self.address, "pending")
+
+    def next_nonce(self) -> int:
+        """
+        Purpose:
+            Reserve the next nonce for this account
+        Args:
+            N/A
+        Returns:
+            nonce - nonce to sign the next txn with
+        """
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = self._fetch()
+                logging.info(f"Seeded nonce for {self.address}: {self._next_nonce}")
+
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def release(self, nonce: int) -> bool:
+        """
+        Purpose:
+            Give back a nonce whose txn was never sent, only possible while no
+            later nonce was handed out, otherwise the gap stays
+        Args:
+            nonce - nonce that was reserved but not used
+        Returns:
+            released - True if the nonce will be handed out again
+        """
+        with self._lock:
+            if self._next_nonce is not None and nonce == self._next_nonce - 1:
+                self._next_nonce = nonce
+                return True
+            return False
+
+    def resync(self) -> int:
+        """
+        Purpose:
+            Move the counter up to the chain after "nonce too low", never
+            below nonces already handed out that may not be sent yet
+        Args:
+            N/A
+        Returns:
+            nonce - the next nonce that will be handed out
+        """
+        with self._lock:
+            fetched = self._fetch()
+            if self._next_nonce is None or fetched > self._next_nonce:
+                self._next_nonce = fetched
+            logging.info(f"Resynced nonce for {self.address}: {self._next_nonce}")
+            return self._next_nonce
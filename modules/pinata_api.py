@@ -1,8 +1,615 @@
+# Python imports
 import json
-from typing import Type, Union, Dict, Any, List
-import requests
+import logging
+import mimetypes
 import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+# Local Python Library Imports
+from modules.ipfs_cid import bytes_cid, file_cid
+
+PINATA_API_URL = "https://api.pinata.cloud"
+PINATA_GATEWAY_URL = "https://gateway.pinata.cloud/ipfs"
+
+# Statuses worth another try, rate limited or the service is struggling
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# File bytes read per chunk while streaming an upload
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+# Rows per pinList page, Pinata allows up to 1000
+PIN_LIST_PAGE_LIMIT = 100
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Purpose:
+        Seconds to wait from a Retry-After header
+    Args:
+        value - header value, delay seconds or an HTTP date
+    Returns:
+        delay - seconds, None if missing or unreadable
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Purpose:
+        Space requests out to a rate that adapts to the API, additive
+        increase on every success and multiplicative decrease on a 429, so
+        bulk jobs settle just under the account's rate limit
+    Args:
+        rate - starting requests per second
+        min_rate - never slow below this
+        max_rate - never speed past this
+        increase - requests per second added per success
+        decrease - rate multiplier per 429
+        window - seconds after a slow down that more 429s are ignored, the
+            requests already in flight all fail together
+    """
+
+    def __init__(
+        self,
+        rate: float = 3.0,
+        min_rate: float = 0.2,
+        max_rate: float = 30.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        window: float = 1.0,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._slowed_at = float("-inf")
+
+    def acquire(self) -> None:
+        """
+        Purpose:
+            Wait for this request's slot
+        Args:
+            N/A
+        Returns:
+            N/A
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1 / self.rate
+
+        if slot > now:
+            time.sleep(slot - now)
+
+    def record(self, status_code: int) -> None:
+        """
+        Purpose:
+            Adapt the rate to a response
+        Args:
+            status_code - HTTP status of the response
+        Returns:
+            N/A
+        """
+        with self._lock:
+            now = time.monotonic()
+            if status_code == 429:
+                if now - self._slowed_at < self.window:
+                    return
+                self._slowed_at = now
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                # Push the next free slot out, never pull it in; callers that
+                # already hold a slot keep it and are not backed off
+                self._next_slot = max(self._next_slot, now + 1 / self.rate)
+                logging.info(f"Rate limited, slowing to {self.rate:.2f} req/s")
+            elif status_code < 500:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+class PinCache:
+    """
+    Purpose:
+        Local set of CIDs known to be pinned, one per line in a text file so
+        it survives re-runs. It is trusted as is, delete it after unpinning.
+    Args:
+        path - cache file, created on first add
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cids = set()
+
+        if os.path.exists(path):
+            with open(path) as cache_file:
+                self._cids = {line.strip() for line in cache_file if line.strip()}
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self._cids
+
+    def __len__(self) -> int:
+        return len(self._cids)
+
+    def add(self, cid: str) -> None:
+        """
+        Purpose:
+            Remember a pinned CID
+        Args:
+            cid - pinned CID
+        Returns:
+            N/A
+        """
+        with self._lock:
+            if cid in self._cids:
+                return
+            self._cids.add(cid)
+            with open(self.path, "a") as cache_file:
+                cache_file.write(cid + "\n")
+
+
+class MultipartFileEncoder:
+    """
+    Purpose:
+        Streaming multipart/form-data body for one file. The length is known
+        up front and the file is read a chunk at a time as the body is sent,
+        so an upload holds about one chunk in memory whatever the file size.
+    Args:
+        filepath - file to send
+        field - form field name of the file
+        fields - extra text form fields, e.g. pinataMetadata
+        chunk_size - most file bytes read at once
+        on_progress - called with (bytes sent, total bytes, seconds since the
+            first read) after every chunk
+        boundary - multipart boundary, random if None
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        field: str = "file",
+        fields: Optional[Dict[str, str]] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        on_progress: Optional[Callable[[int, int, float], None]] = None,
+        boundary: Optional[str] = None,
+    ):
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+
+        boundary = boundary or uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+
+        filename = Path(filepath).name
+        file_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        head = ""
+        for name, value in (fields or {}).items():
+            head += (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f"{value}\r\n"
+            )
+        head += (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; '
+            f'filename="{filename}"\r\n'
+            f"Content-Type: {file_type}\r\n\r\n"
+        )
+
+        self._head = head.encode()
+        self._tail = f"\r\n--{boundary}--\r\n".encode()
+        self.total = len(self._head) + os.path.getsize(filepath) + len(self._tail)
+        self.sent = 0
+
+        self._file: Optional[Any] = None
+        self._started: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self.total
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Purpose:
+            Next piece of the body
+        Args:
+            size - most bytes to return, the chunk size if negative
+        Returns:
+            data - body bytes, empty once everything was read
+        """
+        if size is None or size < 0:
+            size = self.chunk_size
+        size = min(size, self.chunk_size)
+
+        if self._started is None:
+            self._started = time.perf_counter()
+            self._file = open(self.filepath, "rb")
+
+        head_size = len(self._head)
+        file_end = self.total - len(self._tail)
+        if self.sent < head_size:
+            data = self._head[self.sent : self.sent + size]
+        elif self.sent < file_end:
+            data = self._file.read(min(size, file_end - self.sent))
+            if not data:
+                raise IOError(f"{self.filepath} shrank during the upload")
+        else:
+            data = self._tail[self.sent - file_end : self.sent - file_end + size]
+
+        self.sent += len(data)
+        if self.sent >= file_end:
+            self.close()
+        if data and self.on_progress is not None:
+            self.on_progress(self.sent, self.total, time.perf_counter() - self._started)
+
+        return data
+
+    def close(self) -> None:
+        """
+        Purpose:
+            Close the file if it is open
+        Args:
+            N/A
+        Returns:
+            N/A
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PinataClient:
+    """
+    Purpose:
+        Pinata API client on a pooled keep-alive session, every call gets a
+        timeout and is retried on connection errors, 429 and 5xx with
+        exponential backoff and full jitter, honoring Retry-After
+    Args:
+        pinata_api_key - pinata api key
+        pinata_secret - pinata secret key
+        pool_size - keep-alive connections kept per host
+        timeout - (connect, read) seconds per request
+        max_retries - retries after the first try
+        backoff - base seconds of the backoff, doubled per retry
+        max_backoff - cap on any one wait, Retry-After included
+        api_url - Pinata API url, a stand-in server for tests
+        gateway_url - IPFS gateway url
+        rate_limiter - paces API calls, None for no pacing
+        pin_cache - CIDs known to be pinned, None to only ask the API
+        skip_pinned - compute each CID locally before pinning and skip the
+            upload when the pin cache or pinList?hashContains has it
+    """
+
+    def __init__(
+        self,
+        pinata_api_key: str,
+        pinata_secret: str,
+        pool_size: int = 16,
+        timeout: Tuple[float, float] = (5, 120),
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 60,
+        api_url: str = PINATA_API_URL,
+        gateway_url: str = PINATA_GATEWAY_URL,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        pin_cache: Optional[PinCache] = None,
+        skip_pinned: bool = False,
+    ):
+        # requests is only needed once something is pinned
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.api_url = api_url
+        self.gateway_url = gateway_url
+        self.rate_limiter = rate_limiter
+        self.pin_cache = pin_cache
+        self.skip_pinned = skip_pinned
+        self.retry_errors = (requests.ConnectionError, requests.Timeout)
+
+        # Auth goes on API calls only, gateway fetches don't need the keys
+        self.headers = {
+            "pinata_api_key": pinata_api_key,
+            "pinata_secret_api_key": pinata_secret,
+        }
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        make_body: Optional[Callable[[], Any]] = None,
+        paced: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Purpose:
+            Send a request, retrying transient failures
+        Args:
+            method - HTTP method
+            url - full url
+            make_body - makes a fresh streaming body for every try, a
+                partly sent stream can't be sent again
+            paced - wait on the rate limiter before every try
+            kwargs - passed on to requests
+        Returns:
+            response - the last response, may still be an error status
+        """
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            if make_body is not None:
+                kwargs["data"] = make_body()
+            if paced and self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+                if paced and self.rate_limiter is not None:
+                    self.rate_limiter.record(response.status_code)
+            except self.retry_errors as error:
+                if attempt == self.max_retries:
+                    raise
+                reason = str(error)
+                delay = self._backoff(attempt)
+            else:
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt == self.max_retries
+                ):
+                    return response
+                reason = f"HTTP {response.status_code}"
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is None:
+                    delay = self._backoff(attempt)
+                else:
+                    delay = min(self.max_backoff, retry_after)
+                response.close()
+            finally:
+                # The server may answer before reading the whole body
+                if make_body is not None:
+                    kwargs["data"].close()
+
+            logging.warning(
+                f"{method} {url} failed ({reason}), retry {attempt + 1} "
+                f"in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+    def api(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Purpose:
+            Call the Pinata API
+        Args:
+            method - HTTP method
+            path - path under the API url, e.g. /pinning/pinJSONToIPFS
+            kwargs - passed on to requests
+        Returns:
+            data - decoded JSON response
+        """
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        response = self.request(
+            method, f"{self.api_url}{path}", paced=True, headers=headers, **kwargs
+        )
+        return response.json()
+
+    def pin_json(
+        self, json_obj: Dict[str, Any], name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Purpose:
+            PIN a json obj to IPFS
+        Args:
+            json_obj - The json obj
+            name - pin name, the obj's "name" if None
+        Returns:
+            ipfs json - data from pin
+        """
+        ipfs_json = {
+            "pinataMetadata": {
+                "name": name or json_obj["name"],
+            },
+            "pinataContent": json_obj,
+        }
+
+        cid = None
+        if self.skip_pinned:
+            # Pinata stores the content the way JSON.stringify writes it
+            content = json.dumps(json_obj, separators=(",", ":"), ensure_ascii=False)
+            content = content.encode()
+            cid = bytes_cid(content)
+            skipped = self._skip_if_pinned(cid, len(content))
+            if skipped is not None:
+                return skipped
+
+        response = self.api("POST", "/pinning/pinJSONToIPFS", json=ipfs_json)
+        return self._remember(response, cid)
+
+    def pin_file(
+        self,
+        filepath: str,
+        on_progress: Optional[Callable[[int, int, float], None]] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        Purpose:
+            PIN a file obj to IPFS, streamed from disk in chunks
+        Args:
+            filepath - file path
+            on_progress - called with (bytes sent, total bytes, seconds) as
+                the upload goes, restarts from 0 on a retry
+            chunk_size - most file bytes held in memory at once
+        Returns:
+            ipfs json - data from pin
+        """
+        cid = None
+        if self.skip_pinned:
+            cid = file_cid(filepath)
+            skipped = self._skip_if_pinned(cid, os.path.getsize(filepath))
+            if skipped is not None:
+                return skipped
+
+        boundary = uuid.uuid4().hex
+
+        def make_body() -> MultipartFileEncoder:
+            return MultipartFileEncoder(
+                filepath,
+                chunk_size=chunk_size,
+                on_progress=on_progress,
+                boundary=boundary,
+            )
+
+        response = self.api(
+            "POST",
+            "/pinning/pinFileToIPFS",
+            make_body=make_body,
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+        return self._remember(response, cid)
+
+    def is_pinned(self, cid: str) -> bool:
+        """
+        Purpose:
+            Check if a CID is already pinned, the local cache first and then
+            pinList?hashContains
+        Args:
+            cid - CID to look for
+        Returns:
+            pinned - True if it is pinned on the account
+        """
+        if self.pin_cache is not None and cid in self.pin_cache:
+            return True
+
+        rows = self.pin_list(f"status=pinned&hashContains={cid}").get("rows") or []
+        pinned = any(row["ipfs_pin_hash"] == cid for row in rows)
+        if pinned and self.pin_cache is not None:
+            self.pin_cache.add(cid)
+
+        return pinned
+
+    def _skip_if_pinned(self, cid: str, size: int) -> Optional[Dict[str, Any]]:
+        if not self.is_pinned(cid):
+            return None
+
+        logging.info(f"{cid} is already pinned, skipping the upload")
+        # Same shape as a pin response, Pinata flags re-pins the same way
+        return {"IpfsHash": cid, "PinSize": size, "isDuplicate": True}
+
+    def _remember(self, response: Dict[str, Any], cid: Optional[str]) -> Dict[str, Any]:
+        if "IpfsHash" not in response:
+            return response
+
+        if cid is not None and response["IpfsHash"] != cid:
+            logging.warning(
+                f"Local CID {cid} != pinned {response['IpfsHash']}, "
+                "this content can't be skipped next time"
+            )
+        if self.pin_cache is not None:
+            self.pin_cache.add(response["IpfsHash"])
+
+        return response
+
+    def pin_list(self, query: str) -> Dict[str, Any]:
+        """
+        Purpose:
+            List pins
+        Args:
+            query - pinList query string, e.g. status=pinned
+        Returns:
+            data - pinList response, "count" and "rows"
+        """
+        return self.api("GET", f"/data/pinList?{query}")
+
+    def iter_pins(
+        self, query: str, page_limit: int = PIN_LIST_PAGE_LIMIT
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Purpose:
+            Every pin matching a query, one pinList page at a time as the
+            rows are consumed
+        Args:
+            query - pinList query string, any pageOffset in it is replaced
+            page_limit - rows per page, a pageLimit in the query wins
+        Returns:
+            rows - generator of pinList rows
+        """
+        params = dict(parse_qsl(query))
+        params.pop("pageOffset", None)
+        page_limit = int(params.setdefault("pageLimit", str(page_limit)))
+
+        offset = 0
+        while True:
+            params["pageOffset"] = str(offset)
+            rows = self.pin_list(urlencode(params)).get("rows") or []
+            yield from rows
+
+            if len(rows) < page_limit:
+                return
+            offset += len(rows)
+
+    def gateway_json(self, ipfs_hash: str) -> Any:
+        """
+        Purpose:
+            Fetch pinned JSON from the Pinata gateway
+        Args:
+            ipfs_hash - CID of the content
+        Returns:
+            data - decoded JSON content
+        """
+        return self.request("GET", f"{self.gateway_url}/{ipfs_hash}").json()
+
+
+_CLIENTS: Dict[Tuple[str, str], PinataClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_pinata_client(pinata_api_key: str, pinata_secret: str) -> PinataClient:
+    """
+    Purpose:
+        Get the shared client for a key pair, so every call reuses its
+        connections
+    Args:
+        pinata_api_key - pinata api key
+        pinata_secret - pinata secret key
+    Returns:
+        client - shared PinataClient
+    """
+    key = (pinata_api_key, pinata_secret)
+
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            _CLIENTS[key] = PinataClient(pinata_api_key, pinata_secret)
+        return _CLIENTS[key]
 
 
 def pinJSONToIPFS(
@@ -18,90 +625,87 @@ def pinJSONToIPFS(
     Returns:
         ipfs json - data from pin
     """
-    HEADERS = {
-        "pinata_api_key": pinata_api_key,
-        "pinata_secret_api_key": pinata_secret,
-    }
-
-    ipfs_json = {
-        "pinataMetadata": {
-            "name": json_obj["name"],
-        },
-        "pinataContent": json_obj,
-    }
-
-    endpoint_uri = "https://api.pinata.cloud/pinning/pinJSONToIPFS"
-    response = requests.post(endpoint_uri, headers=HEADERS, json=ipfs_json)
-    return response.json()
+    return get_pinata_client(pinata_api_key, pinata_secret).pin_json(json_obj)
 
 
 def pinContentToIPFS(
-    filepath: str, pinata_api_key: str, pinata_secret: str
+    filepath: str,
+    pinata_api_key: str,
+    pinata_secret: str,
+    on_progress: Optional[Callable[[int, int, float], None]] = None,
 ) -> Dict[str, Any]:
     """
     Purpose:
-        PIN a file obj to IPFS
+        PIN a file obj to IPFS, streamed so large files use bounded memory
     Args:
         filepath - file path
         pinata_api_key - pinata api key
         pinata_secret - pinata secret key
+        on_progress - called with (bytes sent, total bytes, seconds)
     Returns:
         ipfs json - data from pin
     """
+    client = get_pinata_client(pinata_api_key, pinata_secret)
+    response = client.pin_file(filepath, on_progress=on_progress)
+    logging.info(response)
 
-    HEADERS = {
-        "pinata_api_key": pinata_api_key,
-        "pinata_secret_api_key": pinata_secret,
-    }
-
-    endpoint_uri = "https://api.pinata.cloud/pinning/pinFileToIPFS"
-
-    filename = filepath.split("/")[-1:][0]
-
-    with Path(filepath).open("rb") as fp:
-        image_binary = fp.read()
-        response = requests.post(
-            endpoint_uri, files={"file": (filename, image_binary)}, headers=HEADERS
-        )
-        print(response.json())
-
-        # response = requests.post(endpoint_uri, data=multipart_form_data, headers=HEADERS)
-        # print(response.text)
-        # print(response.headers)
-        return response.json()
+    return response
 
 
 def pinSearch(
-    query: str, pinata_api_key: str, pinata_secret: str
-) -> List[Dict[str, Any]]:
+    query: str,
+    pinata_api_key: str,
+    pinata_secret: str,
+    limit: Optional[int] = None,
+    max_workers: int = 8,
+) -> Iterator[Dict[str, Any]]:
     """
     Purpose:
-        Query pins for data
+        Query pins for data, following pinList pages and fetching the pinned
+        JSON from the gateway concurrently. Objects are yielded as soon as
+        their fetch finishes, so the order is not the pinList order. Closing
+        the generator early stops paging and drops queued fetches.
     Args:
         query - the query str
         pinata_api_key - pinata api key
         pinata_secret - pinata secret key
+        limit - stop after this many objects, None for every match
+        max_workers - gateway fetches in flight at once
     Returns:
-        data - array of pined objects
+        data - generator of pined objects
     """
+    client = get_pinata_client(pinata_api_key, pinata_secret)
+    rows = client.iter_pins(query)
 
-    endpoint_uri = f"https://api.pinata.cloud/data/pinList?{query}"
-    HEADERS = {
-        "pinata_api_key": pinata_api_key,
-        "pinata_secret_api_key": pinata_secret,
-    }
-    response = requests.get(endpoint_uri, headers=HEADERS).json()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {}
+    found = 0
+    try:
+        while True:
+            # Only page further while more results are still wanted
+            while len(pending) < max_workers and (
+                limit is None or found + len(pending) < limit
+            ):
+                row = next(rows, None)
+                if row is None:
+                    break
+                ipfs_pin_hash = row["ipfs_pin_hash"]
+                future = executor.submit(client.gateway_json, ipfs_pin_hash)
+                pending[future] = ipfs_pin_hash
 
-    # now get the actual data from this
-    data = []
-    if "rows" in response:
+            if not pending:
+                return
 
-        for item in response["rows"]:
-            ipfs_pin_hash = item["ipfs_pin_hash"]
-            hash_data = requests.get(
-                f"https://gateway.pinata.cloud/ipfs/{ipfs_pin_hash}"
-            ).json()
-            data.append(hash_data)
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                ipfs_pin_hash = pending.pop(future)
+                try:
+                    data = future.result()
+                except Exception as error:
+                    logging.error(f"Fetching {ipfs_pin_hash} failed: {error}")
+                    continue
 
-    # print(response.json())
-    return data
+                found += 1
+                yield data
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
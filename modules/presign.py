@@ -0,0 +1,188 @@
+# Python imports
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Local Python Library Imports
+from modules.mint_nft import get_tracker
+from modules.mint_tracker import MintHandle
+from modules.nonce_manager import is_already_known, is_nonce_too_low
+
+# Set once per worker process by _init_worker
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(
+    abi: List[Dict[str, Any]],
+    contract_address: str,
+    private_key: str,
+    txn_fields: Dict[str, Any],
+) -> None:
+    from eth_account import Account
+    from web3 import Web3
+
+    # No provider needed, the contract is only used to encode call data
+    _WORKER["account"] = Account
+    _WORKER["to_hex"] = Web3.toHex
+    _WORKER["contract"] = Web3().eth.contract(address=contract_address, abi=abi)
+    _WORKER["private_key"] = private_key
+    _WORKER["from_address"] = Account.from_key(private_key).address
+    _WORKER["txn_fields"] = txn_fields
+
+
+def _sign_chunk(chunk: List[Tuple[int, str, str]]) -> List[Dict[str, Any]]:
+    contract = _WORKER["contract"]
+    to_hex = _WORKER["to_hex"]
+    signed = []
+
+    for nonce, to_address, token_uri in chunk:
+        txn = {
+            **_WORKER["txn_fields"],
+            "to": contract.address,
+            "value": 0,
+            "nonce": nonce,
+            "data": contract.encodeABI(fn_name="mint", args=[to_address, token_uri]),
+        }
+        signed_txn = _WORKER["account"].sign_transaction(txn, _WORKER["private_key"])
+        signed.append(
+            {
+                "nonce": nonce,
+                "to_address": to_address,
+                "token_uri": token_uri,
+                "from_address": _WORKER["from_address"],
+                "hash": to_hex(signed_txn.hash),
+                "raw_txn": to_hex(signed_txn.rawTransaction),
+            }
+        )
+
+    return signed
+
+
+def presign_mints(
+    mint_jobs: Iterable[Tuple[str, str]],
+    abi: List[Dict[str, Any]],
+    contract_address: str,
+    private_key: str,
+    start_nonce: int,
+    txn_fields: Dict[str, Any],
+    output_file: str,
+    processes: Optional[int] = None,
+    chunk_size: int = 256,
+) -> int:
+    """
+    Purpose:
+        Sign mint txns for a known nonce range across a process pool, without
+        touching the network, and write them to a JSONL file in nonce order
+    Args:
+        mint_jobs - (to_address, tokenURI) pairs to mint
+        abi - contract ABI
+        contract_address - NFT contract address
+        private_key - hex private key of the minting wallet
+        start_nonce - nonce of the first job, the rest follow in order
+        txn_fields - chainId, gas and maxFeePerGas/maxPriorityFeePerGas (or
+            gasPrice) used for every txn
+        output_file - JSONL file of signed txns
+        processes - worker processes, one per core if None
+        chunk_size - txns signed per worker task
+    Returns:
+        count - txns signed
+    """
+    nonces = itertools.count(start_nonce)
+    jobs = ((next(nonces), to, uri) for to, uri in mint_jobs)
+
+    count = 0
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(abi, contract_address, private_key, txn_fields),
+    ) as executor, open(output_file, "w") as signed_file:
+        workers = processes or os.cpu_count() or 1
+
+        # Keep a few chunks per worker queued so memory stays bounded
+        while True:
+            chunks = [
+                list(itertools.islice(jobs, chunk_size)) for _ in range(workers * 4)
+            ]
+            chunks = [chunk for chunk in chunks if chunk]
+            if not chunks:
+                break
+
+            for signed in executor.map(_sign_chunk, chunks):
+                for signed_txn in signed:
+                    signed_file.write(json.dumps(signed_txn) + "\n")
+                count += len(signed)
+
+            logging.info(f"Signed {count} mint txns")
+
+    return count
+
+
+def read_presigned(input_file: str) -> Iterator[Dict[str, Any]]:
+    """
+    Purpose:
+        Stream signed txns written by presign_mints
+    Args:
+        input_file - JSONL file of signed txns
+    Returns:
+        signed_txns - generator of signed txn dicts
+    """
+    with open(input_file, "r") as signed_file:
+        for line in signed_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def broadcast_presigned(
+    signed_txns: Iterable[Dict[str, Any]],
+    eth_json: Dict[str, Any],
+    max_in_flight: int = 50,
+) -> Iterator[MintHandle]:
+    """
+    Purpose:
+        Send pre-signed mints in nonce order and track their receipts, the
+        sending machine never needs the private key
+    Args:
+        signed_txns - signed txn dicts from read_presigned
+        eth_json - blockchain info, only the "client" entry is used
+        max_in_flight - max txns sent but not yet confirmed
+    Returns:
+        handles - generator of resolved mint handles, in confirmation order.
+            A send the node rejects fails its handle right away, a revert
+            also drops the cached gas estimate for its URI bucket.
+    """
+    w3 = eth_json["client"].w3
+    tracker = get_tracker(eth_json)
+    pending = set()
+
+    for signed_txn in signed_txns:
+        handle = MintHandle(
+            signed_txn["hash"],
+            signed_txn["nonce"],
+            signed_txn["to_address"],
+            signed_txn["token_uri"],
+            signed_txn.get("from_address", ""),
+        )
+
+        try:
+            w3.eth.send_raw_transaction(signed_txn["raw_txn"])
+        except Exception as error:
+            if not (is_already_known(error) or is_nonce_too_low(error)):
+                logging.error(f"Send of {signed_txn['hash']} failed: {error}")
+                handle.set_exception(error)
+                yield handle
+                continue
+            # In the mempool or mined by an earlier broadcast, keep tracking it
+            logging.warning(f"Send of {signed_txn['hash']} failed: {error}")
+
+        pending.add(tracker.track(handle))
+
+        if len(pending) >= max_in_flight:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from done
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        yield from done
@@ -0,0 +1,148 @@
+# Python imports
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+# keccak("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+ZERO_ADDRESS = "0x" + "0" * 40
+
+
+def to_hex(value: Any) -> str:
+    """
+    Purpose:
+        Normalize a topic, hash or address to a lowercase 0x hex string
+    Args:
+        value - HexBytes, bytes or str
+    Returns:
+        hex_str - lowercase hex string
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+
+    value = value.lower()
+    return value if value.startswith("0x") else "0x" + value
+
+
+def index_logs_by_topic(logs: Iterable[Any]) -> Dict[str, List[Any]]:
+    """
+    Purpose:
+        Group logs by their event topic
+    Args:
+        logs - receipt or eth_getLogs logs
+    Returns:
+        logs_by_topic - event topic to logs with that topic
+    """
+    logs_by_topic = defaultdict(list)
+
+    for log in logs:
+        if log["topics"]:
+            logs_by_topic[to_hex(log["topics"][0])].append(log)
+
+    return logs_by_topic
+
+
+def decode_transfers(
+    logs: Iterable[Any], contract_address: Optional[str] = None
+) -> Dict[str, List[Any]]:
+    """
+    Purpose:
+        Decode every ERC721 Transfer event in one pass
+    Args:
+        logs - receipt or eth_getLogs logs
+        contract_address - only keep events from this contract, all if None
+    Returns:
+        columns - parallel "from", "to", "token_ids", "block_numbers",
+            "block_hashes", "tx_hashes" and "log_indexes" lists
+    """
+    contract = to_hex(contract_address) if contract_address else None
+    columns = {
+        "from": [],
+        "to": [],
+        "token_ids": [],
+        "block_numbers": [],
+        "block_hashes": [],
+        "tx_hashes": [],
+        "log_indexes": [],
+    }
+
+    for log in index_logs_by_topic(logs).get(TRANSFER_TOPIC, []):
+        topics = log["topics"]
+
+        # ERC20 Transfers share the topic but only index two params
+        if len(topics) != 4:
+            continue
+        if contract and to_hex(log["address"]) != contract:
+            continue
+
+        columns["from"].append("0x" + to_hex(topics[1])[-40:])
+        columns["to"].append("0x" + to_hex(topics[2])[-40:])
+        columns["token_ids"].append(int(to_hex(topics[3]), 16))
+        columns["block_numbers"].append(log["blockNumber"])
+        block_hash = log.get("blockHash")
+        columns["block_hashes"].append(to_hex(block_hash) if block_hash else None)
+        columns["tx_hashes"].append(to_hex(log["transactionHash"]))
+        columns["log_indexes"].append(log["logIndex"])
+
+    return columns
+
+
+def decode_minted_tokenids(
+    receipt: Any, contract_address: Optional[str] = None
+) -> List[int]:
+    """
+    Purpose:
+        Get every token minted in a receipt
+    Args:
+        receipt - txn receipt
+        contract_address - contract that minted, defaults to the txn target
+    Returns:
+        tokenids - minted token ids in log order
+    """
+    transfers = decode_transfers(receipt["logs"], contract_address or receipt.get("to"))
+
+    return [
+        token_id
+        for from_address, token_id in zip(transfers["from"], transfers["token_ids"])
+        if from_address == ZERO_ADDRESS
+    ]
+
+
+def decode_receipts_minted(
+    receipts: Iterable[Any], contract_address: Optional[str] = None
+) -> Dict[str, List[int]]:
+    """
+    Purpose:
+        Get the minted tokens for a whole list of receipts in one pass
+    Args:
+        receipts - txn receipts
+        contract_address - contract that minted, defaults to each txn target
+    Returns:
+        tokenids_by_hash - txn hash to minted token ids
+    """
+    tokenids_by_hash = {}
+    receipts = list(receipts)
+
+    logs = [log for receipt in receipts for log in receipt["logs"]]
+    if contract_address is None:
+        # Keep only logs emitted by the contract each txn called
+        targets = {
+            to_hex(receipt["transactionHash"]): to_hex(receipt["to"] or "0x")
+            for receipt in receipts
+        }
+        logs = [
+            log
+            for log in logs
+            if to_hex(log["address"]) == targets[to_hex(log["transactionHash"])]
+        ]
+
+    transfers = decode_transfers(logs, contract_address)
+    for receipt in receipts:
+        tokenids_by_hash[to_hex(receipt["transactionHash"])] = []
+
+    for from_address, token_id, tx_hash in zip(
+        transfers["from"], transfers["token_ids"], transfers["tx_hashes"]
+    ):
+        if from_address == ZERO_ADDRESS:
+            tokenids_by_hash[tx_hash].append(token_id)
+
+    return tokenids_by_hash
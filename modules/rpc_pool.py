@@ -0,0 +1,287 @@
+# Python imports
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import requests
+from web3.providers.base import JSONBaseProvider
+
+# Methods that change chain state, these can be broadcast to every endpoint
+WRITE_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction"}
+
+# JSON-RPC errors that are the endpoint's fault, another one may answer:
+# -32005 rate limited, -32603 internal error
+FAULT_CODES = {-32005, -32603}
+FAULT_MESSAGES = ("header not found", "rate limit", "too many requests")
+
+# HTTP statuses that are the endpoint's fault
+FAULT_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RPCError(ValueError):
+    """
+    Purpose:
+        A JSON-RPC error response that is the endpoint's fault, counted
+        against it like a failed request so the call fails over
+    Args:
+        response - decoded JSON-RPC response with the "error"
+    """
+
+    def __init__(self, response: Dict[str, Any]):
+        super().__init__(response["error"])
+        self.response = response
+
+
+def is_revert(error: Any) -> bool:
+    """
+    Purpose:
+        Check if a JSON-RPC error is the contract reverting, which every
+        endpoint would answer the same
+    Args:
+        error - "error" member of a JSON-RPC response
+    Returns:
+        revert - True for a revert
+    """
+    if isinstance(error, dict):
+        return error.get("code") == 3 or "revert" in str(error.get("message", ""))
+    return "revert" in str(error)
+
+
+def is_endpoint_fault(error: Any) -> bool:
+    """
+    Purpose:
+        Check if a JSON-RPC error is the endpoint rate limiting or failing,
+        not an answer about the request itself like "nonce too low", a
+        revert or invalid params, which every endpoint would give the same
+    Args:
+        error - "error" member of a JSON-RPC response
+    Returns:
+        fault - True if another endpoint may answer
+    """
+    if isinstance(error, dict):
+        if error.get("code") in FAULT_CODES:
+            return True
+        error = error.get("message", "")
+    message = str(error).lower()
+    return any(fault in message for fault in FAULT_MESSAGES)
+
+
+class RPCEndpoint:
+    """
+    Purpose:
+        Rolling latency and error stats for one JSON-RPC url
+    Args:
+        url - JSON-RPC url
+        window - number of recent calls to compute the error rate over
+    """
+
+    def __init__(self, url: str, window: int = 50):
+        self.url = url
+        self.latency: Optional[float] = None
+        self.results = deque(maxlen=window)
+        self.down_until = 0.0
+
+    def error_rate(self) -> float:
+        """
+        Purpose:
+            Share of recent calls that failed
+        Args:
+            N/A
+        Returns:
+            rate - 0.0 to 1.0
+        """
+        if not self.results:
+            return 0.0
+        return self.results.count(False) / len(self.results)
+
+    def record(self, ok: bool, latency: float, alpha: float = 0.2) -> None:
+        """
+        Purpose:
+            Record the outcome of a call
+        Args:
+            ok - True if the call succeeded
+            latency - seconds the call took
+            alpha - weight of the new sample in the latency average
+        Returns:
+            N/A
+        """
+        self.results.append(ok)
+        if ok:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency = alpha * latency + (1 - alpha) * self.latency
+
+
+class RPCPool:
+    """
+    Purpose:
+        Route JSON-RPC calls over several urls for the same chain, reads go to
+        the fastest healthy endpoint and fail over on errors
+    Args:
+        urls - JSON-RPC urls, the first is tried first until stats exist
+        session - requests session to use, a new one if None
+        timeout - seconds per request
+        max_error_rate - endpoints above this error rate are skipped
+        cooldown - seconds an endpoint is skipped after going unhealthy
+        broadcast - send raw txns to every endpoint at once
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        session: Optional[requests.Session] = None,
+        timeout: float = 10,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30,
+        broadcast: bool = False,
+    ):
+        if not urls:
+            raise ValueError("RPCPool needs at least one url")
+
+        self.endpoints = [RPCEndpoint(url) for url in urls]
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.broadcast = broadcast
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def ranked(self) -> List[RPCEndpoint]:
+        """
+        Purpose:
+            Endpoints in the order they should be tried, healthy ones first,
+            fastest first, untried ones before measured ones
+        Args:
+            N/A
+        Returns:
+            endpoints - ordered endpoints
+        """
+        now = time.monotonic()
+        with self._lock:
+            return sorted(
+                self.endpoints,
+                key=lambda endpoint: (
+                    endpoint.down_until > now,
+                    endpoint.latency or 0.0,
+                ),
+            )
+
+    def _post(self, endpoint: RPCEndpoint, payload: bytes) -> Any:
+        start = time.monotonic()
+        try:
+            response = self.session.post(
+                endpoint.url,
+                data=payload,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+            )
+            if response.status_code in FAULT_STATUSES:
+                response.raise_for_status()
+            result = response.json()
+            # Rate limits and node faults can come back as 200 with an error
+            # body, other errors are the answer and returned as is
+            if (
+                isinstance(result, dict)
+                and "error" in result
+                and is_endpoint_fault(result["error"])
+            ):
+                raise RPCError(result)
+        except (requests.RequestException, ValueError):
+            with self._lock:
+                endpoint.record(False, time.monotonic() - start)
+                if endpoint.error_rate() > self.max_error_rate:
+                    endpoint.down_until = time.monotonic() + self.cooldown
+            raise
+
+        with self._lock:
+            endpoint.record(True, time.monotonic() - start)
+        return result
+
+    def post(self, payload: bytes, method: str = "") -> Any:
+        """
+        Purpose:
+            Send an encoded JSON-RPC request or batch, trying endpoints in
+            ranked order until one answers
+        Args:
+            payload - encoded JSON-RPC request or batch
+            method - JSON-RPC method, used to pick the write path
+        Returns:
+            response - decoded JSON-RPC response, the last error response if
+                every endpoint answered with one
+        """
+        if method in WRITE_METHODS and self.broadcast and len(self.endpoints) > 1:
+            return self._broadcast(payload)
+
+        last_error = None
+        for endpoint in self.ranked():
+            try:
+                return self._post(endpoint, payload)
+            except (requests.RequestException, ValueError) as error:
+                logging.warning(f"RPC {method} failed on {endpoint.url}: {error}")
+                last_error = error
+
+        # Let web3 raise the node's own error
+        if isinstance(last_error, RPCError):
+            return last_error.response
+        raise last_error
+
+    def _broadcast(self, payload: bytes) -> Any:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(self.endpoints), thread_name_prefix="rpc-broadcast"
+            )
+
+        futures = [
+            self._executor.submit(self._post, endpoint, payload)
+            for endpoint in self.endpoints
+        ]
+
+        # Prefer an accepted txn, other nodes may answer "already known"
+        responses = []
+        last_error = None
+        for future in as_completed(futures):
+            try:
+                response = future.result()
+            except RPCError as error:
+                responses.append(error.response)
+                continue
+            except (requests.RequestException, ValueError) as error:
+                last_error = error
+                continue
+            if "result" in response:
+                return response
+            responses.append(response)
+
+        if responses:
+            return responses[0]
+        raise last_error
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """
+    Purpose:
+        web3 provider that sends every request through an RPCPool
+    Args:
+        pool - the rpc pool
+    """
+
+    def __init__(self, pool: RPCPool):
+        super().__init__()
+        self.pool = pool
+
+    def make_request(self, method: str, params: Any) -> Dict[str, Any]:
+        payload = self.encode_rpc_request(method, params)
+        return self.pool.post(payload, method)
+
+    def isConnected(self) -> bool:
+        try:
+            response = self.make_request("web3_clientVersion", [])
+        except Exception:
+            return False
+        return "result" in response
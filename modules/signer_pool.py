@@ -0,0 +1,144 @@
+# Python imports
+import logging
+import threading
+from typing import Any, Dict, List
+
+
+class SignerLane:
+    """
+    Purpose:
+        One minting wallet with its own nonce stream and in-flight limit
+    Args:
+        eth_json - blockchain info signed with this wallet's keys
+        max_in_flight - max txns sent but not yet confirmed on this lane
+    """
+
+    def __init__(self, eth_json: Dict[str, Any], max_in_flight: int):
+        self.eth_json = eth_json
+        self.address = eth_json["public_key"]
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+
+class SignerPool:
+    """
+    Purpose:
+        Spread mints over several wallets so throughput is not bound by one
+        account's nonce sequence, each wallet must be the owner or a minter
+        on the contract (see setMinter in contracts/MyNFT.sol)
+    Args:
+        eth_json - blockchain info from set_up_blockchain
+        private_keys - hex private keys of the minting wallets
+        max_in_flight - max txns in flight per wallet
+    """
+
+    def __init__(
+        self, eth_json: Dict[str, Any], private_keys: List[str], max_in_flight: int = 16
+    ):
+        from eth_account import Account
+        from web3 import Web3
+
+        if not private_keys:
+            raise ValueError("SignerPool needs at least one private key")
+
+        self.lanes = []
+        for private_key in private_keys:
+            lane_json = dict(eth_json)
+            lane_json["public_key"] = Account.from_key(private_key).address
+            lane_json["private_key"] = Web3.toBytes(hexstr=private_key)
+            self.lanes.append(SignerLane(lane_json, max_in_flight))
+
+        self._condition = threading.Condition()
+
+    def addresses(self) -> List[str]:
+        """
+        Purpose:
+            Addresses of every wallet in the pool
+        Args:
+            N/A
+        Returns:
+            addresses - wallet addresses
+        """
+        return [lane.address for lane in self.lanes]
+
+    def acquire(self) -> SignerLane:
+        """
+        Purpose:
+            Reserve a slot on the least loaded lane, waits while every lane is
+            at its in-flight limit
+        Args:
+            N/A
+        Returns:
+            lane - lane to sign the next mint with
+        """
+        with self._condition:
+            while True:
+                open_lanes = [
+                    lane for lane in self.lanes if lane.in_flight < lane.max_in_flight
+                ]
+                if open_lanes:
+                    lane = min(open_lanes, key=lambda lane: lane.in_flight)
+                    lane.in_flight += 1
+                    return lane
+                self._condition.wait()
+
+    def release(self, lane: SignerLane) -> None:
+        """
+        Purpose:
+            Free a slot once its mint confirmed or failed
+        Args:
+            lane - lane the mint was signed on
+        Returns:
+            N/A
+        """
+        with self._condition:
+            lane.in_flight -= 1
+            self._condition.notify()
+
+
+def grant_minters(eth_json: Dict[str, Any], signer_pool: SignerPool) -> List[str]:
+    """
+    Purpose:
+        Allow every wallet in the pool to mint, signed by the contract owner
+    Args:
+        eth_json - blockchain info with the owner's keys
+        signer_pool - pool of minting wallets
+    Returns:
+        hashes - setMinter txn hashes, one per wallet that wasn't a minter
+    """
+    w3 = eth_json["w3"]
+    CODE_NFT = eth_json["contract"]
+    nonce_manager = eth_json["client"].nonce_manager(eth_json["public_key"])
+
+    hashes = []
+    for address in signer_pool.addresses():
+        if (
+            address == eth_json["public_key"]
+            or CODE_NFT.functions.minters(address).call()
+        ):
+            continue
+
+        set_minter = CODE_NFT.functions.setMinter(address, True)
+        txn = set_minter.buildTransaction(
+            {
+                "chainId": eth_json["chain_id"],
+                "from": eth_json["public_key"],
+                "nonce": nonce_manager.next_nonce(),
+                **eth_json["fee_oracle"].fee_params(),
+            }
+        )
+        signed_txn = w3.eth.account.sign_transaction(
+            txn, private_key=eth_json["private_key"]
+        )
+        w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        hash = w3.toHex(w3.keccak(signed_txn.rawTransaction))
+
+        logging.info(f"setMinter {address} txn hash: {hash}")
+        hashes.append(hash)
+
+    for hash in hashes:
+        receipt = w3.eth.wait_for_transaction_receipt(hash)
+        if receipt["status"] == 0:
+            raise RuntimeError(f"setMinter txn {hash} reverted")
+
+    return hashes
@@ -0,0 +1,690 @@
+# Python imports
+import logging
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Local Python Library Imports
+from modules.receipt_decoder import (
+    TRANSFER_TOPIC,
+    ZERO_ADDRESS,
+    decode_transfers,
+    to_hex,
+)
+
+# Substrings of eth_getLogs errors that mean the range should be split
+RANGE_ERRORS = (
+    "more than",
+    "too many",
+    "range",
+    "limit exceeded",
+    "response size",
+    "timed out",
+    "timeout",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transfers (
+    block_number INTEGER NOT NULL,
+    block_hash TEXT,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    from_address TEXT NOT NULL,
+    to_address TEXT NOT NULL,
+    token_id INTEGER NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS transfers_token ON transfers (token_id);
+CREATE INDEX IF NOT EXISTS transfers_to ON transfers (to_address);
+CREATE INDEX IF NOT EXISTS transfers_from ON transfers (from_address);
+CREATE TABLE IF NOT EXISTS tokens (
+    token_id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    token_uri TEXT,
+    minted_block INTEGER,
+    updated_block INTEGER NOT NULL,
+    updated_log_index INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tokens_owner ON tokens (owner);
+CREATE TABLE IF NOT EXISTS blocks (
+    block_number INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL,
+    parent_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    block_number INTEGER NOT NULL,
+    block_hash TEXT NOT NULL
+);
+"""
+
+
+def is_range_error(error: Exception) -> bool:
+    """
+    Purpose:
+        Check if an eth_getLogs error means the block range was too big
+    Args:
+        error - exception raised by get_logs
+    Returns:
+        status - True if a smaller range may succeed
+    """
+    message = str(error).lower()
+    return any(fragment in message for fragment in RANGE_ERRORS)
+
+
+class TransferStore:
+    """
+    Purpose:
+        SQLite store of an ERC721 contract's Transfer history and current
+        owners, indexed for owner and token lookups
+    Args:
+        path - sqlite file path
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(transfers)")]
+        if "block_hash" not in columns:
+            # Stores made before block hashes were kept
+            self._conn.execute("ALTER TABLE transfers ADD COLUMN block_hash TEXT")
+        self._conn.commit()
+
+    def add_transfers(self, transfers: Dict[str, List[Any]]) -> int:
+        """
+        Purpose:
+            Insert decoded Transfer events and move token ownership, events
+            must be added in chain order. A stored event at the same
+            (block, log index) from another block hash was orphaned by a
+            reorg, it is replaced and its token's owner recomputed.
+        Args:
+            transfers - columns from decode_transfers
+        Returns:
+            count - events added, already stored ones included
+        """
+        rows = list(
+            zip(
+                transfers["block_numbers"],
+                transfers["log_indexes"],
+                transfers["tx_hashes"],
+                transfers["from"],
+                transfers["to"],
+                transfers["token_ids"],
+                transfers["block_hashes"],
+            )
+        )
+        if not rows:
+            return 0
+
+        with self._lock:
+            new_hashes = {(row[0], row[1]): row[6] for row in rows}
+            stored = self._conn.execute(
+                "SELECT block_number, log_index, block_hash, token_id FROM transfers "
+                "WHERE block_number BETWEEN ? AND ?",
+                (rows[0][0], rows[-1][0]),
+            ).fetchall()
+            orphaned_tokens = {
+                token_id
+                for block_number, log_index, block_hash, token_id in stored
+                if (block_number, log_index) in new_hashes
+                and block_hash != new_hashes[(block_number, log_index)]
+            }
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO transfers "
+                "(block_number, log_index, tx_hash, from_address, to_address, "
+                "token_id, block_hash) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # Later events win, so re-adding an older range changes nothing
+            self._conn.executemany(
+                "INSERT INTO tokens "
+                "(token_id, owner, minted_block, updated_block, updated_log_index) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(token_id) DO UPDATE SET "
+                "owner = excluded.owner, "
+                "minted_block = COALESCE(minted_block, excluded.minted_block), "
+                "updated_block = excluded.updated_block, "
+                "updated_log_index = excluded.updated_log_index "
+                "WHERE (excluded.updated_block, excluded.updated_log_index) "
+                "> (updated_block, updated_log_index)",
+                [
+                    (
+                        row[5],
+                        row[4],
+                        row[0] if row[3] == ZERO_ADDRESS else None,
+                        row[0],
+                        row[1],
+                    )
+                    for row in rows
+                ],
+            )
+            self._recompute_owners(orphaned_tokens)
+            self._conn.commit()
+
+        return len(rows)
+
+    def _recompute_owners(self, token_ids: Iterable[int]) -> None:
+        # Owner from the latest stored Transfer, tokens with none are dropped
+        for token_id in token_ids:
+            last = self._conn.execute(
+                "SELECT to_address, block_number, log_index FROM transfers "
+                "WHERE token_id = ? ORDER BY block_number DESC, log_index DESC "
+                "LIMIT 1",
+                (token_id,),
+            ).fetchone()
+            if last is None:
+                self._conn.execute("DELETE FROM tokens WHERE token_id = ?", (token_id,))
+            else:
+                self._conn.execute(
+                    "UPDATE tokens SET owner = ?, updated_block = ?, "
+                    "updated_log_index = ? WHERE token_id = ?",
+                    (*last, token_id),
+                )
+
+    def set_token_uris(
+        self, token_ids: Sequence[int], token_uris: Sequence[str]
+    ) -> None:
+        """
+        Purpose:
+            Store token URIs read from the contract
+        Args:
+            token_ids - tokens
+            token_uris - uri per token
+        Returns:
+            N/A
+        """
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE tokens SET token_uri = ? WHERE token_id = ?",
+                list(zip(token_uris, token_ids)),
+            )
+            self._conn.commit()
+
+    def tokens_missing_uri(self) -> List[int]:
+        """
+        Purpose:
+            Tokens without a stored URI
+        Args:
+            N/A
+        Returns:
+            token_ids - tokens to read URIs for
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT token_id FROM tokens WHERE token_uri IS NULL"
+            ).fetchall()
+
+        return [row[0] for row in rows]
+
+    def _query(self, sql: str, params: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+
+        return [dict(zip(columns, row)) for row in rows]
+
+    def owner_of(self, token_id: int) -> Optional[str]:
+        """
+        Purpose:
+            Current owner of a token
+        Args:
+            token_id - token
+        Returns:
+            owner - lowercase address, None if the token was never seen
+        """
+        rows = self._query("SELECT owner FROM tokens WHERE token_id = ?", (token_id,))
+        return rows[0]["owner"] if rows else None
+
+    def tokens_of(self, owner: str) -> List[Dict[str, Any]]:
+        """
+        Purpose:
+            Tokens an address owns, like the subgraph's owner query
+        Args:
+            owner - address
+        Returns:
+            tokens - token rows with token_id, owner and token_uri
+        """
+        return self._query(
+            "SELECT token_id, owner, token_uri FROM tokens "
+            "WHERE owner = ? ORDER BY token_id",
+            (owner.lower(),),
+        )
+
+    def history_of(self, token_id: int) -> List[Dict[str, Any]]:
+        """
+        Purpose:
+            Every Transfer of a token, oldest first
+        Args:
+            token_id - token
+        Returns:
+            transfers - transfer rows
+        """
+        return self._query(
+            "SELECT * FROM transfers WHERE token_id = ? "
+            "ORDER BY block_number, log_index",
+            (token_id,),
+        )
+
+    def checkpoint(self) -> Optional[Tuple[int, str]]:
+        """
+        Purpose:
+            Last block the store is synced to
+        Args:
+            N/A
+        Returns:
+            checkpoint - (block number, block hash), None before the first sync
+        """
+        rows = self._query(
+            "SELECT block_number, block_hash FROM checkpoint WHERE id = 0", ()
+        )
+        return (rows[0]["block_number"], rows[0]["block_hash"]) if rows else None
+
+    def save_blocks(self, blocks: Sequence[Tuple[int, str, str]]) -> None:
+        """
+        Purpose:
+            Remember block hashes to find the common ancestor after a reorg,
+            the last one becomes the checkpoint
+        Args:
+            blocks - (block number, block hash, parent hash) in chain order
+        Returns:
+            N/A
+        """
+        if not blocks:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO blocks "
+                "(block_number, block_hash, parent_hash) VALUES (?, ?, ?)",
+                blocks,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoint (id, block_number, block_hash) "
+                "VALUES (0, ?, ?)",
+                blocks[-1][:2],
+            )
+            self._conn.commit()
+
+    def saved_blocks(self) -> List[Tuple[int, str]]:
+        """
+        Purpose:
+            Remembered block hashes, newest first
+        Args:
+            N/A
+        Returns:
+            blocks - (block number, block hash) pairs
+        """
+        rows = self._query(
+            "SELECT block_number, block_hash FROM blocks ORDER BY block_number DESC",
+            (),
+        )
+        return [(row["block_number"], row["block_hash"]) for row in rows]
+
+    def prune_blocks(self, below: int) -> None:
+        """
+        Purpose:
+            Forget block hashes too old to be reorged
+        Args:
+            below - drop blocks under this number
+        Returns:
+            N/A
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM blocks WHERE block_number < ?", (below,))
+            self._conn.commit()
+
+    def block_hashes_after(self, block_number: int) -> Dict[int, str]:
+        """
+        Purpose:
+            Block hashes the stored transfers came from
+        Args:
+            block_number - only blocks above this
+        Returns:
+            block_hashes - block number to hash
+        """
+        rows = self._query(
+            "SELECT DISTINCT block_number, block_hash FROM transfers "
+            "WHERE block_number > ? AND block_hash IS NOT NULL",
+            (block_number,),
+        )
+        return {row["block_number"]: row["block_hash"] for row in rows}
+
+    def rollback(self, block_number: int) -> int:
+        """
+        Purpose:
+            Undo everything after a block, owners go back to their last
+            Transfer at or before it
+        Args:
+            block_number - last block to keep
+        Returns:
+            count - transfers removed
+        """
+        with self._lock:
+            count = self._conn.execute(
+                "DELETE FROM transfers WHERE block_number > ?", (block_number,)
+            ).rowcount
+
+            affected = self._conn.execute(
+                "SELECT token_id FROM tokens WHERE updated_block > ?",
+                (block_number,),
+            ).fetchall()
+            self._recompute_owners(token_id for (token_id,) in affected)
+
+            self._conn.execute(
+                "DELETE FROM blocks WHERE block_number > ?", (block_number,)
+            )
+            row = self._conn.execute(
+                "SELECT block_number, block_hash FROM blocks "
+                "ORDER BY block_number DESC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._conn.execute("DELETE FROM checkpoint")
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO checkpoint (id, block_number, block_hash) "
+                    "VALUES (0, ?, ?)",
+                    row,
+                )
+            self._conn.commit()
+
+        return count
+
+    def close(self) -> None:
+        """
+        Purpose:
+            Close the store
+        Args:
+            N/A
+        Returns:
+            N/A
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def get_transfer_logs(
+    w3: Any, contract_address: str, from_block: int, to_block: int
+) -> Tuple[List[Any], int]:
+    """
+    Purpose:
+        eth_getLogs for the contract's Transfers in a block range, halving the
+        range until the node accepts it
+    Args:
+        w3 - web3 instance
+        contract_address - NFT contract
+        from_block - first block
+        to_block - last block, inclusive
+    Returns:
+        logs - Transfer logs in chain order
+        span - size of the smallest sub range that was needed
+    """
+    try:
+        logs = w3.eth.get_logs(
+            {
+                "address": contract_address,
+                "topics": [TRANSFER_TOPIC],
+                "fromBlock": from_block,
+                "toBlock": to_block,
+            }
+        )
+        return logs, to_block - from_block + 1
+    except Exception as error:
+        if from_block == to_block or not is_range_error(error):
+            raise
+
+    middle = (from_block + to_block) // 2
+    left, left_span = get_transfer_logs(w3, contract_address, from_block, middle)
+    right, right_span = get_transfer_logs(w3, contract_address, middle + 1, to_block)
+
+    return left + right, min(left_span, right_span)
+
+
+def index_transfers(
+    w3: Any,
+    store: TransferStore,
+    contract_address: str,
+    from_block: int,
+    to_block: int,
+    chunk_size: int = 2000,
+    max_chunk_size: int = 100000,
+    target_logs: int = 5000,
+    max_workers: int = 4,
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Purpose:
+        Scan a block range for the contract's Transfers into the store. Ranges
+        are fetched concurrently and written in chain order, the chunk size
+        halves when the node refuses a range and doubles while chunks come
+        back well under target_logs.
+    Args:
+        w3 - web3 instance
+        store - transfer store
+        contract_address - NFT contract
+        from_block - first block, e.g. the contract's startBlock
+        to_block - last block, inclusive
+        chunk_size - starting blocks per eth_getLogs call
+        max_chunk_size - never grow chunks past this
+        target_logs - logs per chunk to aim for
+        max_workers - eth_getLogs calls in flight at once
+        on_chunk - called with the last block of each chunk once it is stored
+    Returns:
+        count - Transfer events indexed
+    """
+    count = 0
+    next_block = from_block
+    in_flight: deque = deque()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while next_block <= to_block or in_flight:
+            while next_block <= to_block and len(in_flight) < max_workers * 2:
+                end = min(next_block + chunk_size - 1, to_block)
+                future = executor.submit(
+                    get_transfer_logs, w3, contract_address, next_block, end
+                )
+                in_flight.append((future, end - next_block + 1, end))
+                next_block = end + 1
+
+            future, planned, end = in_flight.popleft()
+            logs, span = future.result()
+            count += store.add_transfers(decode_transfers(logs, contract_address))
+
+            if span < planned:
+                chunk_size = max(span, 1)
+            elif len(logs) < target_logs // 2:
+                chunk_size = min(chunk_size * 2, max_chunk_size)
+
+            logging.info(
+                f"Indexed to block {end}, {count} transfers, chunk {chunk_size}"
+            )
+            if on_chunk is not None:
+                on_chunk(end)
+
+    return count
+
+
+def get_headers(
+    w3: Any, block_numbers: Sequence[int], max_workers: int = 8
+) -> List[Tuple[int, str, str]]:
+    """
+    Purpose:
+        Hash and parent hash of many blocks, fetched concurrently
+    Args:
+        w3 - web3 instance
+        block_numbers - blocks to read
+        max_workers - calls in flight at once
+    Returns:
+        headers - (block number, block hash, parent hash) per block
+    """
+
+    def get_header(block_number: int) -> Tuple[int, str, str]:
+        block = w3.eth.get_block(block_number)
+        return block_number, to_hex(block["hash"]), to_hex(block["parentHash"])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(get_header, block_numbers))
+
+
+def find_common_ancestor(w3: Any, store: TransferStore) -> Optional[int]:
+    """
+    Purpose:
+        Find the last synced block that is still on the canonical chain. The
+        checkpoint is checked against the next block's parent hash, only on
+        a mismatch are the remembered hashes walked back.
+    Args:
+        w3 - web3 instance
+        store - transfer store
+    Returns:
+        block_number - last block to keep, None to start over
+    """
+    checkpoint = store.checkpoint()
+    if checkpoint is None:
+        return None
+
+    block_number, block_hash = checkpoint
+    head = w3.eth.block_number
+    if head > block_number:
+        _, _, parent_hash = get_headers(w3, [block_number + 1])[0]
+        if parent_hash == block_hash:
+            return block_number
+    elif head == block_number and get_headers(w3, [head])[0][1] == block_hash:
+        return block_number
+
+    # The new chain may be shorter, blocks past its head are gone anyway
+    saved = store.saved_blocks()
+    for saved_number, saved_hash in saved:
+        if saved_number > head:
+            continue
+        if get_headers(w3, [saved_number])[0][1] == saved_hash:
+            logging.warning(f"Reorg after block {saved_number}")
+            return saved_number
+
+    # Deeper than reorg_depth, fall back to the hashes stored with transfers,
+    # the newest still canonical one vouches for everything before it
+    logging.warning("Reorg deeper than the saved blocks, checking transfer blocks")
+    transfer_blocks = store.block_hashes_after(-1)
+    for transfer_number in sorted(transfer_blocks, reverse=True):
+        if transfer_number > head:
+            continue
+        if get_headers(w3, [transfer_number])[0][1] == transfer_blocks[transfer_number]:
+            logging.warning(f"Reorg after block {transfer_number}")
+            return transfer_number
+
+    return None
+
+
+def rollback_to(w3: Any, store: TransferStore, block_number: int) -> int:
+    """
+    Purpose:
+        Roll the store back to a block and make it the checkpoint, even when
+        its hash was already pruned
+    Args:
+        w3 - web3 instance
+        store - transfer store
+        block_number - last block to keep
+    Returns:
+        count - transfers removed
+    """
+    count = store.rollback(block_number)
+
+    checkpoint = store.checkpoint()
+    if checkpoint is None or checkpoint[0] != block_number:
+        store.save_blocks(get_headers(w3, [block_number]))
+
+    return count
+
+
+def sync_transfers(
+    w3: Any,
+    store: TransferStore,
+    contract_address: str,
+    start_block: int,
+    end_block: Optional[int] = None,
+    confirmations: int = 0,
+    reorg_depth: int = 128,
+    **index_args: Any,
+) -> Dict[str, Any]:
+    """
+    Purpose:
+        Bring the store up to the chain head, resuming from the checkpoint.
+        Blocks dropped by a reorg are rolled back first, and the newest
+        reorg_depth block hashes are kept to find the fork point next time.
+    Args:
+        w3 - web3 instance
+        store - transfer store
+        contract_address - NFT contract
+        start_block - block the contract was deployed in, used on first sync
+        end_block - stop here instead of the chain head
+        confirmations - stay this many blocks behind the head
+        reorg_depth - block hashes to keep for reorg detection
+        index_args - passed on to index_transfers
+    Returns:
+        summary - "from_block", "to_block", "transfers" indexed and
+            "rolled_back" transfers
+    """
+    summary = {"from_block": None, "to_block": None, "transfers": 0, "rolled_back": 0}
+
+    # Twice at most, a reorg between reading logs and headers is redone once
+    for _ in range(2):
+        # Always roll back first, an interrupted run can leave transfers
+        # stored past the checkpoint
+        ancestor = find_common_ancestor(w3, store)
+        if ancestor is None:
+            summary["rolled_back"] += store.rollback(start_block - 1)
+            from_block = start_block
+        else:
+            summary["rolled_back"] += rollback_to(w3, store, ancestor)
+            from_block = ancestor + 1
+
+        head = w3.eth.block_number - confirmations
+        if end_block is not None:
+            head = min(head, end_block)
+        if summary["from_block"] is None:
+            summary["from_block"] = from_block
+        summary["to_block"] = head
+        if from_block > head:
+            return summary
+
+        # Checkpoint every chunk that is too old to be reorged
+        def save_chunk(end: int) -> None:
+            if end < head - reorg_depth:
+                store.save_blocks(get_headers(w3, [end]))
+
+        summary["transfers"] += index_transfers(
+            w3,
+            store,
+            contract_address,
+            from_block,
+            head,
+            on_chunk=save_chunk,
+            **index_args,
+        )
+
+        tail = get_headers(w3, range(max(from_block, head - reorg_depth + 1), head + 1))
+        canonical = {block_number: block_hash for block_number, block_hash, _ in tail}
+        stale = [
+            block_number
+            for block_number, block_hash in store.block_hashes_after(
+                tail[0][0] - 1
+            ).items()
+            if canonical.get(block_number) != block_hash
+        ]
+        if stale:
+            # Logs came from a block that was reorged out while we read
+            summary["rolled_back"] += rollback_to(w3, store, min(stale) - 1)
+            continue
+
+        store.save_blocks(tail)
+        store.prune_blocks(head - reorg_depth + 1)
+        return summary
+
+    return summary
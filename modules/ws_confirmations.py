@@ -0,0 +1,322 @@
+# Python imports
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Local Python Library Imports
+from modules.mint_tracker import ConfirmationTracker, MintHandle
+
+# Quantity fields of a receipt and its logs, hex strings on the wire
+RECEIPT_QUANTITIES = (
+    "status",
+    "blockNumber",
+    "transactionIndex",
+    "gasUsed",
+    "cumulativeGasUsed",
+    "effectiveGasPrice",
+)
+LOG_QUANTITIES = ("blockNumber", "logIndex", "transactionIndex")
+# Hash fields of a receipt and its logs, HexBytes in web3
+RECEIPT_HASHES = ("transactionHash", "blockHash")
+
+# Blocks to remember, a hash tracked late is looked up in these
+RECENT_BLOCKS = 4
+
+# Missed blocks replayed on reconnect, past this every pending hash is checked
+MAX_CATCH_UP_BLOCKS = 16
+
+
+def format_receipt(receipt: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Purpose:
+        Turn a raw JSON-RPC receipt into the shape web3 returns, quantities
+        as ints and hashes and topics as HexBytes
+    Args:
+        receipt - receipt straight off the wire
+    Returns:
+        receipt - formatted receipt
+    """
+    # Comes with web3, which any tracker has loaded by now
+    from hexbytes import HexBytes
+
+    formatted = dict(receipt)
+    for field in RECEIPT_HASHES:
+        if formatted.get(field) is not None:
+            formatted[field] = HexBytes(formatted[field])
+
+    for field in RECEIPT_QUANTITIES:
+        if formatted.get(field) is not None:
+            formatted[field] = int(formatted[field], 16)
+
+    logs = []
+    for log in receipt.get("logs", []):
+        log = dict(log)
+        for field in RECEIPT_HASHES:
+            if log.get(field) is not None:
+                log[field] = HexBytes(log[field])
+        log["topics"] = [HexBytes(topic) for topic in log.get("topics", [])]
+        for field in LOG_QUANTITIES:
+            if log.get(field) is not None:
+                log[field] = int(log[field], 16)
+        logs.append(log)
+    formatted["logs"] = logs
+
+    return formatted
+
+
+class SubscriptionTracker(ConfirmationTracker):
+    """
+    Purpose:
+        Confirmation tracker driven by a newHeads WebSocket subscription
+        instead of receipt polling. Each new block's receipts are fetched once
+        in bulk (eth_getBlockReceipts, or one batch for just our hashes in the
+        block when the node lacks it) and every pending hash in the block is
+        resolved from them. Needs the optional websockets package, falls back
+        to polling without it.
+    Args:
+        w3 - web3 instance, used by the polling fallback
+        ws_url - WebSocket JSON-RPC url
+        get_tokenid - function to get the token id from a receipt
+        timeout - seconds before a pending handle fails, None to wait forever
+        on_revert - called with the handle when a mint txn reverts
+        on_block - called with the block number on every new block
+        reconnect_delay - seconds to wait before reconnecting, also how often
+            timeouts are checked between blocks
+    """
+
+    def __init__(
+        self,
+        w3: Any,
+        ws_url: str,
+        get_tokenid: Callable[[Any], int],
+        timeout: Optional[float] = 600,
+        on_revert: Optional[Callable[[MintHandle], None]] = None,
+        on_block: Optional[Callable[[int], None]] = None,
+        reconnect_delay: float = 1.0,
+    ):
+        super().__init__(
+            w3,
+            get_tokenid,
+            poll_interval=reconnect_delay,
+            timeout=timeout,
+            on_revert=on_revert,
+            on_block=on_block,
+        )
+        self.ws_url = ws_url
+        self.block_receipts = True
+
+        self._request_id = 0
+        self._heads: deque = deque()
+        # Hashes already checked once, newer ones may have been mined in a
+        # block we saw before they were tracked
+        self._checked = set()
+        self._recent_blocks: deque = deque(maxlen=RECENT_BLOCKS)
+
+    def _run(self) -> None:
+        try:
+            import websockets
+        except ImportError:
+            logging.warning("websockets is not installed, polling for receipts")
+            super()._run()
+            return
+
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+
+            try:
+                asyncio.run(self._listen(websockets))
+            except Exception as error:
+                logging.error(f"newHeads subscription failed: {error}")
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    async def _listen(self, websockets: Any) -> None:
+        async with websockets.connect(self.ws_url, max_size=None) as ws:
+            self._heads.clear()
+            await self._call(ws, "eth_subscribe", ["newHeads"])
+
+            await self._catch_up(ws)
+
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        return
+
+                head = await self._next_head(ws)
+                if head is not None:
+                    await self._on_head(ws, head)
+                self._expire()
+
+    async def _catch_up(self, ws: Any) -> None:
+        # Blocks mined while we were not subscribed are handled like heads,
+        # after a long outage every pending hash is checked once instead
+        latest = int(await self._call(ws, "eth_blockNumber", []), 16)
+        first = self._last_block + 1 if self._last_block >= 0 else latest
+
+        self._recent_blocks.clear()
+        if latest - first >= MAX_CATCH_UP_BLOCKS:
+            self._checked.clear()
+            await self._check_new_hashes(ws, catch_up=True)
+            caught_up = [latest]
+        else:
+            caught_up = range(first, latest + 1)
+            for number in caught_up:
+                block = await self._call(
+                    ws, "eth_getBlockByNumber", [hex(number), False]
+                )
+                await self._handle_block(ws, block["hash"])
+
+        self._last_block = latest
+        await self._check_new_hashes(ws)
+
+        if self.on_block is not None:
+            for number in caught_up:
+                self.on_block(number)
+
+    async def _on_head(self, ws: Any, head: Dict[str, Any]) -> None:
+        block_number = int(head["number"], 16)
+        self._last_block = block_number
+
+        await self._handle_block(ws, head["hash"])
+        await self._check_new_hashes(ws)
+
+        if self.on_block is not None:
+            self.on_block(block_number)
+
+    async def _handle_block(self, ws: Any, block_hash: str) -> None:
+        with self._lock:
+            pending = set(self._pending)
+
+        block = await self._fetch_block(ws, block_hash, pending)
+        for hash, receipt in block.items():
+            if receipt is not None and hash in pending:
+                self._resolve(hash, format_receipt(receipt))
+
+        self._recent_blocks.append(block)
+
+    async def _fetch_block(
+        self, ws: Any, block_hash: str, pending: set
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        # Every txn hash in the block, with the receipt if it was fetched
+        if self.block_receipts:
+            try:
+                receipts = await self._call(ws, "eth_getBlockReceipts", [block_hash])
+                return {
+                    receipt["transactionHash"].lower(): receipt for receipt in receipts
+                }
+            except ValueError as error:
+                logging.info(f"eth_getBlockReceipts unavailable ({error})")
+                self.block_receipts = False
+
+        block_txns = await self._call(ws, "eth_getBlockByHash", [block_hash, False])
+        block = {hash.lower(): None for hash in block_txns["transactions"]}
+
+        ours = [hash for hash in block if hash in pending]
+        if ours:
+            receipts = await self._batch(
+                ws, [("eth_getTransactionReceipt", [hash]) for hash in ours]
+            )
+            block.update(zip(ours, receipts))
+
+        return block
+
+    async def _check_new_hashes(self, ws: Any, catch_up: bool = False) -> None:
+        # A hash tracked just after its block was handled is only in the
+        # recent blocks, so only those need a receipt fetch
+        with self._lock:
+            pending = set(self._pending)
+        self._checked &= pending
+
+        new_hashes = pending - self._checked
+        if not new_hashes:
+            return
+        self._checked |= new_hashes
+
+        receipts = {}
+        to_fetch = []
+        for hash in new_hashes:
+            mined = [block for block in self._recent_blocks if hash in block]
+            if mined and mined[0][hash] is not None:
+                receipts[hash] = mined[0][hash]
+            elif mined or catch_up:
+                to_fetch.append(hash)
+
+        if to_fetch:
+            fetched = await self._batch(
+                ws, [("eth_getTransactionReceipt", [hash]) for hash in to_fetch]
+            )
+            receipts.update(zip(to_fetch, fetched))
+
+        for hash, receipt in receipts.items():
+            if receipt is not None:
+                self._resolve(hash, format_receipt(receipt))
+
+    async def _next_head(self, ws: Any) -> Optional[Dict[str, Any]]:
+        if self._heads:
+            return self._heads.popleft()
+
+        try:
+            message = await asyncio.wait_for(ws.recv(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            return None
+
+        message = json.loads(message)
+        if isinstance(message, dict) and message.get("method") == "eth_subscription":
+            return message["params"]["result"]
+        return None
+
+    async def _receive(self, ws: Any, is_response: Callable[[Any], bool]) -> Any:
+        # Heads that arrive while waiting on a response are kept for later
+        while True:
+            message = json.loads(await ws.recv())
+            if (
+                isinstance(message, dict)
+                and message.get("method") == "eth_subscription"
+            ):
+                self._heads.append(message["params"]["result"])
+            elif is_response(message):
+                return message
+
+    def _next_id(self) -> int:
+        self._request_id += 1
+        return self._request_id
+
+    async def _call(self, ws: Any, method: str, params: List[Any]) -> Any:
+        request_id = self._next_id()
+        await ws.send(
+            json.dumps(
+                {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+            )
+        )
+
+        response = await self._receive(
+            ws,
+            lambda message: isinstance(message, dict)
+            and message.get("id") == request_id,
+        )
+        if "error" in response:
+            raise ValueError(response["error"])
+
+        return response["result"]
+
+    async def _batch(self, ws: Any, calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+        requests = [
+            {
+                "jsonrpc": "2.0",
+                "id": self._next_id(),
+                "method": method,
+                "params": params,
+            }
+            for method, params in calls
+        ]
+        await ws.send(json.dumps(requests))
+
+        responses = await self._receive(ws, lambda message: isinstance(message, list))
+        by_id = {response["id"]: response for response in responses}
+
+        return [by_id.get(request["id"], {}).get("result") for request in requests]
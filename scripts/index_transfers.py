@@ -0,0 +1,113 @@
+# Python imports
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Allow running from the scripts/ dir
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Local Python Library Imports
+from modules.chain_client import get_chain_client
+from modules.transfer_indexer import TransferStore, sync_transfers
+
+
+def main():
+    logging.info("Starting Transfer indexer")
+
+    parser = argparse.ArgumentParser(
+        description="Index NFT Transfers into SQLite, a local alternative to the subgraph"
+    )
+    parser.add_argument(
+        "--contract_address",
+        type=str,
+        help="contract_address for smart contract",
+        required=True,
+    )
+    parser.add_argument(
+        "--abi_path",
+        type=str,
+        help="abi_path for NFT contract, example: ../build/contracts/NFTNANE.json",
+        required=True,
+    )
+    parser.add_argument(
+        "--db", type=str, default="transfers.db", help="sqlite file to index into"
+    )
+    parser.add_argument(
+        "--start_block",
+        type=int,
+        default=0,
+        help="block the contract was deployed in, the subgraph's startBlock, "
+        "later runs resume from the db's checkpoint",
+    )
+    parser.add_argument("--end_block", type=int, help="last block, default latest")
+    parser.add_argument(
+        "--confirmations",
+        type=int,
+        default=0,
+        help="stay this many blocks behind the head",
+    )
+    parser.add_argument(
+        "--reorg_depth",
+        type=int,
+        default=128,
+        help="recent block hashes kept to detect and undo reorgs",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="eth_getLogs calls in flight"
+    )
+    parser.add_argument(
+        "--with_uris", action="store_true", help="also read tokenURI for new tokens"
+    )
+    parser.add_argument("--address", type=str, help="log the tokens this address owns")
+
+    args = parser.parse_args()
+
+    client = get_chain_client(
+        args.contract_address,
+        args.abi_path,
+        os.environ["INFURA_KEY"],
+        os.environ["NETWORK"],
+    )
+    w3 = client.w3
+
+    store = TransferStore(args.db)
+    summary = sync_transfers(
+        w3,
+        store,
+        client.contract.address,
+        args.start_block,
+        end_block=args.end_block,
+        confirmations=args.confirmations,
+        reorg_depth=args.reorg_depth,
+        max_workers=args.concurrency,
+    )
+    end_block = summary["to_block"]
+    if summary["rolled_back"]:
+        logging.warning(f"Rolled back {summary['rolled_back']} reorged transfers")
+    logging.info(
+        f"Indexed {summary['transfers']} transfers from block "
+        f"{summary['from_block']} up to block {end_block}"
+    )
+
+    if args.with_uris:
+        from modules.chain_reader import batch_read_tokens
+
+        token_ids = store.tokens_missing_uri()
+        tokens = batch_read_tokens(
+            {"w3": w3, "contract": client.contract}, token_ids, end_block
+        )
+        store.set_token_uris(tokens["token_ids"], tokens["token_uris"])
+        logging.info(f"Read {len(token_ids)} token URIs")
+
+    if args.address:
+        logging.info(store.tokens_of(args.address))
+
+    store.close()
+
+
+if __name__ == "__main__":
+    loglevel = logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    main()
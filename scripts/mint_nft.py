@@ -3,153 +3,100 @@ import argparse
 import json
 import logging
 import os
+import sys
+from pathlib import Path
 from typing import Dict, Any
 
-from web3 import Web3
+# Allow running from the scripts/ dir
+sys.path.append(str(Path(__file__).resolve().parent.parent))
 
+# Local Python Library Imports
+from modules import mint_nft as mint_client
+from modules.mint_journal import MintJournal, reconcile
+from modules.mint_metrics import log_sink
 
-def load_json(path_to_json: str) -> Dict[str, Any]:
-    """
-    Purpose:
-        Load json files
-    Args:
-        path_to_json (String): Path to  json file
-    Returns:
-        Conf: JSON file if loaded, else None
-    """
-    try:
-        with open(path_to_json, "r") as config_file:
-            conf = json.load(config_file)
-            return conf
-
-    except Exception as error:
-        logging.error(error)
-        raise TypeError("Invalid JSON file")
 
-
-def set_up_blockchain(contract: str, abi_path: str):
+def set_up_blockchain(
+    contract: str, abi_path: str, transport: str = "http"
+) -> Dict[str, Any]:
     """
     Purpose:
-       Setup all blockchain items
+       Setup all blockchain items from the PUBLIC_KEY, PRIVATE_KEY, INFURA_KEY
+       and NETWORK env vars
     Args:
-        path_to_json (String): Path to  json file
+        contract: contract address
+        abi_path: abi path
+        transport: "http" or "ws"
     Returns:
-        Conf: JSON file if loaded, else None
+        Conf: JSON file with eth details
     """
-    ############ Ethereum Setup ############
-
-    PUBLIC_KEY = os.environ["PUBLIC_KEY"]
-    PRIVATE_KEY = Web3.toBytes(hexstr=os.environ["PRIVATE_KEY"])
-    INFURA_KEY = os.environ["INFURA_KEY"]
-
-    network = os.environ["NETWORK"]
-    ABI = None
-    CODE_NFT = None
-    CHAIN_ID = None
-    w3 = None
-    open_sea_url = ""
-    scan_url = ""
-
-    eth_json = {}
-
-    if network == "rinkeby":
-
-        RINK_API_URL = f"https://rinkeby.infura.io/v3/{INFURA_KEY}"
-
-        w3 = Web3(Web3.HTTPProvider(RINK_API_URL))
-        ABI = load_json(abi_path)["abi"]  # get the ABI
-        CODE_NFT = w3.eth.contract(address=contract, abi=ABI)  # The contract
-        CHAIN_ID = 4
-
-        open_sea_url = f"https://testnets.opensea.io/assets/{contract}/"
-        scan_url = "https://rinkeby.etherscan.io/tx/"
-
-    elif network == "mumbai":
-        MUMBAI_API_URL = f"https://polygon-mumbai.infura.io/v3/{INFURA_KEY}"
-
-        w3 = Web3(Web3.HTTPProvider(MUMBAI_API_URL))
-        ABI = load_json(abi_path)["abi"]  # get the ABI
-        CODE_NFT = w3.eth.contract(address=contract, abi=ABI)  # The contract
-        CHAIN_ID = 80001
-
-        open_sea_url = f"https://testnets.opensea.io/assets/{contract}/"
-        scan_url = "https://mumbai.polygonscan.com/tx/"
-
-    elif network == "matic_main":
-        POLYGON_API_URL = f"https://polygon-mainnet.infura.io/v3/{INFURA_KEY}"
-
-        w3 = Web3(Web3.HTTPProvider(POLYGON_API_URL))
-        ABI = load_json(abi_path)["abi"]  # get the ABI
-        CODE_NFT = w3.eth.contract(address=contract, abi=ABI)  # The contract
-        CHAIN_ID = 137
-
-        open_sea_url = f"https://opensea.io/assets/matic/{contract}/"
-        scan_url = "https://polygonscan.com/tx/"
-
-    else:
-        logging.error("Invalid network")
-        raise ValueError(f"Invalid {network}")
-
-    logging.info(f"checking if connected to infura...{w3.isConnected()}")
-
-    eth_json["w3"] = w3
-    eth_json["contract"] = CODE_NFT
-    eth_json["chain_id"] = CHAIN_ID
-    eth_json["open_sea_url"] = open_sea_url
-    eth_json["scan_url"] = scan_url
-    eth_json["public_key"] = PUBLIC_KEY
-    eth_json["private_key"] = PRIVATE_KEY
-
-    return eth_json
+    return mint_client.set_up_blockchain(
+        contract,
+        abi_path,
+        os.environ["PUBLIC_KEY"],
+        os.environ["PRIVATE_KEY"],
+        os.environ["INFURA_KEY"],
+        os.environ["NETWORK"],
+        transport=transport,
+    )
 
 
-def web3_mint(userAddress: str, tokenURI: str, eth_json: Dict[str, Any]) -> str:
+def bulk_mint(args: argparse.Namespace) -> None:
     """
     Purpose:
-        mint a token for user on blockchain
+        Mint every job in the input file from one process, writing results to
+        the output file as they confirm
     Args:
-        userAddress - the user to mint for
-        tokenURI - metadat info for NFT
-        eth_json - blockchain info
+        args - parsed cli args
     Returns:
-        hash - txn of mint
-        tokenid - token minted
+        N/A
     """
+    eth_json = set_up_blockchain(args.contract_address, args.abi_path, args.transport)
+    if args.bump_after_blocks:
+        mint_client.enable_fee_bumping(eth_json, args.bump_after_blocks)
+
+    metrics = mint_client.enable_metrics(eth_json) if args.metrics else None
+
+    journal = None
+    if args.journal:
+        journal = MintJournal(args.journal)
+        # Settle whatever a previous run left in flight before minting more
+        reconcile(journal, eth_json["w3"])
+
+    output_file = args.output_file or f"{args.input_file}.results.jsonl"
+    minted = failed = 0
+
+    mint_jobs = mint_client.read_mint_jobs(args.input_file)
+    if args.batch_gas_budget:
+        results = mint_client.web3_bulk_mint_batched(
+            mint_jobs,
+            eth_json,
+            gas_budget=args.batch_gas_budget,
+            max_in_flight=args.concurrency,
+        )
+    else:
+        results = mint_client.web3_bulk_mint(
+            mint_jobs, eth_json, max_in_flight=args.concurrency, journal=journal
+        )
 
-    PUBLIC_KEY = eth_json["public_key"]
-    CHAIN_ID = eth_json["chain_id"]
-    w3 = eth_json["w3"]
-    CODE_NFT = eth_json["contract"]
-    PRIVATE_KEY = eth_json["private_key"]
-
-    nonce = w3.eth.get_transaction_count(PUBLIC_KEY)
-
-    # Create the contracrt
-    mint_txn = CODE_NFT.functions.mint(userAddress, tokenURI).buildTransaction(
-        {
-            "chainId": CHAIN_ID,
-            "gas": 3000000,
-            "gasPrice": w3.eth.gasPrice,
-            "nonce": nonce,
-        }
-    )
-
-    signed_txn = w3.eth.account.sign_transaction(mint_txn, private_key=PRIVATE_KEY)
-
-    w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-    hash = w3.toHex(w3.keccak(signed_txn.rawTransaction))
-
-    logging.info(f"mint txn hash: {hash} ")
+    with open(output_file, "a") as results_file:
+        for result in results:
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
 
-    receipt = w3.eth.wait_for_transaction_receipt(hash)  # hmmm have to wait...
+            if result["error"] is None:
+                minted += 1
+            else:
+                failed += 1
+                logging.error(f"Mint {result['job_id']} failed: {result['error']}")
 
-    hex_tokenid = receipt["logs"][0]["topics"][3].hex()  # this is token id in hex
+    if journal is not None:
+        journal.close()
 
-    # convert from hex to decmial
-    tokenid = int(hex_tokenid, 16)
-    logging.info(f"Got tokenid: {tokenid}")
+    if metrics is not None:
+        metrics.export(log_sink)
 
-    return hash, tokenid
+    logging.info(f"Minted {minted} tokens, {failed} failed, results in {output_file}")
 
 
 def main():
@@ -169,20 +116,84 @@ def main():
         required=True,
     )
 
+    parser.add_argument("--to_address", type=str, help="address to send token")
+
+    parser.add_argument("--token_metadata_url", type=str, help="link to token_metadata")
+
     parser.add_argument(
-        "--to_address", type=str, help="address to send token", required=True
+        "--input_file",
+        type=str,
+        help="CSV or JSONL file of to_address,token_metadata_url rows to mint",
+    )
+    parser.add_argument(
+        "--output_file",
+        type=str,
+        help="JSONL file to append results to, default INPUT_FILE.results.jsonl",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=50,
+        help="max mints in flight at once, mintBatch txns with --batch_gas_budget",
+    )
+    parser.add_argument(
+        "--journal",
+        type=str,
+        help="sqlite mint journal, re-running with the same journal resumes",
     )
 
     parser.add_argument(
-        "--token_metadata_url", type=str, help="link to token_metadata", required=True
+        "--batch_gas_budget",
+        type=int,
+        help="mint with mintBatch, packing tokens into txns of up to this much gas",
+    )
+
+    parser.add_argument(
+        "--bump_after_blocks",
+        type=int,
+        help="re-send mints stuck this many blocks with higher fees, off by default",
+    )
+
+    parser.add_argument(
+        "--transport",
+        choices=["http", "ws"],
+        default="http",
+        help="ws confirms mints from a newHeads subscription instead of polling",
+    )
+
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="log per-phase mint timings and rpc calls per mint at the end",
     )
 
     args = parser.parse_args()
+
+    if args.input_file:
+        if args.batch_gas_budget and args.journal:
+            parser.error("--journal is not supported with --batch_gas_budget")
+        bulk_mint(args)
+        return
+
+    if not args.to_address or not args.token_metadata_url:
+        parser.error("--to_address and --token_metadata_url are required")
+
     # Setup blockchain basics
-    eth_json = set_up_blockchain(args.contract_address, args.abi_path)
+    eth_json = set_up_blockchain(args.contract_address, args.abi_path, args.transport)
+    if args.bump_after_blocks:
+        mint_client.enable_fee_bumping(eth_json, args.bump_after_blocks)
+
+    metrics = mint_client.enable_metrics(eth_json) if args.metrics else None
+
     # Mint token
-    txn_hash, tokenid = web3_mint(args.to_address, args.token_metadata_url, eth_json)
-    logging.info(f"Scan url for token {tokenid}: {eth_json['scan_url']}{txn_hash} ")
+    handle = mint_client.web3_submit_mint(
+        args.to_address, args.token_metadata_url, eth_json
+    )
+    tokenid = handle.result()
+    logging.info(f"Scan url for token {tokenid}: {eth_json['scan_url']}{handle.hash} ")
+
+    if metrics is not None:
+        metrics.export(log_sink)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+# Python imports
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Allow running from the scripts/ dir
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Local Python Library Imports
+from modules.bulk_pin import pin_directory
+from modules.pinata_api import AdaptiveRateLimiter, PinCache, PinataClient
+
+
+def main():
+    logging.info("Starting bulk pin")
+
+    parser = argparse.ArgumentParser(
+        description="Pin every file in a directory to IPFS with Pinata, "
+        "PINATA_KEY and PINATA_SECRET come from the environment"
+    )
+    parser.add_argument(
+        "directory", type=str, help="directory to pin, example: images/"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        help="JSONL of path to CID results, re-runs skip what it has pinned, "
+        "default <directory>.pins.jsonl",
+    )
+    parser.add_argument(
+        "--pattern", type=str, default="*", help="only pin names matching this glob"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="pin files as JSON with pinJSONToIPFS, for metadata_jsons/",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="pins in flight at once"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=3.0, help="starting API requests per second"
+    )
+    parser.add_argument(
+        "--max_rate",
+        type=float,
+        default=30.0,
+        help="API requests per second the rate limiter may climb to",
+    )
+    parser.add_argument(
+        "--retries", type=int, default=1, help="extra passes over failed files"
+    )
+    parser.add_argument(
+        "--pin_cache",
+        type=str,
+        default="pinned_cids.txt",
+        help="local file of CIDs known to be pinned",
+    )
+    parser.add_argument(
+        "--always_upload",
+        action="store_true",
+        help="upload even when the locally computed CID is already pinned",
+    )
+
+    args = parser.parse_args()
+
+    manifest = args.manifest or f"{args.directory.rstrip('/')}.pins.jsonl"
+    client = PinataClient(
+        os.environ["PINATA_KEY"],
+        os.environ["PINATA_SECRET"],
+        pool_size=args.concurrency,
+        rate_limiter=AdaptiveRateLimiter(rate=args.rate, max_rate=args.max_rate),
+        pin_cache=PinCache(args.pin_cache),
+        skip_pinned=not args.always_upload,
+    )
+
+    summary = pin_directory(
+        client,
+        args.directory,
+        manifest,
+        pattern=args.pattern,
+        max_workers=args.concurrency,
+        as_json=args.json,
+        retries=args.retries,
+    )
+    logging.info(
+        f"Pinned {summary['pinned']}, skipped {summary['skipped']} already "
+        f"pinned, {len(summary['failed'])} failed, manifest in {manifest}"
+    )
+    for path in summary["failed"]:
+        logging.error(f"Not pinned: {path}")
+
+
+if __name__ == "__main__":
+    loglevel = logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    main()
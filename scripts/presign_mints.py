@@ -0,0 +1,138 @@
+# Python imports
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Allow running from the scripts/ dir
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Local Python Library Imports
+from modules import presign
+from modules.chain_client import get_chain_client
+from modules.mint_nft import read_mint_jobs
+from modules.utils import load_json
+
+
+def sign(args: argparse.Namespace) -> None:
+    """
+    Purpose:
+        Sign every job offline, PRIVATE_KEY comes from the environment
+    Args:
+        args - parsed cli args
+    Returns:
+        N/A
+    """
+    from web3 import Web3
+
+    txn_fields = {
+        "chainId": args.chain_id,
+        "gas": args.gas,
+        "maxFeePerGas": Web3.toWei(args.max_fee_gwei, "gwei"),
+        "maxPriorityFeePerGas": Web3.toWei(args.priority_fee_gwei, "gwei"),
+    }
+
+    count = presign.presign_mints(
+        read_mint_jobs(args.input_file),
+        load_json(args.abi_path)["abi"],
+        args.contract_address,
+        os.environ["PRIVATE_KEY"],
+        args.start_nonce,
+        txn_fields,
+        args.output_file,
+        processes=args.processes,
+    )
+    logging.info(f"Signed {count} mints into {args.output_file}")
+
+
+def broadcast(args: argparse.Namespace) -> None:
+    """
+    Purpose:
+        Send signed mints, INFURA_KEY and NETWORK come from the environment
+    Args:
+        args - parsed cli args
+    Returns:
+        N/A
+    """
+    client = get_chain_client(
+        args.contract_address,
+        args.abi_path,
+        os.environ["INFURA_KEY"],
+        os.environ["NETWORK"],
+    )
+
+    with open(args.output_file, "a") as results_file:
+        for handle in presign.broadcast_presigned(
+            presign.read_presigned(args.input_file),
+            {"client": client},
+            max_in_flight=args.concurrency,
+        ):
+            error = handle.exception()
+            result = {
+                "to_address": handle.to_address,
+                "token_uri": handle.token_uri,
+                "hash": handle.hash,
+                "nonce": handle.nonce,
+                "tokenid": handle.result() if error is None else None,
+                "error": str(error) if error is not None else None,
+            }
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
+
+
+def main():
+    logging.info("Starting presign")
+
+    parser = argparse.ArgumentParser(description="Pre-sign and broadcast NFT mints")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sign_parser = subparsers.add_parser("sign", help="sign mints offline")
+    broadcast_parser = subparsers.add_parser("broadcast", help="send signed mints")
+
+    for subparser in (sign_parser, broadcast_parser):
+        subparser.add_argument(
+            "--contract_address",
+            type=str,
+            help="contract_address for smart contract",
+            required=True,
+        )
+        subparser.add_argument(
+            "--abi_path",
+            type=str,
+            help="abi_path for NFT contract, example: ../build/contracts/NFTNANE.json",
+            required=True,
+        )
+        subparser.add_argument("--input_file", type=str, required=True)
+        subparser.add_argument("--output_file", type=str, required=True)
+
+    sign_parser.set_defaults(func=sign)
+    sign_parser.add_argument(
+        "--start_nonce", type=int, help="nonce of the first mint", required=True
+    )
+    sign_parser.add_argument(
+        "--chain_id", type=int, help="80001 for mumbai, 137 for polygon", required=True
+    )
+    sign_parser.add_argument(
+        "--gas", type=int, help="gas limit per mint", required=True
+    )
+    sign_parser.add_argument("--max_fee_gwei", type=float, required=True)
+    sign_parser.add_argument("--priority_fee_gwei", type=float, required=True)
+    sign_parser.add_argument(
+        "--processes", type=int, help="signing processes, default one per core"
+    )
+
+    broadcast_parser.set_defaults(func=broadcast)
+    broadcast_parser.add_argument(
+        "--concurrency", type=int, default=50, help="max mints in flight at once"
+    )
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    loglevel = logging.INFO
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=loglevel)
+    main()
@@ -0,0 +1,141 @@
+# Python imports
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+# Allow importing modules/ from the repo root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# Local Python Library Imports
+from modules.mint_metrics import NULL_METRICS
+from modules.nonce_manager import NonceManager
+
+
+class FakeEth:
+    """
+    Purpose:
+        Just enough of w3.eth to sign and send txns without a node
+    Args:
+        pending_nonce - what get_transaction_count returns
+    """
+
+    def __init__(self, pending_nonce: int = 0):
+        self.pending_nonce = pending_nonce
+        self.send_errors: List[Optional[Exception]] = []
+        self.sent: List[bytes] = []
+        self.account = SimpleNamespace(sign_transaction=self._sign)
+
+    def _sign(self, txn: Dict[str, Any], private_key: Any) -> Any:
+        raw = repr(sorted(txn.items())).encode()
+        return SimpleNamespace(
+            rawTransaction=raw, hash=hashlib.sha256(raw).digest(), txn=txn
+        )
+
+    def get_transaction_count(self, address: str, block: str = "latest") -> int:
+        return self.pending_nonce
+
+    def send_raw_transaction(self, raw: bytes) -> bytes:
+        error = self.send_errors.pop(0) if self.send_errors else None
+        if error is not None:
+            raise error
+        self.sent.append(raw)
+        return hashlib.sha256(raw).digest()
+
+
+class FakeW3:
+    """
+    Purpose:
+        Stand-in for a Web3 instance, keccak is sha256 here
+    Args:
+        pending_nonce - starting nonce of the account
+    """
+
+    def __init__(self, pending_nonce: int = 0):
+        self.eth = FakeEth(pending_nonce)
+
+    @staticmethod
+    def keccak(data: bytes) -> bytes:
+        return hashlib.sha256(data).digest()
+
+    @staticmethod
+    def toHex(data: bytes) -> str:
+        return "0x" + data.hex()
+
+
+class FakeClient:
+    """
+    Purpose:
+        Stand-in for a ChainClient with one nonce manager
+    Args:
+        w3 - fake web3
+    """
+
+    def __init__(self, w3: FakeW3):
+        self.w3 = w3
+        self.metrics = NULL_METRICS
+        self._nonce_managers: Dict[str, NonceManager] = {}
+
+    def nonce_manager(self, address: str) -> NonceManager:
+        if address not in self._nonce_managers:
+            self._nonce_managers[address] = NonceManager(self.w3, address)
+        return self._nonce_managers[address]
+
+
+@pytest.fixture
+def eth_json() -> Dict[str, Any]:
+    w3 = FakeW3(pending_nonce=5)
+    return {
+        "w3": w3,
+        "client": FakeClient(w3),
+        "public_key": "0x" + "aa" * 20,
+        "private_key": "0x" + "11" * 32,
+    }
+
+
+def serve(answer) -> ThreadingHTTPServer:
+    """
+    Purpose:
+        Local JSON-RPC stand-in, answer maps a request to (delay, response)
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            delay, response = answer(request)
+            time.sleep(delay)
+            body = json.dumps(response).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(answer):
+        server = serve(answer)
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.shutdown()
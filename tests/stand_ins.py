@@ -0,0 +1,234 @@
+"""
+Purpose:
+    Local stand-ins for the services the benchmarks and tests run against, a
+    WebSocket JSON-RPC chain and the Pinata pinFileToIPFS endpoint
+"""
+
+# Python imports
+import asyncio
+import json
+import os
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Dict, List
+
+# Local Python Library Imports
+from modules.receipt_decoder import TRANSFER_TOPIC
+
+CONTRACT = "0x" + "11" * 20
+TO_ADDRESS = "0x" + "22" * 20
+
+
+class ChainStandIn:
+    """
+    Purpose:
+        Fake chain behind a WebSocket JSON-RPC server, supports
+        eth_subscribe newHeads, eth_blockNumber, eth_getBlockByHash,
+        eth_getBlockByNumber, eth_getBlockReceipts, eth_getTransactionReceipt
+        and eth_chainId
+    Args:
+        block_time - seconds between blocks
+    """
+
+    def __init__(self, block_time: float):
+        self.block_time = block_time
+        self.counts: Counter = Counter()
+
+        self.block_number = 0
+        self.mempool: List[str] = []
+        self.blocks: Dict[str, List[str]] = {}
+        self.block_hashes: Dict[int, str] = {0: "0x%064x" % 0}
+        self.blocks[self.block_hashes[0]] = []
+        self.receipts: Dict[str, Dict[str, Any]] = {}
+        self.next_token_id = 0
+
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._loop: Any = None
+        self.url = ""
+
+    def send(self, hash: str) -> None:
+        """
+        Purpose:
+            Put a txn hash in the mempool, it is mined in the next block
+        Args:
+            hash - txn hash
+        Returns:
+            N/A
+        """
+        with self._lock:
+            self.mempool.append(hash)
+
+    def _mine(self) -> Dict[str, Any]:
+        with self._lock:
+            self.block_number += 1
+            block_hash = "0x%064x" % self.block_number
+            hashes, self.mempool = self.mempool, []
+
+            for index, hash in enumerate(hashes):
+                token_id = self.next_token_id
+                self.next_token_id += 1
+                self.receipts[hash] = {
+                    "transactionHash": hash,
+                    "transactionIndex": hex(index),
+                    "blockHash": block_hash,
+                    "blockNumber": hex(self.block_number),
+                    "from": TO_ADDRESS,
+                    "to": CONTRACT,
+                    "status": "0x1",
+                    "gasUsed": hex(150000),
+                    "cumulativeGasUsed": hex(150000 * (index + 1)),
+                    "contractAddress": None,
+                    "logs": [
+                        {
+                            "address": CONTRACT,
+                            "topics": [
+                                TRANSFER_TOPIC,
+                                "0x" + "0" * 64,
+                                "0x" + "0" * 24 + TO_ADDRESS[2:],
+                                "0x%064x" % token_id,
+                            ],
+                            "data": "0x",
+                            "blockNumber": hex(self.block_number),
+                            "blockHash": block_hash,
+                            "transactionHash": hash,
+                            "transactionIndex": hex(index),
+                            "logIndex": hex(index),
+                            "removed": False,
+                        }
+                    ],
+                }
+            self.blocks[block_hash] = hashes
+            self.block_hashes[self.block_number] = block_hash
+
+        return {"number": hex(self.block_number), "hash": block_hash}
+
+    def _answer(self, request: Dict[str, Any], websocket: Any) -> Dict[str, Any]:
+        method, params = request["method"], request.get("params", [])
+        self.counts[method] += 1
+
+        result: Any = None
+        if method == "eth_subscribe":
+            self._subscribers.add(websocket)
+            result = "0x1"
+        elif method == "eth_blockNumber":
+            result = hex(self.block_number)
+        elif method == "eth_chainId":
+            result = hex(1337)
+        elif method == "eth_getBlockByHash":
+            result = {"hash": params[0], "transactions": self.blocks[params[0]]}
+        elif method == "eth_getBlockByNumber":
+            block_hash = self.block_hashes[int(params[0], 16)]
+            result = {"hash": block_hash, "transactions": self.blocks[block_hash]}
+        elif method == "eth_getBlockReceipts":
+            result = [self.receipts[hash] for hash in self.blocks[params[0]]]
+        elif method == "eth_getTransactionReceipt":
+            result = self.receipts.get(params[0])
+        else:
+            return {
+                "jsonrpc": "2.0",
+                "id": request["id"],
+                "error": {"code": -32601, "message": f"{method} not supported"},
+            }
+
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    async def _handler(self, websocket: Any, path: str = "") -> None:
+        try:
+            async for message in websocket:
+                request = json.loads(message)
+                if isinstance(request, list):
+                    response = [self._answer(item, websocket) for item in request]
+                else:
+                    response = self._answer(request, websocket)
+                await websocket.send(json.dumps(response))
+        finally:
+            self._subscribers.discard(websocket)
+
+    async def _produce_blocks(self) -> None:
+        while True:
+            await asyncio.sleep(self.block_time)
+            head = self._mine()
+            notification = json.dumps(
+                {
+                    "jsonrpc": "2.0",
+                    "method": "eth_subscription",
+                    "params": {"subscription": "0x1", "result": head},
+                }
+            )
+            for websocket in list(self._subscribers):
+                try:
+                    await websocket.send(notification)
+                except Exception:
+                    self._subscribers.discard(websocket)
+
+    async def _serve(self, started: threading.Event) -> None:
+        import websockets
+
+        self._loop = asyncio.get_running_loop()
+        async with websockets.serve(self._handler, "127.0.0.1", 0) as server:
+            port = list(server.sockets)[0].getsockname()[1]
+            self.url = f"ws://127.0.0.1:{port}"
+            started.set()
+            await self._produce_blocks()
+
+    def start(self) -> str:
+        """
+        Purpose:
+            Run the server and block producer on a background thread
+        Args:
+            N/A
+        Returns:
+            url - ws url of the stand-in
+        """
+        started = threading.Event()
+        thread = threading.Thread(
+            target=lambda: asyncio.run(self._serve(started)), daemon=True
+        )
+        thread.start()
+        started.wait()
+
+        return self.url
+
+    def drop_subscriptions(self) -> None:
+        """
+        Purpose:
+            Close every subscribed connection, like a node restart
+        Args:
+            N/A
+        Returns:
+            N/A
+        """
+        for websocket in list(self._subscribers):
+            asyncio.run_coroutine_threadsafe(websocket.close(), self._loop).result()
+
+
+class PinFileHandler(BaseHTTPRequestHandler):
+    """
+    Purpose:
+        Stand-in for pinFileToIPFS, reads the body a chunk at a time and
+        answers with its size
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        remaining = int(self.headers["Content-Length"])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+
+        body = json.dumps(
+            {
+                "IpfsHash": "Qm" + os.urandom(22).hex(),
+                "PinSize": self.headers["Content-Length"],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
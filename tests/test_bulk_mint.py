@@ -0,0 +1,153 @@
+# Python imports
+import threading
+
+import pytest
+import requests
+
+# Local Python Library Imports
+from modules import mint_nft
+from modules.mint_journal import CONFIRMED, FAILED, SIGNED, MintJournal
+from modules.mint_tracker import MintBatchHandle, MintHandle
+from tests.conftest import FakeEth
+
+
+@pytest.fixture
+def submits(monkeypatch):
+    """
+    Purpose:
+        Swap in a web3_submit_mint whose mints confirm shortly after being
+        sent, and which fails for token uris starting with "bad"
+    """
+    handles = []
+
+    def submit(userAddress, tokenURI, eth_json, on_signed=None):
+        if tokenURI.startswith("bad"):
+            raise ValueError("insufficient funds for gas")
+        handle = MintHandle(
+            f"0x{len(handles):064x}", len(handles), userAddress, tokenURI
+        )
+        threading.Timer(0.01, handle.set_result, (len(handles),)).start()
+        handles.append(handle)
+        return handle
+
+    monkeypatch.setattr(mint_nft, "web3_submit_mint", submit)
+    return handles
+
+
+def test_failed_submit_is_reported_and_the_drop_goes_on(submits, eth_json):
+    jobs = [("0xuser", uri) for uri in ["a", "bad-1", "b", "c", "bad-2", "d"]]
+
+    results = list(mint_nft.web3_bulk_mint(jobs, eth_json, max_in_flight=2))
+
+    by_job = {result["job_id"]: result for result in results}
+    assert sorted(by_job) == [str(index) for index in range(6)]
+    assert by_job["1"]["hash"] is None and "insufficient" in by_job["1"]["error"]
+    assert by_job["4"]["error"]
+    assert [by_job[job]["error"] for job in ["0", "2", "3", "5"]] == [None] * 4
+    assert all(handle.done() for handle in submits)
+
+
+def test_sent_mints_are_drained_when_the_jobs_fail(submits, eth_json):
+    def jobs():
+        yield ("0xuser", "a")
+        yield ("0xuser", "b")
+        raise OSError("jobs file went away")
+
+    results = []
+    with pytest.raises(OSError):
+        for result in mint_nft.web3_bulk_mint(jobs(), eth_json, max_in_flight=10):
+            results.append(result)
+
+    assert sorted(result["job_id"] for result in results) == ["0", "1"]
+
+
+def test_journal_records_failed_submits(submits, eth_json, tmp_path):
+    journal = MintJournal(str(tmp_path / "journal.db"))
+    jobs = [("0xuser", "a"), ("0xuser", "bad")]
+
+    list(mint_nft.web3_bulk_mint(jobs, eth_json, journal=journal))
+
+    assert journal.get("0")["state"] == CONFIRMED
+    assert journal.get("1")["state"] == FAILED
+    journal.close()
+
+
+class AcceptThenTimeout(FakeEth):
+    """
+    Purpose:
+        Takes the first txn into its mempool but the response never arrives
+    """
+
+    def send_raw_transaction(self, raw):
+        if not self.sent:
+            self.sent.append(raw)
+            raise requests.exceptions.ReadTimeout("read timed out")
+        return super().send_raw_transaction(raw)
+
+
+def test_send_timeout_after_the_node_took_the_txn(eth_json, tmp_path, monkeypatch):
+    w3 = eth_json["w3"]
+    w3.eth = AcceptThenTimeout(pending_nonce=5)
+    w3.eth.send_errors = [
+        ValueError({"code": -32000, "message": "insufficient funds for gas"})
+    ]
+    monkeypatch.setattr(
+        mint_nft,
+        "build_mint_txn",
+        lambda userAddress, tokenURI, eth_json, nonce: {
+            "nonce": nonce,
+            "uri": tokenURI,
+        },
+    )
+    journal = MintJournal(str(tmp_path / "journal.db"))
+    jobs = [("0xuser", "a"), ("0xuser", "b")]
+
+    results = {
+        result["job_id"]: result
+        for result in mint_nft.web3_bulk_mint(jobs, eth_json, journal=journal)
+    }
+
+    # May be mined, so it stays SIGNED for reconcile and is not handed out again
+    assert journal.get("0")["state"] == SIGNED
+    assert journal.get("0")["hash"] == results["0"]["hash"]
+    assert results["0"]["nonce"] == 5
+    unfinished = journal.unfinished((str(index), job) for index, job in enumerate(jobs))
+    assert [job_id for job_id, _ in unfinished] == ["1"]
+    # Rejected outright, its nonce 6 goes back for the next mint
+    assert journal.get("1")["state"] == FAILED
+    manager = eth_json["client"].nonce_manager(eth_json["public_key"])
+    assert manager.next_nonce() == 6
+    journal.close()
+
+
+def test_failed_batch_send_reports_each_token_and_drains(eth_json, monkeypatch):
+    monkeypatch.setattr(
+        mint_nft,
+        "chunk_mint_jobs",
+        lambda mint_jobs, eth_json, gas_budget: (
+            (list(mint_jobs)[start : start + 2], 100000) for start in (0, 2, 4)
+        ),
+    )
+    sent = []
+
+    def submit(chunk, gas, eth_json, on_signed=None):
+        if chunk[0][1] == "bad":
+            raise ValueError({"code": -32000, "message": "exceeds block gas limit"})
+        handle = MintBatchHandle(
+            f"0x{len(sent):064x}", len(sent), ["0xuser"] * 2, [uri for _, uri in chunk]
+        )
+        threading.Timer(
+            0.01, handle.set_result, ([len(sent) * 2, len(sent) * 2 + 1],)
+        ).start()
+        sent.append(handle)
+        return handle
+
+    monkeypatch.setattr(mint_nft, "web3_submit_mint_batch", submit)
+    jobs = [("0xuser", uri) for uri in ["a", "b", "bad", "c", "d", "e"]]
+
+    results = list(mint_nft.web3_bulk_mint_batched(jobs, eth_json, max_in_flight=10))
+
+    by_job = {result["job_id"]: result for result in results}
+    assert sorted(by_job) == [str(index) for index in range(6)]
+    assert "gas limit" in by_job["2"]["error"] and "gas limit" in by_job["3"]["error"]
+    assert [by_job[job]["tokenid"] for job in ["0", "1", "4", "5"]] == [0, 1, 2, 3]
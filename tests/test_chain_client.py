@@ -0,0 +1,53 @@
+# Python imports
+import json
+import os
+
+import pytest
+
+# Local Python Library Imports
+from modules import chain_client
+from modules.chain_client import get_chain_client
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    builds = []
+
+    def build_client(contract, abi_path, *args):
+        builds.append((contract, abi_path, *args))
+        return object()
+
+    monkeypatch.setattr(chain_client, "_CLIENTS", {})
+    monkeypatch.setattr(chain_client, "_build_client", build_client)
+    return builds
+
+
+@pytest.fixture
+def abi_path(tmp_path):
+    path = tmp_path / "NFT.json"
+    path.write_text(json.dumps({"abi": []}))
+    return str(path)
+
+
+def test_client_is_built_once_per_contract(builds, abi_path):
+    client = get_chain_client("0x1", abi_path, "key", "mumbai")
+
+    assert get_chain_client("0x1", abi_path, "key", "mumbai") is client
+    assert get_chain_client("0x2", abi_path, "key", "mumbai") is not client
+    assert (
+        get_chain_client("0x1", abi_path, "key", "mumbai", ["http://b"]) is not client
+    )
+    assert len(builds) == 3
+
+
+def test_changed_abi_file_rebuilds_the_client(builds, abi_path):
+    client = get_chain_client("0x1", abi_path, "key", "mumbai")
+
+    # A recompile rewrites the artifact with a newer mtime
+    modified = os.path.getmtime(abi_path) + 10
+    os.utime(abi_path, (modified, modified))
+
+    rebuilt = get_chain_client("0x1", abi_path, "key", "mumbai")
+    assert rebuilt is not client
+    assert get_chain_client("0x1", abi_path, "key", "mumbai") is rebuilt
+    assert len(builds) == 2
@@ -0,0 +1,118 @@
+# Python imports
+import socket
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("web3")
+
+# Local Python Library Imports
+from modules.chain_reader import batch_eth_call
+
+CALLS = [("0x" + "11" * 20, "0x%08x" % index) for index in range(6)]
+REVERT = {"code": 3, "message": "execution reverted"}
+RATE_LIMIT = {"code": -32005, "message": "rate limit exceeded"}
+
+
+def http_w3(url):
+    return SimpleNamespace(provider=SimpleNamespace(endpoint_uri=url))
+
+
+def test_reverts_are_none_and_errors_are_retried(servers, monkeypatch):
+    monkeypatch.setattr("modules.chain_reader.time.sleep", lambda seconds: None)
+    attempts = []
+
+    def answer(batch):
+        attempts.append(len(batch))
+        responses = []
+        for request in batch:
+            index = int(request["params"][0]["data"], 16)
+            if index == 1:
+                responses.append({"id": request["id"], "error": REVERT})
+            elif index == 2 and len(attempts) == 1:
+                responses.append({"id": request["id"], "error": RATE_LIMIT})
+            elif index == 3 and len(attempts) == 1:
+                # Dropped from the batch entirely
+                continue
+            else:
+                responses.append({"id": request["id"], "result": "0x%064x" % index})
+        return 0, responses
+
+    server = servers(answer)
+
+    results = batch_eth_call(http_w3(server.url), CALLS, 10)
+
+    assert results[1] is None
+    assert [int(results[index], 16) for index in (0, 2, 3, 4, 5)] == [0, 2, 3, 4, 5]
+    # Only the two failed calls were sent again
+    assert attempts == [6, 2]
+
+
+def test_errors_that_persist_raise(servers, monkeypatch):
+    monkeypatch.setattr("modules.chain_reader.time.sleep", lambda seconds: None)
+    server = servers(
+        lambda batch: (
+            0,
+            [{"id": request["id"], "error": RATE_LIMIT} for request in batch],
+        )
+    )
+
+    with pytest.raises(ValueError, match="rate limit"):
+        batch_eth_call(http_w3(server.url), CALLS, 10, retries=1)
+
+
+def results_for(batch):
+    return [
+        {
+            "id": request["id"],
+            "result": "0x%064x" % int(request["params"][0]["data"], 16),
+        }
+        for request in batch
+    ]
+
+
+def test_whole_batch_errors_are_retried(servers, monkeypatch):
+    monkeypatch.setattr("modules.chain_reader.time.sleep", lambda seconds: None)
+    attempts = []
+
+    def answer(batch):
+        attempts.append(len(batch))
+        if len(attempts) == 1:
+            return 0, {"jsonrpc": "2.0", "id": None, "error": RATE_LIMIT}
+        return 0, results_for(batch)
+
+    server = servers(answer)
+
+    results = batch_eth_call(http_w3(server.url), CALLS, 10)
+
+    assert [int(result, 16) for result in results] == list(range(6))
+    assert attempts == [6, 6]
+
+
+def test_batch_over_the_size_limit_is_split(servers, monkeypatch):
+    monkeypatch.setattr("modules.chain_reader.time.sleep", lambda seconds: None)
+    attempts = []
+
+    def answer(batch):
+        attempts.append(len(batch))
+        if len(batch) > 2:
+            error = {"code": -32600, "message": "batch size too large"}
+            return 0, {"jsonrpc": "2.0", "id": None, "error": error}
+        return 0, results_for(batch)
+
+    server = servers(answer)
+
+    results = batch_eth_call(http_w3(server.url), CALLS, 10)
+
+    assert [int(result, 16) for result in results] == list(range(6))
+    assert attempts == [6, 3, 1, 2, 3, 1, 2]
+
+
+def test_unreachable_node_raises_after_retries(monkeypatch):
+    monkeypatch.setattr("modules.chain_reader.time.sleep", lambda seconds: None)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    with pytest.raises(ValueError, match="6 eth_calls failed"):
+        batch_eth_call(http_w3(url), CALLS, 10, retries=1)
@@ -0,0 +1,54 @@
+# Python imports
+import time
+from types import SimpleNamespace
+
+# Local Python Library Imports
+from modules.fee_bumper import FeeBumper
+from modules.mint_tracker import ConfirmationTracker, MintHandle
+from tests.conftest import FakeW3
+
+NO_FEES = SimpleNamespace(fee_params=lambda: {})
+
+
+def tracked(tracker, hash="0x01"):
+    handle = MintHandle(hash, 0, "0x1", "ipfs://x")
+    # Skip the polling thread, the tests drive the tracker by hand
+    tracker._pending[hash] = handle
+    tracker._sent_at[handle] = time.monotonic()
+    return handle
+
+
+def test_on_block_chains_to_the_previous_callback():
+    blocks = []
+    tracker = ConfirmationTracker(None, None, on_block=blocks.append)
+    bumper = FeeBumper(FakeW3(), NO_FEES, tracker, bump_after_blocks=1)
+    handle = tracked(tracker)
+    bumper.watch(handle, {"nonce": 0, "gasPrice": 100}, b"key")
+
+    tracker.on_block(1)
+    tracker.on_block(2)
+
+    assert blocks == [1, 2]
+    assert len(handle.hashes) == 2
+
+
+def test_timeout_counts_from_the_last_bump():
+    w3 = FakeW3()
+    tracker = ConfirmationTracker(None, None, timeout=0.3)
+    bumper = FeeBumper(w3, NO_FEES, tracker, bump_after_blocks=1)
+    handle = tracked(tracker)
+    bumper.watch(handle, {"nonce": 0, "gasPrice": 100}, b"key")
+
+    bumper.check(1)
+    time.sleep(0.2)
+    bumper.check(2)
+    time.sleep(0.2)
+    tracker._expire()
+
+    # 0.4s since the first send, but only 0.2s since the bump
+    assert not handle.done()
+    assert w3.eth.sent
+
+    time.sleep(0.2)
+    tracker._expire()
+    assert isinstance(handle.exception(timeout=0), TimeoutError)
@@ -0,0 +1,69 @@
+# Local Python Library Imports
+from modules.gas_estimator import GasEstimator, uri_bucket
+
+
+class MintFunction:
+    """
+    Purpose:
+        Bound contract function stand-in counting estimateGas calls
+    """
+
+    def __init__(self, estimate: int):
+        self.estimate = estimate
+        self.calls = 0
+
+    def estimateGas(self, tx_params):
+        self.calls += 1
+        return self.estimate
+
+
+def test_estimate_is_reused_for_the_same_shape():
+    estimator = GasEstimator(margin=1.5)
+    mint = MintFunction(100000)
+
+    limits = [estimator.gas_limit(mint, {"from": "0x1"}, ("mint", 2)) for _ in range(5)]
+
+    assert limits == [150000] * 5
+    assert mint.calls == 1
+
+
+def test_shapes_are_estimated_separately():
+    estimator = GasEstimator(margin=1.0)
+    short, long = MintFunction(100000), MintFunction(140000)
+
+    assert estimator.gas_limit(short, {}, ("mint", 2)) == 100000
+    assert estimator.gas_limit(long, {}, ("mint", 4)) == 140000
+    assert estimator.gas_limit(short, {}, ("mint", 2)) == 100000
+    assert (short.calls, long.calls) == (1, 1)
+
+
+def test_estimate_expires_after_max_uses():
+    estimator = GasEstimator(margin=1.0, max_uses=3)
+    mint = MintFunction(100000)
+
+    for _ in range(3):
+        estimator.gas_limit(mint, {}, "shape")
+    assert mint.calls == 1
+
+    mint.estimate = 120000
+    assert estimator.gas_limit(mint, {}, "shape") == 120000
+    assert mint.calls == 2
+
+
+def test_invalidate_forces_a_new_estimate():
+    estimator = GasEstimator(margin=1.0)
+    mint = MintFunction(100000)
+    estimator.gas_limit(mint, {}, "shape")
+
+    mint.estimate = 130000
+    estimator.invalidate("shape")
+    # Dropping a shape that is not cached is a no-op
+    estimator.invalidate("other")
+
+    assert estimator.gas_limit(mint, {}, "shape") == 130000
+    assert mint.calls == 2
+
+
+def test_uri_bucket_groups_uris_by_storage_words():
+    assert uri_bucket("a" * 32) == uri_bucket("b" * 1) == 1
+    assert uri_bucket("a" * 33) == 2
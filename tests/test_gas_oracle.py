@@ -0,0 +1,93 @@
+# Python imports
+from types import SimpleNamespace
+
+import pytest
+
+# Local Python Library Imports
+from modules.gas_oracle import FeeOracle
+
+GWEI = 10**9
+
+
+class FeeEth:
+    """
+    Purpose:
+        w3.eth stand-in answering fee_history and gas_price
+    Args:
+        history - eth_feeHistory answer, None for a chain without it
+    """
+
+    def __init__(self, history=None):
+        self.history = history
+        self.gas_price = 30 * GWEI
+        self.block_number = 100
+        self.calls = 0
+
+    def fee_history(self, block_count, newest_block, reward_percentiles):
+        self.calls += 1
+        if self.history is None:
+            raise ValueError("the method eth_feeHistory does not exist")
+        return self.history
+
+
+def oracle(history=None, **kwargs):
+    eth = FeeEth(history)
+    return FeeOracle(SimpleNamespace(eth=eth), **kwargs), eth
+
+
+HISTORY = {
+    "oldestBlock": 96,
+    # One more than blocks read, the last is the next block's base fee
+    "baseFeePerGas": [10 * GWEI, 11 * GWEI, 10 * GWEI, 11 * GWEI, 12 * GWEI],
+    # Rows per block, columns per percentile 10/25/50/75/90
+    "reward": [
+        [1 * GWEI, 2 * GWEI, 3 * GWEI, 4 * GWEI, 5 * GWEI],
+        [0, 0, 0, 0, 0],
+        [1 * GWEI, 2 * GWEI, 5 * GWEI, 6 * GWEI, 9 * GWEI],
+        [1 * GWEI, 2 * GWEI, 4 * GWEI, 8 * GWEI, 9 * GWEI],
+    ],
+}
+
+
+def test_priority_fee_is_the_median_of_non_empty_blocks():
+    fees = oracle(HISTORY)[0].fee_params(50)
+
+    # The empty block is left out, median of 3, 5 and 4 gwei
+    assert fees["maxPriorityFeePerGas"] == 4 * GWEI
+    # Next block base fee doubled plus the tip
+    assert fees["maxFeePerGas"] == 2 * 12 * GWEI + 4 * GWEI
+
+
+def test_other_percentiles_use_their_own_column():
+    fee_oracle, _ = oracle(HISTORY)
+
+    assert fee_oracle.fee_params(90)["maxPriorityFeePerGas"] == 9 * GWEI
+    assert fee_oracle.fee_params(10)["maxPriorityFeePerGas"] == 1 * GWEI
+    with pytest.raises(ValueError):
+        fee_oracle.fee_params(60)
+
+
+def test_min_priority_fee_is_a_floor():
+    fee_oracle, _ = oracle(HISTORY, min_priority_fee=30 * GWEI)
+
+    fees = fee_oracle.fee_params(50)
+
+    assert fees["maxPriorityFeePerGas"] == 30 * GWEI
+    assert fees["maxFeePerGas"] == 2 * 12 * GWEI + 30 * GWEI
+
+
+def test_chain_without_fee_history_falls_back_to_gas_price():
+    assert oracle(None)[0].fee_params() == {"gasPrice": 30 * GWEI}
+
+
+def test_readings_are_cached_until_stale():
+    fee_oracle, eth = oracle(HISTORY, max_age_blocks=5)
+
+    fee_oracle.fee_params()
+    fee_oracle.fee_params()
+    assert eth.calls == 1
+
+    # The reading was for block 99, five blocks on it is refreshed
+    eth.block_number = 104
+    fee_oracle.fee_params()
+    assert eth.calls == 2
@@ -0,0 +1,78 @@
+# Python imports
+import io
+import random
+import shutil
+import subprocess
+
+import pytest
+
+# Local Python Library Imports
+from modules.ipfs_cid import CHUNK_SIZE, MAX_LINKS, bytes_cid, file_cid, stream_cid
+
+
+def deterministic_bytes(size: int, seed: int = 0) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+class ShortReads(io.BytesIO):
+    """
+    Purpose:
+        Stream that never returns more than a few KB per read, like a pipe
+    """
+
+    def read(self, size: int = -1) -> bytes:
+        return super().read(min(size, 4096) if size >= 0 else 4096)
+
+
+@pytest.mark.parametrize(
+    "data, cid",
+    [
+        (b"", "QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH"),
+        (b"hello world\n", "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"),
+    ],
+)
+def test_known_cids(data, cid):
+    assert bytes_cid(data) == cid
+
+
+@pytest.mark.parametrize("size", [CHUNK_SIZE + 1, CHUNK_SIZE * (MAX_LINKS + 1) + 7])
+def test_file_and_short_reads_match(size, tmp_path):
+    data = deterministic_bytes(size)
+    path = tmp_path / "asset.bin"
+    path.write_bytes(data)
+
+    cid = file_cid(str(path))
+
+    assert cid.startswith("Qm") and len(cid) == 46
+    assert cid == bytes_cid(data) == stream_cid(ShortReads(data))
+
+
+def test_one_byte_past_a_chunk_changes_the_tree():
+    data = deterministic_bytes(CHUNK_SIZE + 1)
+
+    assert bytes_cid(data) != bytes_cid(data[:CHUNK_SIZE])
+
+
+@pytest.mark.skipif(shutil.which("ipfs") is None, reason="needs the ipfs CLI")
+@pytest.mark.parametrize(
+    "size",
+    [
+        CHUNK_SIZE,
+        CHUNK_SIZE + 1,
+        CHUNK_SIZE * MAX_LINKS,
+        # More chunks than fit one node, so the tree gets a second level
+        CHUNK_SIZE * (MAX_LINKS + 1) + 7,
+    ],
+)
+def test_matches_ipfs_add(size, tmp_path):
+    path = tmp_path / "asset.bin"
+    path.write_bytes(deterministic_bytes(size))
+
+    expected = subprocess.run(
+        ["ipfs", "add", "--only-hash", "--quiet", "--cid-version=0", str(path)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+
+    assert file_cid(str(path)) == expected
@@ -0,0 +1,84 @@
+# Python imports
+import pytest
+
+# Local Python Library Imports
+from modules.mint_journal import CONFIRMED, FAILED, SENT, MintJournal, reconcile
+from modules.mint_nft import _journal_hooks
+from modules.mint_tracker import MintHandle, MintReverted
+
+TO_ADDRESS = "0x" + "bb" * 20
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = MintJournal(str(tmp_path / "journal.db"), commit_every=1)
+    yield journal
+    journal.close()
+
+
+def sent_job(journal, eth_json, job_id="0"):
+    on_signed, on_done = _journal_hooks(
+        journal, job_id, TO_ADDRESS, "ipfs://token", eth_json
+    )
+    signed = eth_json["w3"].eth.account.sign_transaction({"nonce": 5}, None)
+    on_signed(signed, 5)
+    journal.record(job_id, SENT, hash="0x01")
+
+    handle = MintHandle("0x01", 5, TO_ADDRESS, "ipfs://token")
+    handle.add_done_callback(on_done)
+    return handle
+
+
+def test_timeout_leaves_the_job_in_flight(journal, eth_json):
+    handle = sent_job(journal, eth_json)
+    handle.set_exception(TimeoutError("not mined in 600s"))
+
+    assert journal.get("0")["state"] == SENT
+    # Not handed out again for a second mint on resume
+    assert list(journal.unfinished([("0", None)])) == []
+
+
+def test_revert_fails_the_job(journal, eth_json):
+    handle = sent_job(journal, eth_json)
+    handle.set_exception(MintReverted("mint txn 0x01 reverted"))
+
+    assert journal.get("0")["state"] == FAILED
+
+
+def test_undecodable_receipt_still_confirms(journal, eth_json):
+    handle = sent_job(journal, eth_json)
+    handle.receipt = {"status": 1, "logs": []}
+    handle.set_exception(ValueError("no Transfer event"))
+
+    job = journal.get("0")
+    assert job["state"] == CONFIRMED
+    assert job["tokenid"] is None
+
+
+class ReceiptW3:
+    def __init__(self, receipt):
+        self.eth = self
+        self.receipt = receipt
+
+    def get_transaction_receipt(self, hash):
+        return self.receipt
+
+
+def test_reconcile_mined_without_tokenid_is_confirmed(journal, eth_json):
+    pytest.importorskip("web3")
+    sent_job(journal, eth_json)
+
+    reconcile(journal, ReceiptW3({"status": 1, "logs": [], "transactionHash": "0x01"}))
+
+    job = journal.get("0")
+    assert job["state"] == CONFIRMED
+    assert job["error"] == "no Transfer event decoded"
+
+
+def test_reconcile_revert_is_failed(journal, eth_json):
+    pytest.importorskip("web3")
+    sent_job(journal, eth_json)
+
+    reconcile(journal, ReceiptW3({"status": 0, "logs": [], "transactionHash": "0x01"}))
+
+    assert journal.get("0")["state"] == FAILED
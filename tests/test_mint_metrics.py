@@ -0,0 +1,82 @@
+# Python imports
+import logging
+
+import pytest
+
+# Local Python Library Imports
+from modules.mint_metrics import (
+    NULL_METRICS,
+    Histogram,
+    MintMetrics,
+    log_sink,
+    rpc_metrics_middleware,
+)
+
+
+def test_histogram_quantiles_are_bucket_upper_bounds():
+    histogram = Histogram()
+    for seconds in [0.003] * 90 + [0.3] * 9 + [4.0]:
+        histogram.observe(seconds)
+
+    assert histogram.count == 100
+    assert histogram.total == pytest.approx(0.27 + 2.7 + 4.0)
+    assert histogram.quantile(0.5) == 0.005
+    assert histogram.quantile(0.95) == 0.5
+    # Capped at the largest sample instead of the 5s bucket bound
+    assert histogram.quantile(0.999) == 4.0
+    assert histogram.to_json()["buckets"]["0.005"] == 90
+
+
+def test_empty_histogram():
+    histogram = Histogram()
+
+    assert histogram.quantile(0.5) == 0.0
+    assert histogram.to_json()["mean"] == 0.0
+
+
+def test_snapshot_has_phases_and_rpc_calls_per_mint():
+    metrics = MintMetrics()
+    with metrics.phase("sign"):
+        pass
+    metrics.observe("send", 0.02)
+    metrics.observe("send", 0.04)
+    metrics.count_mint(2)
+
+    middleware = rpc_metrics_middleware(metrics)(lambda method, params: "0x1", None)
+    for method in ["eth_sendRawTransaction", "eth_sendRawTransaction", "eth_call"]:
+        assert middleware(method, []) == "0x1"
+
+    snapshot = metrics.snapshot()
+    assert snapshot["mints"] == 2
+    assert snapshot["phases"]["sign"]["count"] == 1
+    assert snapshot["phases"]["send"]["mean"] == pytest.approx(0.03)
+    assert snapshot["rpc_counts"] == {"eth_sendRawTransaction": 2, "eth_call": 1}
+    assert snapshot["rpc_per_mint"] == 1.5
+
+
+def test_failed_phase_is_still_timed():
+    metrics = MintMetrics()
+    with pytest.raises(ValueError):
+        with metrics.phase("build"):
+            raise ValueError("revert")
+
+    assert metrics.snapshot()["phases"]["build"]["count"] == 1
+
+
+def test_export_logs_each_phase(caplog):
+    metrics = MintMetrics()
+    metrics.observe("confirm", 2.0)
+    metrics.count_mint()
+
+    with caplog.at_level(logging.INFO):
+        metrics.export(log_sink)
+
+    assert "1 mints" in caplog.text
+    assert "confirm: n=1" in caplog.text
+
+
+def test_null_metrics_record_nothing():
+    with NULL_METRICS.phase("sign"):
+        NULL_METRICS.count_rpc("eth_call")
+
+    assert not NULL_METRICS.enabled
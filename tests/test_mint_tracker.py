@@ -0,0 +1,110 @@
+# Python imports
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("web3")
+
+from hexbytes import HexBytes
+
+# Local Python Library Imports
+from modules.gas_estimator import GasEstimator
+from modules.mint_nft import (
+    BASE_TXN_GAS,
+    batch_token_gas,
+    get_batch_tokenids,
+    get_tokenid,
+)
+from modules.mint_tracker import ConfirmationTracker, MintBatchHandle, MintHandle
+from modules.receipt_decoder import TRANSFER_TOPIC
+
+CONTRACT = "0x" + "11" * 20
+
+
+def mint_receipt(hash, token_ids):
+    return {
+        "transactionHash": HexBytes(hash),
+        "status": 1,
+        "to": CONTRACT,
+        "logs": [
+            {
+                "address": CONTRACT,
+                "topics": [
+                    TRANSFER_TOPIC,
+                    "0x" + "00" * 32,
+                    "0x" + "00" * 12 + "22" * 20,
+                    "0x%064x" % token_id,
+                ],
+                "blockNumber": 1,
+                "logIndex": index,
+                "transactionHash": hash,
+            }
+            for index, token_id in enumerate(token_ids)
+        ],
+    }
+
+
+def resolve(handle, receipt):
+    tracker = ConfirmationTracker(None, get_tokenid)
+    tracker._pending[handle.hash] = handle
+    tracker._sent_at[handle] = 0
+    tracker._resolve(handle.hash, receipt)
+    return handle
+
+
+def test_handle_decoder_overrides_the_tracker():
+    hash = "0x" + "ab" * 32
+    handle = MintBatchHandle(
+        hash, 0, ["0x1"] * 3, ["ipfs://x"] * 3, get_tokenids=lambda receipt: [1, 2, 3]
+    )
+
+    assert resolve(handle, mint_receipt(hash, [9])).result() == [1, 2, 3]
+
+
+def test_batch_handle_resolves_every_token_id():
+    hash = "0x" + "ab" * 32
+    handle = MintBatchHandle(
+        hash,
+        0,
+        ["0x1"] * 3,
+        ["ipfs://x"] * 3,
+        get_tokenids=lambda receipt: get_batch_tokenids(receipt, 3),
+    )
+
+    assert resolve(handle, mint_receipt(hash, [4, 5, 6])).result() == [4, 5, 6]
+
+
+def test_batch_handle_short_mint_fails():
+    hash = "0x" + "ab" * 32
+    handle = MintBatchHandle(
+        hash,
+        0,
+        ["0x1"] * 3,
+        ["ipfs://x"] * 3,
+        get_tokenids=lambda receipt: get_batch_tokenids(receipt, 3),
+    )
+
+    with pytest.raises(ValueError, match="minted 2 of 3"):
+        resolve(handle, mint_receipt(hash, [4, 5])).result()
+
+
+def test_plain_handle_uses_the_tracker_decoder():
+    hash = "0x" + "cd" * 32
+    handle = MintHandle(hash, 0, "0x1", "ipfs://x")
+
+    assert resolve(handle, mint_receipt(hash, [42])).result() == 42
+
+
+def test_batch_token_gas_margin_skips_the_base_cost():
+    per_token = 100000
+    mint_batch = SimpleNamespace(estimateGas=lambda params: BASE_TXN_GAS + per_token)
+    eth_json = {
+        "contract": SimpleNamespace(
+            address=CONTRACT,
+            functions=SimpleNamespace(mintBatch=lambda to, uris: mint_batch),
+        ),
+        "gas_estimator": GasEstimator(margin=1.25),
+        "public_key": "0x" + "aa" * 20,
+    }
+
+    assert batch_token_gas("0x1", "ipfs://x", eth_json) == per_token * 1.25
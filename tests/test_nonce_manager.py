@@ -0,0 +1,99 @@
+# Python imports
+import pytest
+
+# Local Python Library Imports
+from modules.mint_nft import _send_with_nonce
+from modules.mint_tracker import SendUncertain
+from modules.nonce_manager import (
+    NonceManager,
+    is_already_known,
+    is_nonce_too_low,
+    is_rejected,
+)
+from tests.conftest import FakeW3
+
+
+def build(nonce):
+    return {"nonce": nonce, "to": "0x" + "bb" * 20}
+
+
+def test_error_classification():
+    assert is_nonce_too_low(ValueError("nonce too low"))
+    assert not is_nonce_too_low(ValueError("already known"))
+    assert is_already_known(ValueError({"code": -32000, "message": "already known"}))
+    assert not is_already_known(ValueError("insufficient funds"))
+    assert is_rejected(ValueError({"code": -32000, "message": "insufficient funds"}))
+    assert not is_rejected(TimeoutError("read timed out"))
+
+
+def test_already_known_is_a_successful_send(eth_json):
+    w3 = eth_json["w3"]
+    w3.eth.send_errors = [ValueError("already known")]
+
+    hash, nonce, _ = _send_with_nonce(build, eth_json, None)
+
+    # Signed once with nonce 5, no second mint under a new nonce
+    assert nonce == 5
+    signed = w3.eth.account.sign_transaction(build(5), None)
+    assert hash == w3.toHex(w3.keccak(signed.rawTransaction))
+    assert eth_json["client"].nonce_manager(eth_json["public_key"]).next_nonce() == 6
+
+
+def test_nonce_too_low_retries_with_a_fresh_nonce(eth_json):
+    w3 = eth_json["w3"]
+    manager = eth_json["client"].nonce_manager(eth_json["public_key"])
+    manager.release(manager.next_nonce())
+    # Another sender used nonces 5..8 behind our back
+    w3.eth.pending_nonce = 9
+    w3.eth.send_errors = [ValueError("nonce too low")]
+
+    _, nonce, _ = _send_with_nonce(build, eth_json, None)
+
+    assert nonce == 9
+    assert len(w3.eth.sent) == 1
+
+
+def test_other_errors_do_not_resync(eth_json):
+    w3 = eth_json["w3"]
+    manager = eth_json["client"].nonce_manager(eth_json["public_key"])
+    assert manager.next_nonce() == 5
+    w3.eth.send_errors = [ValueError({"code": -32000, "message": "insufficient funds"})]
+
+    with pytest.raises(ValueError):
+        _send_with_nonce(build, eth_json, None)
+
+    # Nonce 6 was given back, nothing later was handed out
+    assert manager.next_nonce() == 6
+
+
+def test_resync_never_goes_below_handed_out_nonces():
+    w3 = FakeW3(pending_nonce=3)
+    manager = NonceManager(w3, "0x" + "aa" * 20)
+    for _ in range(4):
+        manager.next_nonce()
+
+    # Nonces 3..6 are reserved but the node has seen none of them yet
+    assert manager.resync() == 7
+    w3.eth.pending_nonce = 12
+    assert manager.resync() == 12
+
+
+def test_release_only_gives_back_the_latest_nonce():
+    manager = NonceManager(FakeW3(pending_nonce=0), "0x" + "aa" * 20)
+    first, second = manager.next_nonce(), manager.next_nonce()
+
+    assert not manager.release(first)
+    assert manager.release(second)
+    assert manager.next_nonce() == second
+
+
+def test_send_timeout_keeps_the_nonce(eth_json):
+    w3 = eth_json["w3"]
+    manager = eth_json["client"].nonce_manager(eth_json["public_key"])
+    w3.eth.send_errors = [TimeoutError("read timed out")]
+
+    with pytest.raises(SendUncertain) as raised:
+        _send_with_nonce(build, eth_json, None)
+
+    assert raised.value.nonce == 5
+    assert manager.next_nonce() == 6
@@ -0,0 +1,290 @@
+# Python imports
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+import pytest
+
+# Local Python Library Imports
+from modules.pinata_api import (
+    AdaptiveRateLimiter,
+    PinataClient,
+    parse_retry_after,
+    pinSearch,
+)
+from tests.stand_ins import PinFileHandler
+
+BENCH_UPLOAD = Path(__file__).resolve().parents[1] / "benchmarks" / "bench_upload.py"
+
+
+def test_429_never_pulls_the_next_slot_in():
+    limiter = AdaptiveRateLimiter(rate=1.0, window=0)
+    now = time.monotonic()
+    # Ten callers queued ahead, the next free slot is ten seconds out
+    limiter._next_slot = now + 10
+
+    limiter.record(429)
+
+    assert limiter.rate == 0.5
+    assert limiter._next_slot >= now + 10
+
+
+def test_429_spaces_out_the_next_slot_when_idle():
+    limiter = AdaptiveRateLimiter(rate=4.0, window=0)
+
+    limiter.record(429)
+
+    assert limiter._next_slot >= time.monotonic() + 1 / limiter.rate - 0.05
+
+
+def test_repeated_429s_in_the_window_slow_down_once():
+    limiter = AdaptiveRateLimiter(rate=8.0, window=60)
+
+    for _ in range(5):
+        limiter.record(429)
+    limiter.record(200)
+
+    assert limiter.rate == 4.0 + limiter.increase
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="reads /proc for peak RSS")
+def test_pin_file_streams_without_holding_the_file(tmp_path):
+    size_mb = 96
+    path = tmp_path / "asset.glb"
+    with open(path, "wb") as asset_file:
+        for _ in range(size_mb):
+            asset_file.write(os.urandom(1024 * 1024))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PinFileHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        # A fresh interpreter, so peak RSS is the upload's alone
+        process = subprocess.run(
+            [sys.executable, str(BENCH_UPLOAD), "--worker", "stream"]
+            + ["--url", f"http://127.0.0.1:{server.server_port}"]
+            + ["--concurrency", "1", "--paths", str(path)],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    finally:
+        server.shutdown()
+
+    result = json.loads(process.stdout.splitlines()[-1])
+    assert result["uploads"] == 1
+    # Interpreter and imports take ~30MB, reading the file whole would add 96
+    assert result["peak_rss_mb"] < size_mb * 2 / 3
+
+
+@pytest.fixture
+def pinata(monkeypatch):
+    """
+    Purpose:
+        Start a Pinata API stand-in that plays back (status, headers, body)
+        answers in order, and record the client's retry sleeps
+    """
+    servers, sleeps = [], []
+    monkeypatch.setattr("modules.pinata_api.time.sleep", sleeps.append)
+
+    def start(answers):
+        requests_seen = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                requests_seen.append(self.path)
+                status, headers, body = answers.pop(0)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        client = PinataClient(
+            "key", "secret", api_url=f"http://127.0.0.1:{server.server_port}"
+        )
+        return client, requests_seen
+
+    yield start, sleeps
+    for server in servers:
+        server.shutdown()
+
+
+def test_retry_after_is_honored(pinata):
+    start, sleeps = pinata
+    client, seen = start(
+        [(429, {"Retry-After": "7"}, {"error": "slow down"}), (200, {}, {"ok": 1})]
+    )
+
+    assert client.api("GET", "/data/testAuthentication") == {"ok": 1}
+    assert sleeps == [7.0]
+    assert len(seen) == 2
+
+
+def test_retry_after_is_capped_at_max_backoff(pinata):
+    start, sleeps = pinata
+    client, _ = start([(503, {"Retry-After": "3600"}, {}), (200, {}, {"ok": 1})])
+    client.max_backoff = 30
+
+    assert client.api("GET", "/data/testAuthentication") == {"ok": 1}
+    assert sleeps == [30]
+
+
+def test_5xx_is_retried_with_growing_backoff(pinata):
+    start, sleeps = pinata
+    client, seen = start([(502, {}, {}), (500, {}, {}), (200, {}, {"ok": 1})])
+
+    assert client.api("GET", "/data/testAuthentication") == {"ok": 1}
+    assert len(seen) == 3
+    # Full jitter, each wait is anywhere up to the doubled cap
+    assert 0 <= sleeps[0] <= client.backoff
+    assert 0 <= sleeps[1] <= client.backoff * 2
+
+
+def test_last_error_is_returned_after_max_retries(pinata):
+    start, sleeps = pinata
+    client, seen = start([(503, {}, {"error": "down"})] * 3)
+    client.max_retries = 2
+
+    response = client.request("GET", f"{client.api_url}/data/testAuthentication")
+
+    assert response.status_code == 503
+    assert len(seen) == 3
+    assert len(sleeps) == 2
+
+
+def test_client_errors_are_not_retried(pinata):
+    start, sleeps = pinata
+    client, seen = start([(401, {}, {"error": "Invalid API key"})])
+
+    assert client.api("GET", "/data/testAuthentication") == {"error": "Invalid API key"}
+    assert len(seen) == 1
+    assert sleeps == []
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    later = formatdate(time.time() + 60, usegmt=True)
+    assert 55 < parse_retry_after(later) <= 60
+
+
+class PinPages:
+    """
+    Purpose:
+        pinList and gateway stand-in over a fixed set of pins, records the
+        queries and fetches made
+    """
+
+    def __init__(self, count: int, broken=()):
+        self.hashes = [f"Qm{index:044d}" for index in range(count)]
+        self.broken = set(broken)
+        self.queries = []
+        self.fetched = []
+
+    def pin_list(self, query):
+        self.queries.append(dict(parse_qsl(query)))
+        offset = int(self.queries[-1]["pageOffset"])
+        limit = int(self.queries[-1]["pageLimit"])
+        rows = [
+            {"ipfs_pin_hash": hash} for hash in self.hashes[offset : offset + limit]
+        ]
+        return {"count": len(self.hashes), "rows": rows}
+
+    def gateway_json(self, ipfs_hash):
+        self.fetched.append(ipfs_hash)
+        if ipfs_hash in self.broken:
+            raise ValueError(f"{ipfs_hash} is not JSON")
+        return {"hash": ipfs_hash}
+
+
+@pytest.fixture
+def pins(monkeypatch):
+    def make(count, broken=()):
+        pages = PinPages(count, broken)
+        client = PinataClient("key", "secret")
+        client.pin_list = pages.pin_list
+        client.gateway_json = pages.gateway_json
+        monkeypatch.setattr(
+            "modules.pinata_api.get_pinata_client", lambda key, secret: client
+        )
+        return client, pages
+
+    return make
+
+
+def test_iter_pins_follows_every_page(pins):
+    client, pages = pins(250)
+
+    rows = list(client.iter_pins("status=pinned&pageOffset=40", page_limit=100))
+
+    assert [row["ipfs_pin_hash"] for row in rows] == pages.hashes
+    assert [query["pageOffset"] for query in pages.queries] == ["0", "100", "200"]
+    assert all(query["status"] == "pinned" for query in pages.queries)
+
+
+def test_iter_pins_page_limit_in_the_query_wins(pins):
+    client, pages = pins(100)
+
+    assert len(list(client.iter_pins("pageLimit=50", page_limit=10))) == 100
+    # A full last page needs one more, empty, page to know it was the last
+    assert [query["pageOffset"] for query in pages.queries] == ["0", "50", "100"]
+
+
+def test_iter_pins_only_pages_as_rows_are_consumed(pins):
+    client, pages = pins(1000)
+
+    rows = client.iter_pins("status=pinned", page_limit=100)
+    for _ in range(150):
+        next(rows)
+
+    assert len(pages.queries) == 2
+
+
+def test_pin_search_stops_at_the_limit(pins):
+    _, pages = pins(500)
+
+    found = list(pinSearch("status=pinned", "key", "secret", limit=30))
+
+    assert len(found) == 30
+    assert len(pages.fetched) == 30
+    assert len(pages.queries) == 1
+
+
+def test_pin_search_skips_pins_that_fail_to_fetch(pins):
+    _, pages = pins(20, broken=[f"Qm{3:044d}", f"Qm{11:044d}"])
+
+    found = list(pinSearch("status=pinned", "key", "secret", max_workers=4))
+
+    assert sorted(data["hash"] for data in found) == [
+        hash for hash in pages.hashes if hash not in pages.broken
+    ]
+
+
+def test_closing_pin_search_early_stops_paging(pins):
+    _, pages = pins(1000)
+
+    results = pinSearch("status=pinned", "key", "secret", max_workers=4)
+    next(results)
+    results.close()
+
+    # One page read and at most one window of fetches queued
+    assert len(pages.queries) == 1
+    assert len(pages.fetched) <= 4
@@ -0,0 +1,120 @@
+# Python imports
+from concurrent.futures import wait
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("web3")
+
+# Local Python Library Imports
+from modules.gas_estimator import GasEstimator, uri_bucket
+from modules.presign import broadcast_presigned
+from modules.receipt_decoder import TRANSFER_TOPIC
+from tests.conftest import FakeClient, FakeEth, FakeW3
+
+CONTRACT = "0x" + "11" * 20
+FROM_ADDRESS = "0x" + "aa" * 20
+
+
+class MiningEth(FakeEth):
+    """
+    Purpose:
+        FakeEth that mines every sent hash into the next block, reverting
+        the ones in revert_hashes
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.block_number = 0
+        self.receipts = {}
+        self.revert_hashes = set()
+
+    def mine(self, hash, token_id):
+        self.block_number += 1
+        self.receipts[hash] = {
+            "transactionHash": hash,
+            "status": 0 if hash in self.revert_hashes else 1,
+            "to": CONTRACT,
+            "logs": [
+                {
+                    "address": CONTRACT,
+                    "topics": [
+                        TRANSFER_TOPIC,
+                        "0x" + "00" * 32,
+                        "0x" + "00" * 12 + "22" * 20,
+                        "0x%064x" % token_id,
+                    ],
+                    "blockNumber": self.block_number,
+                    "logIndex": 0,
+                    "transactionHash": hash,
+                }
+            ],
+        }
+
+    def send_raw_transaction(self, raw):
+        # Presigned files hold the raw txn as hex
+        return super().send_raw_transaction(bytes.fromhex(raw[2:]))
+
+    def get_transaction_receipt(self, hash):
+        from web3.exceptions import TransactionNotFound
+
+        if hash not in self.receipts:
+            raise TransactionNotFound(hash)
+        return self.receipts[hash]
+
+
+@pytest.fixture
+def client():
+    w3 = FakeW3()
+    w3.eth = MiningEth()
+    client = FakeClient(w3)
+    client.tracker = None
+    client.ws_url = None
+    client.contract = SimpleNamespace(address=CONTRACT)
+    client.gas_estimator = GasEstimator()
+    return client
+
+
+def signed(nonce, token_uri="ipfs://token"):
+    return {
+        "nonce": nonce,
+        "to_address": "0x" + "22" * 20,
+        "token_uri": token_uri,
+        "from_address": FROM_ADDRESS,
+        "hash": "0x%064x" % nonce,
+        "raw_txn": "0x%02x" % nonce,
+    }
+
+
+def test_rejected_send_fails_at_once(client):
+    client.w3.eth.send_errors = [ValueError("insufficient funds for gas")]
+
+    handles = broadcast_presigned([signed(0)], {"client": client})
+    handle = next(handles)
+
+    assert isinstance(handle.exception(timeout=0), ValueError)
+    assert handle.from_address == FROM_ADDRESS
+    assert not client.tracker._pending
+
+
+def test_already_known_is_tracked(client):
+    client.w3.eth.send_errors = [ValueError("already known"), None]
+    client.w3.eth.mine("0x%064x" % 0, 7)
+    client.w3.eth.mine("0x%064x" % 1, 8)
+
+    handles = list(broadcast_presigned([signed(0), signed(1)], {"client": client}))
+    wait(handles, timeout=5)
+
+    assert sorted(handle.result() for handle in handles) == [7, 8]
+
+
+def test_revert_drops_the_cached_gas_limit(client):
+    shape = (CONTRACT, "mint", uri_bucket("ipfs://token"))
+    client.gas_estimator._cache[shape] = (100000, 1)
+    client.w3.eth.revert_hashes.add("0x%064x" % 0)
+    client.w3.eth.mine("0x%064x" % 0, 7)
+
+    (handle,) = broadcast_presigned([signed(0)], {"client": client})
+
+    assert handle.exception(timeout=5) is not None
+    assert shape not in client.gas_estimator._cache
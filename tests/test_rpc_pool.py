@@ -0,0 +1,109 @@
+# Python imports
+import json
+import socket
+import time
+from typing import Any, Dict
+
+import pytest
+
+pytest.importorskip("web3")
+
+# Local Python Library Imports
+from modules.rpc_pool import RPCPool
+
+
+def ok(request: Dict[str, Any]) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request["id"], "result": "0x10"}
+
+
+def closed_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def payload(method: str = "eth_blockNumber") -> bytes:
+    return json.dumps(
+        {"jsonrpc": "2.0", "id": 1, "method": method, "params": []}
+    ).encode()
+
+
+def test_fails_over_from_a_down_endpoint(servers):
+    healthy = servers(lambda request: (0, ok(request)))
+    pool = RPCPool([closed_url(), healthy.url], timeout=1)
+
+    assert pool.post(payload())["result"] == "0x10"
+    assert pool.endpoints[0].error_rate() == 1.0
+    assert pool.ranked()[0].url == healthy.url
+
+
+def test_fails_over_from_a_slow_endpoint(servers):
+    slow = servers(lambda request: (1, ok(request)))
+    fast = servers(lambda request: (0, ok(request)))
+    pool = RPCPool([slow.url, fast.url], timeout=0.2)
+
+    assert pool.post(payload())["result"] == "0x10"
+    assert pool.endpoints[0].results[-1] is False
+    assert pool.ranked()[0].url == fast.url
+
+
+def test_rate_limit_error_body_fails_over(servers):
+    limited = servers(
+        lambda request: (
+            0,
+            {
+                "jsonrpc": "2.0",
+                "id": request["id"],
+                "error": {"code": -32005, "message": "daily request count exceeded"},
+            },
+        )
+    )
+    healthy = servers(lambda request: (0, ok(request)))
+    pool = RPCPool([limited.url, healthy.url], max_error_rate=0.5)
+
+    for _ in range(3):
+        assert pool.post(payload())["result"] == "0x10"
+
+    # Marked down, so it is no longer tried first
+    assert pool.endpoints[0].error_rate() == 1.0
+    assert pool.endpoints[0].down_until > time.monotonic()
+    assert pool.ranked()[0].url == healthy.url
+
+
+def test_error_from_every_endpoint_is_returned(servers):
+    error = {"code": -32000, "message": "header not found"}
+    urls = [
+        servers(lambda request: (0, {"jsonrpc": "2.0", "id": 1, "error": error})).url
+        for _ in range(2)
+    ]
+    pool = RPCPool(urls)
+
+    assert pool.post(payload())["error"] == error
+
+
+def test_revert_is_an_answer_not_a_failure(servers):
+    revert = {"code": 3, "message": "execution reverted"}
+    reverting = servers(
+        lambda request: (0, {"jsonrpc": "2.0", "id": 1, "error": revert})
+    )
+    pool = RPCPool([reverting.url, closed_url()])
+
+    assert pool.post(payload("eth_call"))["error"] == revert
+    assert pool.endpoints[0].error_rate() == 0.0
+
+
+def test_nonce_too_low_is_an_answer_not_a_failure(servers):
+    nonce_too_low = {"code": -32000, "message": "nonce too low"}
+    calls = []
+    rejecting = servers(
+        lambda request: (0, {"jsonrpc": "2.0", "id": 1, "error": nonce_too_low})
+    )
+    healthy = servers(lambda request: (0, calls.append(request) or ok(request)))
+    pool = RPCPool([rejecting.url, healthy.url], max_error_rate=0.0)
+
+    response = pool.post(payload("eth_sendRawTransaction"), "eth_sendRawTransaction")
+
+    assert response["error"] == nonce_too_low
+    assert calls == []
+    assert pool.endpoints[0].error_rate() == 0.0
+    assert pool.endpoints[0].down_until == 0.0
@@ -0,0 +1,54 @@
+# Python imports
+import threading
+
+import pytest
+
+pytest.importorskip("web3")
+
+# Local Python Library Imports
+from modules.signer_pool import SignerPool
+
+KEYS = ["0x%064x" % index for index in range(1, 4)]
+
+
+def test_each_key_gets_its_own_lane():
+    pool = SignerPool({"public_key": "0xowner"}, KEYS)
+
+    addresses = pool.addresses()
+    assert len(set(addresses)) == 3
+    assert [lane.eth_json["public_key"] for lane in pool.lanes] == addresses
+    assert pool.lanes[0].eth_json["private_key"] == bytes.fromhex(KEYS[0][2:])
+
+
+def test_acquire_picks_the_least_loaded_lane():
+    pool = SignerPool({"public_key": "0xowner"}, KEYS, max_in_flight=4)
+
+    lanes = [pool.acquire() for _ in range(6)]
+
+    # Spread evenly before any lane takes a second mint
+    assert [lane.in_flight for lane in pool.lanes] == [2, 2, 2]
+    assert set(lanes[:3]) == set(pool.lanes)
+
+    pool.release(pool.lanes[1])
+    assert pool.acquire() is pool.lanes[1]
+
+
+def test_acquire_waits_for_a_release_when_every_lane_is_full():
+    pool = SignerPool({"public_key": "0xowner"}, KEYS[:2], max_in_flight=1)
+    first, second = pool.acquire(), pool.acquire()
+
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    waiter.join(0.1)
+    assert acquired == []
+
+    pool.release(second)
+    waiter.join(1)
+    assert acquired == [second]
+    assert first.in_flight == second.in_flight == 1
+
+
+def test_no_keys_is_an_error():
+    with pytest.raises(ValueError):
+        SignerPool({"public_key": "0xowner"}, [])
@@ -0,0 +1,150 @@
+# Python imports
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+# Local Python Library Imports
+from modules.receipt_decoder import TRANSFER_TOPIC
+from modules.transfer_indexer import TransferStore, sync_transfers
+
+CONTRACT = "0x" + "aa" * 20
+ZERO = "0x" + "00" * 20
+ALICE = "0x" + "a1" * 20
+BOB = "0x" + "b0" * 20
+
+
+def topic(address: str) -> str:
+    return "0x" + "0" * 24 + address[2:]
+
+
+class ScriptedChain:
+    """
+    Purpose:
+        w3 stand-in whose blocks hold scripted (from, to, token id)
+        transfers, blocks can be replaced from any height to fake a reorg
+    """
+
+    def __init__(self):
+        self.blocks: List[Dict[str, Any]] = []
+        self.forks = 0
+        self.eth = self
+
+    @property
+    def block_number(self) -> int:
+        return len(self.blocks) - 1
+
+    def get_block(self, block_number: int) -> Dict[str, Any]:
+        return self.blocks[block_number]
+
+    def get_logs(self, filter_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        blocks = self.blocks[filter_params["fromBlock"] : filter_params["toBlock"] + 1]
+        return [log for block in blocks for log in block["logs"]]
+
+    def add(self, *transfers: List[Tuple[str, str, int]]) -> None:
+        for block_transfers in transfers:
+            number = len(self.blocks)
+            block_hash = "0x%04x%060x" % (self.forks, number)
+            parent = self.blocks[-1]["hash"] if self.blocks else "0x" + "00" * 32
+            logs = [
+                {
+                    "address": CONTRACT,
+                    "topics": [
+                        TRANSFER_TOPIC,
+                        topic(sender),
+                        topic(receiver),
+                        "0x%064x" % token_id,
+                    ],
+                    "blockNumber": number,
+                    "blockHash": block_hash,
+                    "logIndex": index,
+                    "transactionHash": "0x%04x%056x%04x" % (self.forks, number, index),
+                }
+                for index, (sender, receiver, token_id) in enumerate(block_transfers)
+            ]
+            self.blocks.append({"hash": block_hash, "parentHash": parent, "logs": logs})
+
+    def fork_at(self, block_number: int) -> None:
+        self.blocks = self.blocks[:block_number]
+        self.forks += 1
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TransferStore(str(tmp_path / "sync.db"))
+    yield store
+    store.close()
+
+
+def test_first_sync_indexes_from_the_start_block(store):
+    chain = ScriptedChain()
+    chain.add([], [(ZERO, ALICE, 1)], [], [(ZERO, ALICE, 2), (ALICE, BOB, 1)])
+
+    summary = sync_transfers(chain, store, CONTRACT, 1, reorg_depth=4)
+
+    assert summary == {
+        "from_block": 1,
+        "to_block": 3,
+        "transfers": 3,
+        "rolled_back": 0,
+    }
+    assert store.owner_of(1) == BOB
+    assert store.owner_of(2) == ALICE
+    assert store.checkpoint() == (3, chain.blocks[3]["hash"])
+
+
+def test_resync_only_reads_new_blocks(store):
+    chain = ScriptedChain()
+    chain.add([(ZERO, ALICE, 1)], [])
+    sync_transfers(chain, store, CONTRACT, 0, reorg_depth=4)
+
+    chain.add([(ALICE, BOB, 1)])
+    summary = sync_transfers(chain, store, CONTRACT, 0, reorg_depth=4)
+
+    assert (summary["from_block"], summary["transfers"]) == (2, 1)
+    assert store.owner_of(1) == BOB
+
+
+def test_reorg_rolls_back_transfers_from_dropped_blocks(store):
+    chain = ScriptedChain()
+    chain.add([(ZERO, ALICE, 1)], [(ZERO, ALICE, 2)], [(ALICE, BOB, 1)], [])
+    sync_transfers(chain, store, CONTRACT, 0, reorg_depth=8)
+    assert store.owner_of(1) == BOB
+
+    # Blocks 2 and 3 are replaced, the transfer of token 1 to bob never
+    # happened and token 2 went to bob instead
+    chain.fork_at(2)
+    chain.add([(ALICE, BOB, 2)], [], [])
+    summary = sync_transfers(chain, store, CONTRACT, 0, reorg_depth=8)
+
+    assert summary["rolled_back"] == 1
+    assert summary["from_block"] == 2
+    assert store.owner_of(1) == ALICE
+    assert store.owner_of(2) == BOB
+    assert [row["block_number"] for row in store.history_of(2)] == [1, 2]
+    assert store.checkpoint() == (4, chain.blocks[4]["hash"])
+
+
+def test_reorg_to_a_shorter_chain(store):
+    chain = ScriptedChain()
+    chain.add([(ZERO, ALICE, 1)], [], [(ALICE, BOB, 1)], [(ZERO, BOB, 2)])
+    sync_transfers(chain, store, CONTRACT, 0, reorg_depth=8)
+
+    chain.fork_at(2)
+    chain.add([])
+    summary = sync_transfers(chain, store, CONTRACT, 0, reorg_depth=8)
+
+    assert summary["rolled_back"] == 2
+    assert store.owner_of(1) == ALICE
+    assert store.owner_of(2) is None
+    assert store.checkpoint() == (2, chain.blocks[2]["hash"])
+
+
+def test_confirmations_hold_back_the_newest_blocks(store):
+    chain = ScriptedChain()
+    chain.add([(ZERO, ALICE, 1)], [(ZERO, ALICE, 2)], [(ZERO, ALICE, 3)])
+
+    summary = sync_transfers(chain, store, CONTRACT, 0, confirmations=1)
+
+    assert summary["to_block"] == 1
+    assert store.owner_of(2) == ALICE
+    assert store.owner_of(3) is None
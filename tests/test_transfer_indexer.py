@@ -0,0 +1,133 @@
+# Python imports
+from typing import Any, Dict, List
+
+import pytest
+
+# Local Python Library Imports
+from modules.receipt_decoder import TRANSFER_TOPIC, decode_transfers
+from modules.transfer_indexer import TransferStore, sync_transfers
+
+CONTRACT = "0x" + "11" * 20
+
+
+class ForkingChain:
+    """
+    Purpose:
+        In-memory chain that mints one token per block and can reorg, with
+        just enough of w3.eth for sync_transfers
+    """
+
+    def __init__(self):
+        self.blocks: List[Dict[str, Any]] = []
+        self.fork = 0
+        self.eth = self
+
+    @property
+    def block_number(self) -> int:
+        return len(self.blocks) - 1
+
+    def get_block(self, block_number: int) -> Dict[str, Any]:
+        return self.blocks[block_number]
+
+    def get_logs(self, filter_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        blocks = self.blocks[filter_params["fromBlock"] : filter_params["toBlock"] + 1]
+        return [log for block in blocks for log in block["logs"]]
+
+    def mine(self, count: int) -> None:
+        for _ in range(count):
+            number = len(self.blocks)
+            block_hash = "0x%02x%062x" % (self.fork, number)
+            parent = self.blocks[-1]["hash"] if self.blocks else "0x" + "00" * 32
+            # Same token and log index on every fork, only the owner differs
+            log = {
+                "address": CONTRACT,
+                "topics": [
+                    TRANSFER_TOPIC,
+                    "0x%064x" % 0,
+                    "0x%064x" % (self.fork + 1),
+                    "0x%064x" % (number % 8),
+                ],
+                "blockNumber": number,
+                "blockHash": block_hash,
+                "logIndex": 0,
+                "transactionHash": "0x%064x" % (number * 100 + self.fork),
+            }
+            self.blocks.append(
+                {"hash": block_hash, "parentHash": parent, "logs": [log]}
+            )
+
+    def reorg(self, depth: int) -> None:
+        self.blocks = self.blocks[:-depth]
+        self.fork += 1
+
+    def owners(self) -> Dict[int, str]:
+        owners = {}
+        for block in self.blocks:
+            for log in block["logs"]:
+                owners[int(log["topics"][3], 16)] = "0x" + log["topics"][2][-40:]
+        return owners
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TransferStore(str(tmp_path / "transfers.db"))
+    yield store
+    store.close()
+
+
+def assert_matches(chain: ForkingChain, store: TransferStore) -> None:
+    for token_id, owner in chain.owners().items():
+        assert store.owner_of(token_id) == owner
+    assert store.checkpoint()[0] == chain.block_number
+
+
+def test_reorg_replaces_orphaned_transfers(store):
+    chain = ForkingChain()
+    chain.mine(40)
+    sync_transfers(chain, store, CONTRACT, 0, reorg_depth=16)
+    assert_matches(chain, store)
+
+    chain.reorg(5)
+    chain.mine(5)
+    summary = sync_transfers(chain, store, CONTRACT, 0, reorg_depth=16)
+
+    assert summary["rolled_back"] == 5
+    assert_matches(chain, store)
+
+
+def test_add_transfers_replaces_row_from_another_block_hash(store):
+    chain = ForkingChain()
+    chain.mine(10)
+    orphaned = chain.get_logs({"fromBlock": 9, "toBlock": 9})
+    chain.reorg(1)
+    chain.mine(1)
+    canonical = chain.get_logs({"fromBlock": 9, "toBlock": 9})
+
+    store.add_transfers(decode_transfers(orphaned))
+    store.add_transfers(decode_transfers(canonical))
+
+    history = store.history_of(1)
+    assert len(history) == 1
+    assert store.owner_of(1) == chain.owners()[1]
+
+
+def test_interrupted_run_drops_transfers_past_checkpoint(store):
+    chain = ForkingChain()
+    chain.mine(20)
+    sync_transfers(chain, store, CONTRACT, 0, reorg_depth=16)
+
+    # A crash between add_transfers and save_blocks, then the tail reorgs
+    chain.mine(5)
+    sync_transfers(chain, store, CONTRACT, 0, reorg_depth=16)
+    store._conn.execute("DELETE FROM blocks WHERE block_number > 19")
+    store._conn.execute(
+        "UPDATE checkpoint SET block_number = 19, block_hash = ? WHERE id = 0",
+        (chain.blocks[19]["hash"],),
+    )
+    store._conn.commit()
+    chain.reorg(5)
+    chain.mine(3)
+
+    sync_transfers(chain, store, CONTRACT, 0, reorg_depth=16)
+    assert_matches(chain, store)
+    assert not store._query("SELECT * FROM transfers WHERE block_number > ?", (22,))
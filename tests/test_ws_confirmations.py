@@ -0,0 +1,100 @@
+# Python imports
+import os
+import time
+from concurrent.futures import wait
+
+import pytest
+
+pytest.importorskip("web3")
+pytest.importorskip("websockets")
+
+# Local Python Library Imports
+from modules.mint_nft import get_tokenid
+from modules.mint_tracker import MintHandle
+from modules.ws_confirmations import SubscriptionTracker, format_receipt
+from tests.stand_ins import TO_ADDRESS, ChainStandIn
+
+
+@pytest.fixture
+def chain():
+    chain = ChainStandIn(block_time=0.05)
+    chain.start()
+    return chain
+
+
+def send_mints(chain, tracker, count):
+    handles = []
+    for index in range(count):
+        hash = "0x" + os.urandom(32).hex()
+        chain.send(hash)
+        handles.append(tracker.track(MintHandle(hash, index, TO_ADDRESS, "ipfs://x")))
+    return handles
+
+
+def minted_tokenid(chain, handle):
+    return int(chain.receipts[handle.hash]["logs"][0]["topics"][3], 16)
+
+
+def test_every_handle_resolves_across_a_dropped_subscription(chain):
+    from web3 import Web3
+
+    w3 = Web3(Web3.WebsocketProvider(chain.url))
+    tracker = SubscriptionTracker(
+        w3, chain.url, get_tokenid, timeout=10, reconnect_delay=0.1
+    )
+
+    handles = send_mints(chain, tracker, 20)
+    wait(handles[:10], timeout=5)
+    chain.drop_subscriptions()
+    # Mined while nobody is subscribed, found again on reconnect
+    handles += send_mints(chain, tracker, 20)
+    time.sleep(0.2)
+    handles += send_mints(chain, tracker, 20)
+
+    done, not_done = wait(handles, timeout=10)
+    assert not not_done
+    assert chain.counts["eth_subscribe"] >= 2
+    for handle in handles:
+        assert handle.result() == minted_tokenid(chain, handle)
+        assert handle.receipt["transactionHash"].hex() == handle.hash
+
+
+def test_receipt_without_a_mint_raises_value_error():
+    hash = "0x" + "ab" * 32
+    receipt = format_receipt(
+        {
+            "transactionHash": hash.upper().replace("0X", "0x"),
+            "blockHash": "0x" + "01" * 32,
+            "blockNumber": "0x1",
+            "status": "0x1",
+            "to": "0x" + "11" * 20,
+            "logs": [],
+        }
+    )
+
+    with pytest.raises(ValueError, match=hash[2:]):
+        get_tokenid(receipt)
+
+
+def test_on_block_sees_blocks_mined_while_disconnected(chain):
+    from web3 import Web3
+
+    blocks = []
+    w3 = Web3(Web3.WebsocketProvider(chain.url))
+    tracker = SubscriptionTracker(
+        w3,
+        chain.url,
+        get_tokenid,
+        timeout=10,
+        reconnect_delay=0.3,
+        on_block=blocks.append,
+    )
+
+    # Never mined, keeps the tracker subscribed
+    tracker.track(MintHandle("0x" + "ee" * 32, 0, TO_ADDRESS, "ipfs://x"))
+    time.sleep(0.2)
+    chain.drop_subscriptions()
+    time.sleep(0.6)
+
+    assert chain.counts["eth_subscribe"] >= 2
+    assert sorted(set(blocks)) == list(range(min(blocks), max(blocks) + 1))
@@ -271,6 +271,13 @@ Summary
         """
         )
 
+        st.write(
+            "To mint a whole drop, pass a CSV or JSONL file with to_address and token_metadata_url columns instead"
+        )
+        st.code(
+            "python mint_nft.py --contract_address YOUR_CONTRACT_ADDRESS --abi_path ABI_PATH --input_file drop.csv --concurrency 50 --journal drop.db"
+        )
+
     if module == "11. View NFT on OpenSea":
 
         st.write(
@@ -472,7 +479,9 @@ def get_items() -> List:
 #                     network,
 #                 )
 
-#                 txn_hash = mint_nft.web3_mint(token_address, token_uri, eth_json)
+#                 # Returns once the txn is sent, the token id resolves later
+#                 handle = mint_nft.web3_submit_mint(token_address, token_uri, eth_json)
+#                 txn_hash = handle.hash
 
 #                 if network == "mumbai":
 #                     scan_url = "https://explorer-mumbai.maticvigil.com/tx/"